@@ -0,0 +1,266 @@
+import argparse
+import threading
+import time
+
+import numpy as np
+from PIL import Image, ImageTk
+
+try:
+    import cv2
+except ImportError:     # Sin OpenCV sólo está disponible la fuente sintética
+    cv2 = None
+
+
+class SyntheticSource:
+    """
+        Frame source with the cv2.VideoCapture interface (read/release) that draws a
+        moving test pattern at a fixed frame rate. Lets the pipeline run without a camera.
+    """
+    def __init__(self, width=640, height=480, fps=30):
+        self.width = width
+        self.height = height
+        self.period = 1.0 / fps
+        self.frame = np.zeros((height, width, 3), dtype=np.uint8)
+        self.ramp = (np.arange(width, dtype=np.uint16) * 255 // max(width - 1, 1)).astype(np.uint8)
+        self.count = 0
+        self.next = time.perf_counter()
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        # Entrega los cuadros a la frecuencia de una cámara real
+        delay = self.next - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self.next = max(self.next + self.period, time.perf_counter() - self.period)
+        frame = self.frame
+        frame[:, :, 0] = np.roll(self.ramp, self.count * 4)     # Rampa que se desplaza (B)
+        frame[:, :, 1] = self.count & 0xFF                      # Brillo que cambia por cuadro (G)
+        bar = (self.count * 8) % self.height
+        frame[:, :, 2] = 0
+        frame[bar:bar + 16, :, 2] = 255                         # Barra horizontal (R)
+        self.count += 1
+        return True, frame
+
+    def release(self):
+        pass
+
+
+def openSource(source):
+    """
+        Opens a frame source: "synthetic", a camera index (0, 1...) or a video file path.
+        Returns an object with the cv2.VideoCapture interface, or None if it cannot be opened.
+    """
+    if source == "synthetic":
+        return SyntheticSource()
+    if cv2 is None:
+        print("OpenCV no está instalado: sólo está disponible la cámara sintética.")
+        return None
+    cap = cv2.VideoCapture(int(source) if str(source).isdigit() else source)
+    if not cap.isOpened():
+        print(f"No se pudo abrir la cámara {source}.")
+        return None
+    if isLive(cap):
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)     # Sólo el cuadro más nuevo en el driver (si el backend lo permite)
+    return cap
+
+
+def isLive(source):
+    """
+        True for a camera or network stream: a cv2.VideoCapture without a frame count.
+        Video files and the synthetic source are read at the pipeline's pace instead.
+    """
+    if cv2 is None or not isinstance(source, cv2.VideoCapture):
+        return False
+    return source.get(cv2.CAP_PROP_FRAME_COUNT) <= 0
+
+
+class CameraPipeline:
+    """
+        Capture thread that keeps only the latest frame.
+
+        Each frame is downscaled and converted to RGB into preallocated buffers and then
+        published through a triple buffer: the capture thread always has a free buffer to
+        write, the display always reads a complete frame, and nobody waits on anybody.
+        Frames the display did not take in time are simply overwritten (counted as dropped),
+        so a slow display never builds up a queue or latency.
+
+        Files and the synthetic source are read at maxFps. A live camera sets its own pace:
+        it is grabbed continuously so the driver never queues stale frames, and only the
+        frames due at maxFps are decoded (the rest are counted as skipped).
+    """
+    def __init__(self, source, size=(320, 240), maxFps=30, live=None):
+        self.source = source
+        self.size = size                    # (ancho, alto) mostrado
+        self.period = 1.0 / maxFps          # Un video se lee a su ritmo, no tan rápido como se pueda
+        self.live = isLive(source) if live is None else live
+        width, height = size
+        self.buffers = np.zeros((3, height, width, 3), dtype=np.uint8)
+        self.stamps = np.zeros(3)           # Instante de captura de cada buffer (perf_counter)
+        self.seqs = np.zeros(3, dtype=np.int64)
+        self.back, self.ready, self.front = 0, 1, 2
+        self.fresh = False                  # ready tiene un cuadro que el display no ha tomado
+        self.lock = threading.Lock()        # Sólo protege el intercambio de índices
+        self.resized = None                 # Buffer intermedio de cv2.resize (BGR)
+        self.indices = None                 # Índices de submuestreo sin OpenCV
+        self.running = False
+        self.thread = None
+        self.captured = 0
+        self.skipped = 0                    # Cuadros de una cámara en vivo descartados sin decodificar
+        self.displayed = 0
+        self.latency = 0.0                  # Captura -> display del último cuadro [s]
+        self.maxLatency = 0.0
+
+    def start(self):
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self.captureLoop)
+            self.thread.daemon = True
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        self.source.release()
+
+    def captureLoop(self):
+        deadline = time.perf_counter()
+        while self.running:
+            if self.live:
+                # grab() espera el siguiente cuadro de la cámara; sólo se decodifica si ya toca
+                ok = self.source.grab()
+                stamp = time.perf_counter()
+                if ok and stamp < deadline:
+                    self.skipped += 1
+                    continue
+                if ok:
+                    ok, frame = self.source.retrieve()
+            else:
+                delay = deadline - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                ok, frame = self.source.read()
+                stamp = time.perf_counter()
+            if not ok:
+                print("La cámara dejó de entregar cuadros.")
+                break
+            deadline = max(deadline + self.period, stamp - self.period)    # Atrasado: no recuperar en ráfaga
+            out = self.buffers[self.back]
+            self.convert(frame, out)
+            self.captured += 1
+            self.stamps[self.back] = stamp
+            self.seqs[self.back] = self.captured
+            with self.lock:
+                self.back, self.ready = self.ready, self.back
+                self.fresh = True
+        self.running = False
+
+    def convert(self, frame, out):
+        """Downscale and BGR -> RGB conversion straight into out (no allocations)."""
+        height, width = out.shape[:2]
+        if cv2 is not None:
+            if frame.shape[:2] != (height, width):
+                if self.resized is None:
+                    self.resized = np.empty((height, width, 3), dtype=np.uint8)
+                cv2.resize(frame, (width, height), dst=self.resized, interpolation=cv2.INTER_AREA)
+                frame = self.resized
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=out)
+        else:
+            # Submuestreo por vecino más cercano con índices precalculados
+            if self.indices is None:
+                rows = np.arange(height) * frame.shape[0] // height
+                cols = np.arange(width) * frame.shape[1] // width
+                self.indices = np.ix_(rows, cols, [2, 1, 0])
+            out[:] = frame[self.indices]
+
+    def latest(self):
+        """
+            Takes the newest frame if there is one the display has not seen.
+            Returns (view, stamp, seq) or None. The view stays valid until the next call.
+        """
+        with self.lock:
+            if not self.fresh:
+                return None
+            self.front, self.ready = self.ready, self.front
+            self.fresh = False
+        front = self.front
+        self.displayed += 1
+        self.latency = time.perf_counter() - self.stamps[front]
+        self.maxLatency = max(self.maxLatency, self.latency)
+        return self.buffers[front], self.stamps[front], int(self.seqs[front])
+
+    @property
+    def dropped(self):
+        return max(self.captured - self.displayed, 0)
+
+
+class CameraView:
+    """
+        Shows a CameraPipeline on a Tk canvas with a single reused PhotoImage,
+        refreshed from the Tk main loop with after() at up to fps frames per second.
+    """
+    def __init__(self, canvas, pipeline, fps=20):
+        self.canvas = canvas
+        self.pipeline = pipeline
+        self.interval = int(1000 / fps)
+        width, height = pipeline.size
+        self.photo = ImageTk.PhotoImage("RGB", (width, height))
+        self.item = canvas.create_image(0, 0, image=self.photo, anchor="center")
+        self.job = None
+        canvas.bind("<Configure>", self.center)
+
+    def center(self, event=None):
+        self.canvas.coords(self.item, self.canvas.winfo_width() // 2, self.canvas.winfo_height() // 2)
+
+    def start(self):
+        if self.job is None:
+            self.center()
+            self.tick()
+
+    def stop(self):
+        if self.job is not None:
+            self.canvas.after_cancel(self.job)
+            self.job = None
+        self.canvas.delete(self.item)
+
+    def tick(self):
+        frame = self.pipeline.latest()
+        if frame is not None:
+            view, stamp, seq = frame
+            width, height = self.pipeline.size
+            # frombuffer no copia: paste escribe directo del buffer a la imagen de Tk
+            self.photo.paste(Image.frombuffer("RGB", (width, height), view, "raw", "RGB", 0, 1))
+        self.job = self.canvas.after(self.interval, self.tick)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba del pipeline de cámara sin interfaz")
+    parser.add_argument("source", nargs="?", default="synthetic",
+                        help='"synthetic", índice de cámara o archivo de video')
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--display", type=float, default=20.0, help="Frecuencia del consumidor [Hz]")
+    parser.add_argument("--size", type=int, nargs=2, default=[320, 240])
+    args = parser.parse_args()
+
+    source = openSource(args.source)
+    if source is None:
+        raise SystemExit(1)
+    pipeline = CameraPipeline(source, tuple(args.size)).start()
+    latencies = []
+    end = time.perf_counter() + args.seconds
+    while time.perf_counter() < end and pipeline.running:
+        if pipeline.latest() is not None:
+            latencies.append(pipeline.latency)
+        time.sleep(1.0 / args.display)
+    pipeline.stop()
+
+    latencies = np.array(latencies) * 1e3
+    print(f"Capturados {pipeline.captured}, mostrados {pipeline.displayed}, descartados {pipeline.dropped}"
+          + (f", omitidos en la cámara {pipeline.skipped}" if pipeline.live else ""))
+    if latencies.size:
+        print(f"Latencia captura -> display: mediana {np.median(latencies):.2f} ms, "
+              f"p99 {np.percentile(latencies, 99):.2f} ms, máx {latencies.max():.2f} ms")
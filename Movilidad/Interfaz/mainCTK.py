@@ -1,4 +1,5 @@
 import os
+import argparse
 import customtkinter as CTk
 from PIL import Image, ImageTk
 from movilidadCTK import MovilidadTab
@@ -7,13 +8,19 @@ from movilidadCTK import MovilidadTab
 
 class roverNQApp:
     """GUI application for controlling the embedded systems of the Rover NAVT QAVAH."""
-    def __init__(self, root, bg="dark slate gray"):
+    def __init__(self, root, bg="dark slate gray", replayPath=None, replaySpeed=1.0, configPath=None, cameraSource=0,
+                 serverAddress=None):
         """Initialize the roverNQApp instance."""
         self.root = root
+        self.replayPath = replayPath    # Sesión grabada a reproducir (None: Tivas reales)
+        self.replaySpeed = replaySpeed
+        self.configPath = configPath    # config.json de las Tivas (None: el de Servidor)
+        self.cameraSource = cameraSource  # Índice de cámara, archivo de video o "synthetic"
+        self.serverAddress = serverAddress  # Demonio server.py al que conectarse (None: abrir las Tivas)
         self.root.configure(bg=bg)
         self.root.title("Rover NAVT QAVAH")
         
-        self.path = os.path.join("Recursos", "Logo Rover NAVT QAVAH.png")
+        self.path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Recursos", "Logo Rover NAVT QAVAH.png")
         
         # Add an icon to the window
         self.icon = ImageTk.PhotoImage(file=self.path)
@@ -52,7 +59,8 @@ class roverNQApp:
         # Mobility tab
         self.notebook.add("Movilidad")
         mobility_tab = self.notebook.tab("Movilidad")  # Access the tab as a frame
-        self.movilityObj = MovilidadTab(mobility_tab)  # Initialize mobility tab layout using MovilidadTab class
+        self.movilityObj = MovilidadTab(mobility_tab, self.replayPath, self.replaySpeed, self.configPath,
+                                        self.cameraSource, self.serverAddress)  # Initialize mobility tab layout using MovilidadTab class
 
         # Arm tab
         self.notebook.add("Brazo")
@@ -77,13 +85,23 @@ class roverNQApp:
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rover NAVT QAVAH")
+    parser.add_argument("--replay", help="Reproducir una sesión grabada (.rnq) en lugar de conectar las Tivas")
+    parser.add_argument("--speed", type=float, default=1.0, help="Velocidad de reproducción (0 = máxima)")
+    parser.add_argument("--config", help="Archivo de configuración de las Tivas (se recarga al cambiar)")
+    parser.add_argument("--camera", default="0", help='Índice de cámara, archivo de video o "synthetic"')
+    parser.add_argument("--attach", metavar="ADDRESS",
+                        help='Conectarse a un demonio server.py ("host:puerto" o socket Unix) en lugar de abrir las Tivas')
+    args = parser.parse_args()
+
     # Setup customtkinter appearance
     CTk.set_appearance_mode("Dark")  # Options: "System", "Light", "Dark"
     CTk.set_default_color_theme("dark-blue")  # Options: "blue", "green", "dark-blue"
 
     # Create the root window
     root = CTk.CTk()
-    app = roverNQApp(root)
+    app = roverNQApp(root, replayPath=args.replay, replaySpeed=args.speed, configPath=args.config,
+                     cameraSource=args.camera, serverAddress=args.attach)
 
 
     # Start the main loop
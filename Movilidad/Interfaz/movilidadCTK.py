@@ -1,6 +1,7 @@
 import customtkinter as CTk
 import tkinter as tk
 from tkinter import ttk
+from tkinter import filedialog
 import threading
 from matplotlib.figure import Figure
 import matplotlib.pyplot as plt
@@ -8,39 +9,75 @@ import numpy as np
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from utilities import *
 from controller import *
+from timeseries import TimeSeriesStore, RingBuffer
+from renderer import BlitRenderer
+from replay import ReplaySystem
+from remote import RemoteSystem
+from config import DEFAULT_PATH as DEFAULT_CONFIG
+from odometry import Odometry
+from camera import CameraPipeline, CameraView, openSource
 
 
 class MovilidadTab:
     """Class for managing the layout and functionality of the Mobility tab."""
-    def __init__(self, parent):
-        """Initialize the Mobility tab layout."""
+    def __init__(self, parent, replayPath=None, replaySpeed=1.0, configPath=None, cameraSource=0,
+                 serverAddress=None):
+        """
+            Initialize the Mobility tab layout.
+
+            Args:
+                replayPath (str): Recorded session to play back instead of connecting to the boards.
+                replaySpeed (float): Playback speed (1 = real time, 0 = as fast as possible).
+                configPath (str): Boards and PID config, reloaded on change (default: Servidor/config.json).
+                cameraSource: Camera index, video file or "synthetic" for the Cámara panel.
+                serverAddress (str): Attach to a running server.py daemon ("host:port" or Unix socket)
+                    instead of opening the boards; closing the GUI leaves the daemon running.
+        """
         self.parent = parent            # Objeto al que pertenece
         self.running = False            # Estado del boton running
         self.cameraState = False        # Estado de la cámara
         self.plotState = False
-        self.cap = None                 # Objeto de captura de OpenCV
+        self.cap = None                 # CameraPipeline: captura en su propio hilo, sólo el último cuadro
+        self.cameraView = None          # Muestra self.cap en cameraCanvas con after()
+        self.cameraSource = cameraSource
         self.canvas = None
+        self.renderer = None            # Dibujo incremental (blitting) de las gráficas
         self.viewOptions = ["General", "Motor 1", "Motor 2", "Motor 3", "Motor 4", "Motor 5", "Motor 6"]
         self.graphsFrame = None
         self.tolerance = 0.02
-        self.speed = []
-        self.sp = []
-        self.plotData = {i: {
-                            "velocidad": [],
-                            "error": [],
-                            "PID": [],
-                            "proporcional": [],
-                            "integral": [],
-                            "derivativo": []
-                        } for i in range(1, 7)}
         self.defaultValues = [0,0,0,0,0,0]
-        self.maxPoints = 1000
-        self.timeData = []
+        self.frame = None               # Copia preasignada de la instantánea de telemetría
+        self.sampleRate = 100           # Frecuencia de adquisición [Hz]
+        self.frameRate = 25             # Frecuencia de refresco de las gráficas [FPS]
+        self.historySeconds = 60        # Historial guardado (memoria constante)
+        self.windowSeconds = 10         # Ventana visible en las gráficas
+        self.maxPoints = self.sampleRate * self.historySeconds
+        self.windowPoints = self.sampleRate * self.windowSeconds
+        self.spValue = 0.0              # Setpoint leído de la interfaz en el hilo de Tk
+        self.thread = None
+        self.renderJob = None           # Siguiente renderTick programado con after()
+        self.plotData = TimeSeriesStore(self.maxPoints)  # Tiempo, SP, velocidad y telemetría de los 6 motores
+        self.odometry = Odometry()      # Pose integrada por lotes a la frecuencia de adquisición
+        self.odometryTotal = 0          # Muestras de plotData ya integradas
+        self.trailPoints = 3000         # Últimas poses dibujadas (memoria constante)
+        self.trail = RingBuffer(self.trailPoints, 2)
+        self.poseText = None            # Último texto de X/Y/Theta/Speed (sólo se escribe si cambia)
+        self.odometryReset = None       # plotData.total al saltar la reproducción (la pose se reinicia)
+        self.seekSlider = None          # Barra de la sesión (sólo en modo reproducción)
+        self.seekDragging = False       # El usuario arrastra la barra: no moverla con la reproducción
+        self.seekText = None
+        self.replaySeeks = 0            # Saltos de la reproducción ya reflejados en plotData
         self.currTime = 0
         self.prevTime = time.time()
         # Crear el objeto del controlador y cargar la configuración desde el archivo JSON
-        self.movilidad = MotorControllerSystem()
-        self.movilidad.jsonConfig("Custom Tkinter\\config.json")
+        if replayPath is not None:
+            self.movilidad = ReplaySystem(replayPath, speed=replaySpeed)
+        elif serverAddress is not None:
+            self.movilidad = RemoteSystem(serverAddress)
+        else:
+            self.movilidad = MotorControllerSystem()
+            self.movilidad.jsonConfig(configPath or DEFAULT_CONFIG, watch=True)
+        self.movilidad.metrics.tolerance = self.tolerance  # Misma banda que la gráfica SP vs PV
 
         # Divide into left and right sections
         leftFrame = CTk.CTkFrame(parent)
@@ -88,18 +125,37 @@ class MovilidadTab:
         self.connectionCanvas.grid(row=0, column=1, padx=10, pady=5)
         self.connection_indicator = self.connectionCanvas.create_oval(5, 5, 24, 24, fill="red", outline="")
 
+        # Estadísticas del enlace serial (se refrescan junto con el indicador)
+        self.linkLabel = CTk.CTkLabel(connectFrame, text="", font=("Arial", 11), justify="left")
+        self.linkLabel.grid(row=0, column=2, padx=5, pady=5, sticky="w")
+        self.updateLinkStats()
+
         # Botón Start
         self.startButton = CTk.CTkButton(controlsFrame, text="Start", width=5, command=self.startToggle)
         self.startButton.grid(row=1, column=0, pady=5, padx=10, sticky="ew")
 
         # Botón Save
-        self.saveButton = CTk.CTkButton(controlsFrame, text="Save", width=5)
+        self.saveButton = CTk.CTkButton(controlsFrame, text="Save", width=5, command=self.toggleRecording)
         self.saveButton.grid(row=1, column=1, pady=5, padx=10, sticky="ew")
 
         # Botón de Ajustes
         self.settingsButton = CTk.CTkButton(controlsFrame, text="Ajustes", width=10, command=self.openSettings)
         self.settingsButton.grid(row=2, column=0, columnspan=2, pady=10, padx=10, sticky="ew")
 
+        # Barra para recorrer la sesión reproducida
+        if isinstance(self.movilidad, ReplaySystem):
+            seekFrame = CTk.CTkFrame(controlsFrame, fg_color=controlsFrame.cget('fg_color'))
+            seekFrame.grid(row=3, column=0, columnspan=2, pady=5, padx=10, sticky="ew")
+            self.seekSlider = CTk.CTkSlider(seekFrame, from_=0, to=max(self.movilidad.duration, 1e-3),
+                                            command=self.seekReplay)
+            self.seekSlider.set(0)
+            self.seekSlider.pack(side="left", fill="x", expand=True)
+            self.seekSlider.bind("<ButtonPress-1>", lambda event: setattr(self, "seekDragging", True), add="+")
+            self.seekSlider.bind("<ButtonRelease-1>", lambda event: setattr(self, "seekDragging", False), add="+")
+            self.seekLabel = CTk.CTkLabel(seekFrame, text="", font=("Arial", 11))
+            self.seekLabel.pack(side="left", padx=5)
+            self.updateSeek()
+
         # Crear el frame que simula el LabelFrame para "Indicadores"
         indicatorsFrame = CTk.CTkFrame(frame)
         indicatorsFrame.grid(row=0, column=1, sticky="ne", padx=10, pady=5)
@@ -165,19 +221,19 @@ class MovilidadTab:
         self.xEntry = CTk.CTkEntry(indicatorsFrame2, width=50, state="readonly") 
         self.xEntry.grid(row=1, column=1, padx=5, pady=5, sticky="ew")  # Centrado horizontal
 
-        CTk.CTkLabel(indicatorsFrame2, text="Theta:").grid(row=1, column=2, padx=5, pady=5, sticky="e")
+        CTk.CTkLabel(indicatorsFrame2, text="Y:").grid(row=1, column=2, padx=5, pady=5, sticky="e")
         self.yEntry = CTk.CTkEntry(indicatorsFrame2, width=50, state="readonly")
         self.yEntry.grid(row=1, column=3, padx=5, pady=5, sticky="ew")
 
         CTk.CTkLabel(indicatorsFrame2, text="Theta:").grid(row=1, column=4, padx=5, pady=5, sticky="e")
-        self.velEntry = CTk.CTkEntry(indicatorsFrame2, width=50, state="readonly")  # Aumentar el tamaño del Entry
-        self.velEntry.grid(row=1, column=5, padx=5, pady=5, sticky="ew")
-
-        CTk.CTkLabel(indicatorsFrame2, text="Y:").grid(row=2, column=0, padx=5, pady=5, sticky="e")
         self.thetaEntry = CTk.CTkEntry(indicatorsFrame2, width=50, state="readonly")  # Aumentar el tamaño del Entry
-        self.thetaEntry.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
+        self.thetaEntry.grid(row=1, column=5, padx=5, pady=5, sticky="ew")
+
+        CTk.CTkLabel(indicatorsFrame2, text="Speed:").grid(row=2, column=0, padx=5, pady=5, sticky="e")
+        self.velEntry = CTk.CTkEntry(indicatorsFrame2, width=50, state="readonly")  # Aumentar el tamaño del Entry
+        self.velEntry.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
 
-        CTk.CTkLabel(indicatorsFrame2, text="Speed:").grid(row=2, column=2, padx=5, pady=5, sticky="e")
+        CTk.CTkLabel(indicatorsFrame2, text="Temp:").grid(row=2, column=2, padx=5, pady=5, sticky="e")
         self.tempEntry = CTk.CTkEntry(indicatorsFrame2, width=50, state="readonly")  # Aumentar el tamaño del Entry
         self.tempEntry.grid(row=2, column=3, padx=5, pady=5, sticky="ew")
 
@@ -240,6 +296,10 @@ class MovilidadTab:
         self.checkbox2.pack_forget()
         self.checkbox3.pack_forget()
         
+        # Step-response metrics of the selected motor (computed frame by frame in the backend)
+        self.metricsLabel = CTk.CTkLabel(frame, text="", font=("Arial", 11), justify="left", anchor="w")
+        self.metricsLabel.pack(side="bottom", fill="x", padx=10)
+
         # Graph section
         self.graphsFrame = CTk.CTkFrame(frame)
         self.graphsFrame.pack(fill="both", expand=True)
@@ -251,9 +311,7 @@ class MovilidadTab:
         # Esta función se ejecutará cada vez que cambie el valor de rpmVar
         try:
             rpm = self.rpmVar.get()
-            for control in self.movilidad.controllers:
-                for m in control.motors:
-                    m.updateParams(setPoint=rpm)
+            self.movilidad.broadcastSetPoint(rpm)
         except:
             print("Error al obtener la velocidad.")
     
@@ -276,6 +334,7 @@ class MovilidadTab:
         """
         # Destroy the previous canvas to clear the window for new plots
         if self.canvas is not None:
+            self.renderer.disconnect()
             self.canvas.get_tk_widget().destroy()
             
         # Create the plots based on the control mode
@@ -288,6 +347,7 @@ class MovilidadTab:
 
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.graphsFrame)
         self.canvas.get_tk_widget().pack(fill=CTk.BOTH, expand=True) 
+        self.renderer = BlitRenderer(self.canvas, self.dynamicLines)
     
     def controlPlot(self):
         """
@@ -371,6 +431,8 @@ class MovilidadTab:
                 self.ax[idx].legend(loc='upper left', bbox_to_anchor=(1, 1), fancybox=True, shadow=True)
                 idx += 1  # Avanzar al siguiente eje
 
+        # Every line in the control plots changes with the data
+        self.dynamicLines = [line for ax in self.fig.axes for line in ax.get_lines()]
         
     def odometryPlot(self):
         """
@@ -398,7 +460,7 @@ class MovilidadTab:
         self.fig.subplots_adjust(hspace=1, right=0.75)
 
         # Plot 1: Speed vs Time
-        self.odometryLine, = self.ax4.plot([], [], label="Position", linestyle=':')
+        self.odometryLine, = self.ax4.plot(*self.trail.window(), label="Position", linestyle=':')
         self.ax4.axhline(0, color="black", linewidth=1)  # Central horizontal axis
         self.ax4.axvline(0, color="black", linewidth=1)  # Central vertical axis
         self.ax4.set_xlim(-5,5)
@@ -409,6 +471,7 @@ class MovilidadTab:
         self.ax4.grid("minor", linestyle = ':', linewidth = 0.5)    
         #self.ax1.legend(loc='upper left', bbox_to_anchor=(1, 1), fancybox=True, shadow=True)
         self.ax4.legend(loc='lower left', bbox_to_anchor=(1, 1), fancybox=True, shadow=True)        
+        self.dynamicLines = [self.odometryLine]
 
         
     def toggleGraph(self, state):
@@ -426,10 +489,27 @@ class MovilidadTab:
             self.checkbox3.pack_forget()
             self.createPlots()  # Llamar a la función de odometría
     
+    def toggleRecording(self):
+        """Start or stop saving every telemetry frame of the session to disk."""
+        if self.movilidad.recorder is None:
+            path = filedialog.asksaveasfilename(
+                defaultextension=".rnq",
+                initialfile=time.strftime("sesion_%Y%m%d_%H%M%S.rnq"),
+                filetypes=[("Sesión del rover", "*.rnq")]
+            )
+            if not path:
+                return
+            self.movilidad.startRecording(path)
+            self.saveButton.configure(text="Saving")
+        else:
+            self.movilidad.stopRecording()
+            self.saveButton.configure(text="Save")
+
     def toggleCamera(self, state):
+        self.cameraState = state
         if self.running:
             if state:
-                self.startThreads()
+                self.startCamera()
             else:
                 self.stopCamera()
             
@@ -505,6 +585,7 @@ class MovilidadTab:
         """Acción para el botón de enviar datos."""
         # Obtener el índice del motor
         self.tolerance = self.tolerance_var.get()
+        self.movilidad.metrics.tolerance = self.tolerance
         motorIdx = int(self.settingsVar.get().split(' ')[1])  # Extrae el índice del texto
         motor = self.movilidad.getMotor(motorIdx)  # Obtener el motor correspondiente
         tiva =  self.movilidad.getMotorController(motorIdx)
@@ -573,79 +654,206 @@ class MovilidadTab:
 
         
     def startThreads(self):
-        """Inicia el hilo para actualizar los datos."""
-        if self.running:
+        """Inicia el hilo de adquisición y el refresco de las gráficas."""
+        if self.running and not (self.thread and self.thread.is_alive()):
             self.thread = threading.Thread(target=self.updateData)
             self.thread.daemon = True  # Permite que el programa termine aunque el hilo siga activo
             self.thread.start()
+            if isinstance(self.movilidad, ReplaySystem):
+                self.movilidad.play()
+            self.nextRender = time.perf_counter()
+            self.renderTick()
+            if self.cameraState:
+                self.startCamera()
             print("Hilo de actualización iniciado.")
             
     def stopThreads(self):
         """Detiene el hilo de actualización."""
         if not self.running:
+            if isinstance(self.movilidad, ReplaySystem):
+                self.movilidad.pause()
+            if self.renderJob:
+                self.parent.after_cancel(self.renderJob)
+                self.renderJob = None
+            self.movilidad.heartbeat(False)  # Detenido a propósito: no es un congelamiento
+            self.stopCamera()
             if self.thread:
                 self.thread.join()  # Espera a que el hilo termine
                 print("Hilo de actualización detenido.")
 
+    def updateLinkStats(self):
+        """Refresh the connection indicator and the link panel next to it (Tk thread, once per second)."""
+        color = "green" if self.movilidad.isConnected() else "red"
+        self.connectionCanvas.itemconfig(self.connection_indicator, fill=color)
+        stats = self.movilidad.stats().values()
+        if stats:
+            rate = sum(s["rate"] for s in stats) / len(stats)
+            rtt = max(s["rttP99"] for s in stats)
+            errors = sum(s["shortReads"] + s["errors"] + s["streamLost"] for s in stats)
+            reconnects = sum(s["reconnects"] for s in stats)
+            stops = self.movilidad.watchdogStats().get("stops", 0)
+            self.linkLabel.configure(text=f"{rate:.0f} Hz · RTT p99 {rtt * 1e3:.1f} ms\n"
+                                          f"Errores {errors} · Reconexiones {reconnects} · Paros {stops}")
+        else:
+            self.linkLabel.configure(text="Sin Tivas")
+        self.parent.after(1000, self.updateLinkStats)
+
+    def startCamera(self):
+        """Start the capture thread and its display on cameraCanvas (no-op if already running)."""
+        if self.cap is not None:
+            return
+        source = openSource(self.cameraSource)
+        if source is None:
+            return
+        self.cap = CameraPipeline(source).start()
+        self.cameraView = CameraView(self.cameraCanvas, self.cap)
+        self.cameraView.start()
+
     def stopCamera(self):
         """Stop the camera feed."""
+        if self.cameraView:
+            self.cameraView.stop()
+            self.cameraView = None
         if self.cap:
-            self.cap.release()  # Libera la cámara
+            self.cap.stop()  # Termina el hilo de captura y libera la cámara
             self.cap = None
         self.cameraCanvas.delete("all")  # Limpia el CTkCanvas
 
     def updateData(self):
-        self.start_time = time.time()  # Momento inicial de la ejecución
+        """
+            Acquisition stage: samples the telemetry into plotData at sampleRate.
+
+            Uses absolute time.perf_counter deadlines, so the time spent sampling does not
+            add up as drift. Never touches Tk; the plots are refreshed by renderTick.
+        """
+        self.start_time = time.perf_counter()  # Momento inicial de la ejecución
+        period = 1.0 / self.sampleRate
+        deadline = self.start_time
 
         while self.running:
             try:
-                # Gets every current motor value
-                data = self.movilidad.getAllValues()
-                
-                # Saves interface data
-                try: 
-                    self.sp.append(float(self.rpmVar.get()))
-                except:
-                    if self.sp:  # Verifica que el arreglo no esté vacío
-                        self.sp.append(self.sp[-1])  # Usa el último valor si existe
-                    else:
-                        self.sp.append(0.0)  # Valor predeterminado si no hay elementos previos
-                
-                # Gets current time.
-                #self.currTime = self.currTime+1
-                #self.timeData.append(self.currTime)
-                #self.prevTime = self.currTime
-                
-                current_time = time.time()  # Tiempo actual en segundos
-                elapsed_time = current_time - self.start_time  # Tiempo transcurrido desde el inicio
-                self.timeData.append(elapsed_time)
-                
-                tempSpeed = 0
-                speedIdx = 0
-                # Saves the data in an aray to plot it, and another to save every data.
-                for idx in range(1, 7):  # Procesar todos los motores del 1 al 6
-                    values = data.get(idx, self.defaultValues)  # Obtener valores del motor o usar los predeterminados
-                    # Actualizar cada tipo de dato
-                    self.plotData[idx]["velocidad"].append(values[0])
-                    self.plotData[idx]["error"].append(values[1])
-                    self.plotData[idx]["PID"].append(values[2])
-                    self.plotData[idx]["proporcional"].append(values[3])
-                    self.plotData[idx]["integral"].append(values[4])
-                    self.plotData[idx]["derivativo"].append(values[5])
-                    if values[0] > 0:
-                        tempSpeed = tempSpeed+values[0]
-                        speedIdx = speedIdx+1
-                
-                if speedIdx == 0:
-                    self.speed.append(0)
+                self.acquireSample()
+                deadline += period
+                delay = deadline - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
                 else:
-                    self.speed.append(tempSpeed/speedIdx)
-                    
-                self.updateGraphs()
-                time.sleep(0.1)
+                    deadline = time.perf_counter()  # Atrasado: no intentar recuperar en ráfaga
             except KeyboardInterrupt:
                 self.movilidad.stopAll()
+
+    def acquireSample(self):
+        """Saves one sample of every motor into the ring buffer."""
+        # Gets a consistent copy of every motor value (no torn frames)
+        self.frame = self.movilidad.getSnapshot(self.frame)
+        if isinstance(self.movilidad, ReplaySystem):
+            if self.movilidad.seeks != self.replaySeeks:
+                # La reproducción saltó: las gráficas y la pose empiezan desde el nuevo punto
+                self.replaySeeks = self.movilidad.seeks
+                self.plotData.clear()
+                self.odometryReset = self.plotData.total
+            elapsed_time = self.movilidad.elapsed  # Tiempo de la sesión grabada, a cualquier --speed
+        else:
+            elapsed_time = time.perf_counter() - self.start_time  # Tiempo transcurrido desde el inicio
+        
+        # Velocidad promedio de los motores que están girando
+        rpm = self.frame[:6, 0]
+        moving = rpm[rpm > 0]
+        speed = moving.mean() if moving.size else 0.0
+        
+        # Saves every motor value (rows 1 to 6) in the ring buffer
+        self.plotData.append(elapsed_time, self.spValue, speed, self.frame[:6, :6])
+
+    def renderTick(self):
+        """Render stage: runs on the Tk main loop at frameRate while the tab is running."""
+        if not self.running:
+            return
+        # Saves interface data (Tk variables are only read from this thread)
+        try: 
+            self.spValue = float(self.rpmVar.get())
+        except:
+            pass  # Conserva el último valor válido
+        
+        # Latido para el watchdog: si el lazo de Tk se congela, los motores se detienen
+        self.movilidad.heartbeat()
+        self.updateOdometry()
+        if self.plotState and len(self.plotData):
+            self.updateGraphs()
+        self.updateMetrics()
+        self.updateSeek()
+        
+        # Siguiente cuadro con límite absoluto para no acumular el tiempo de dibujo
+        self.nextRender += 1.0 / self.frameRate
+        delay = self.nextRender - time.perf_counter()
+        if delay < 0:
+            self.nextRender = time.perf_counter()
+            delay = 0
+        self.renderJob = self.parent.after(int(delay * 1000), self.renderTick)
     
+    def updateOdometry(self):
+        """
+            Integrates every sample acquired since the last frame (one vectorized batch),
+            appends the poses to the bounded trail and refreshes the odometry plot and entries.
+        """
+        if self.odometryReset is not None:
+            self.odometryTotal, self.odometryReset = self.odometryReset, None
+            self.odometry.reset()
+            self.trail.clear()
+        block = self.plotData.since(self.odometryTotal)
+        if block.shape[1] == 0:
+            return
+        self.odometryTotal += block.shape[1]
+        x, y, theta = self.odometry.integrate(block[self.plotData.index["tiempo"]],
+                                              block[self.plotData.rows("velocidad")])
+        self.trail.extend((x, y))
+
+        if not self.plotState:
+            self.odometryLine.set_data(*self.trail.window())
+            self.renderer.render()
+
+        pose = (f"{self.odometry.x:.2f}", f"{self.odometry.y:.2f}",
+                f"{np.degrees(self.odometry.theta):.1f}", f"{self.odometry.speed:.2f}")
+        if pose != self.poseText:
+            self.poseText = pose
+            for entry, text in zip((self.xEntry, self.yEntry, self.thetaEntry, self.velEntry), pose):
+                entry.configure(state="normal")
+                entry.delete(0, "end")
+                entry.insert(0, text)
+                entry.configure(state="readonly")
+
+    def seekReplay(self, value):
+        """Jump the replay to value seconds into the session (seek slider callback)."""
+        self.movilidad.seek(self.movilidad.session.start + float(value))
+        if self.running:
+            self.movilidad.play()   # Sigue reproduciendo aunque ya hubiera llegado al final
+        self.updateSeek(float(value))
+
+    def updateSeek(self, elapsed=None):
+        """Move the seek slider with the playback (unless it is being dragged) and show the position."""
+        if self.seekSlider is None:
+            return
+        if elapsed is None:
+            elapsed = self.movilidad.elapsed
+            if not self.seekDragging:
+                self.seekSlider.set(elapsed)
+        text = f"{elapsed:.1f} / {self.movilidad.duration:.1f} s"
+        if text != self.seekText:
+            self.seekText = text
+            self.seekLabel.configure(text=text)
+
+    def updateMetrics(self):
+        """Show the step-response metrics of the motor selected in the control view."""
+        text = ""
+        if self.plotState and self.viewDropdown.get() != "General":
+            motorIdx = int(self.viewDropdown.get().split(' ')[1])
+            m = self.movilidad.metrics.summary(motorIdx)
+            settling = "--" if m["settlingTime"] != m["settlingTime"] else f"{m['settlingTime']:.2f} s"
+            text = (f"Subida {m['riseTime']:.3f} s · Sobrepaso {m['overshoot']:.1f} % · "
+                    f"Establecimiento {settling} · Error ss {m['steadyError']:.1f} RPM · "
+                    f"IAE {m['iae']:.1f} · ISE {m['ise']:.0f}")
+        if text != self.metricsLabel.cget("text"):
+            self.metricsLabel.configure(text=text)
+
     def startToggle(self):
         """Toggle running button"""
         self.running = not self.running
@@ -693,8 +901,9 @@ class MovilidadTab:
     def updateGraphs(self):
         """
             Updates the data in the plots with the latest values.
-            Limits the data points to 100 for continuous scrolling.
+            Limits the data points to windowPoints for continuous scrolling.
             Handles both closed-loop (PID) and open-loop modes.
+            Runs on the Tk main loop (called from renderTick).
             
             Args:
                 None
@@ -704,39 +913,34 @@ class MovilidadTab:
         """
         
         if self.plotState:
-            limMax = len(self.timeData) # The latest time data length
-            limMin = limMax - 100 if limMax > 100 else 0  # Keep the lastest points index
+            # Zero-copy views of the latest points in the ring buffer
+            n = self.windowPoints
+            timeData = self.plotData.channel("tiempo", n)
+            spData = self.plotData.channel("sp", n)
             
             if self.viewDropdown.get() == "General":
-                self.lineSpeed.set_data(self.timeData[limMin:], self.speed[limMin:])
-                self.lineSetPoint.set_data(self.timeData[limMin:], self.sp[limMin:])
-                self.canvas.draw_idle()  # Redibuja el gráfico en la interfaz Tkinter
+                self.lineSpeed.set_data(timeData, self.plotData.channel("speed", n))
+                self.lineSetPoint.set_data(timeData, spData)
 
             else:
                 motorIdx = int(self.viewDropdown.get().split(' ')[1])
                 if self.plot1.get():
-                    self.lineSpeed.set_data(self.timeData[limMin:], self.plotData[motorIdx]["velocidad"][limMin:])
-                    self.lineSetPoint.set_data(self.timeData[limMin:], self.sp[limMin:])
-                    spData = np.array(self.sp)
-                    self.lineUpper.set_data(self.timeData[limMin:], spData[limMin:]*(1+self.tolerance)) 
-                    self.lineLower.set_data(self.timeData[limMin:], spData[limMin:]*(1-self.tolerance)) 
+                    self.lineSpeed.set_data(timeData, self.plotData.motor(motorIdx, "velocidad", n))
+                    self.lineSetPoint.set_data(timeData, spData)
+                    self.lineUpper.set_data(timeData, spData*(1+self.tolerance)) 
+                    self.lineLower.set_data(timeData, spData*(1-self.tolerance)) 
                     
                 if self.plot2.get():
-                    self.lineManipulation.set_data(self.timeData[limMin:], self.plotData[motorIdx]["PID"][limMin:])
-                    self.lineError.set_data(self.timeData[limMin:], self.plotData[motorIdx]["error"][limMin:])
+                    self.lineManipulation.set_data(timeData, self.plotData.motor(motorIdx, "PID", n))
+                    self.lineError.set_data(timeData, self.plotData.motor(motorIdx, "error", n))
                     
                 if self.plot3.get():
-                    self.lineKp.set_data(self.timeData[limMin:], self.plotData[motorIdx]["proporcional"][limMin:])
-                    self.lineKi.set_data(self.timeData[limMin:], self.plotData[motorIdx]["integral"][limMin:])
-                    self.lineKd.set_data(self.timeData[limMin:], self.plotData[motorIdx]["derivativo"][limMin:])
-
-            if limMax>1:
-                for ax in self.ax:
-                    ax.relim()
-                    ax.set_xlim(self.timeData[limMin], self.timeData[-1])
-                    ax.autoscale_view()
-            #self.canvas.draw_idle()  # Redibuja el gráfico en la interfaz Tkinter
-            self.canvas.draw()
+                    self.lineKp.set_data(timeData, self.plotData.motor(motorIdx, "proporcional", n))
+                    self.lineKi.set_data(timeData, self.plotData.motor(motorIdx, "integral", n))
+                    self.lineKd.set_data(timeData, self.plotData.motor(motorIdx, "derivativo", n))
+
+            # Only the lines are redrawn; axes rescale only if the data leaves them
+            self.renderer.render()
             
             
                 
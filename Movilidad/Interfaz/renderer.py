@@ -0,0 +1,71 @@
+import numpy as np
+
+
+class BlitRenderer:
+    """
+        Incremental renderer for a FigureCanvasTkAgg.
+
+        The static parts of the figure (titles, legends, ticks, twin axes) are drawn once
+        and cached; each frame only restores that background and redraws the line artists.
+        Axis limits change (and force a full redraw) only when the data leaves them.
+        Must be used from the Tk main loop.
+    """
+    def __init__(self, canvas, lines, margin=0.1, lookahead=0.25):
+        self.canvas = canvas
+        self.figure = canvas.figure
+        self.lines = list(lines)
+        self.margin = margin            # Fraction of the y range added when rescaling
+        self.lookahead = lookahead      # Fraction of the x span kept free to the right
+        self.background = None
+        for line in self.lines:
+            line.set_animated(True)
+        self.cid = canvas.mpl_connect("draw_event", self.onDraw)
+
+    def disconnect(self):
+        self.canvas.mpl_disconnect(self.cid)
+
+    def onDraw(self, event):
+        """Full draws (first draw, resize, rescale) refresh the cached background."""
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.drawLines()
+
+    def drawLines(self):
+        for line in self.lines:
+            self.figure.draw_artist(line)
+
+    def updateLimits(self):
+        """Grow the axis limits that the data has left. Returns True if any changed."""
+        changed = False
+        byAxes = {}
+        for line in self.lines:
+            x, y = line.get_data(orig=True)
+            if len(x):
+                byAxes.setdefault(line.axes, []).append((np.asarray(x), np.asarray(y)))
+
+        for ax, data in byAxes.items():
+            xmin = min(x.min() for x, _ in data)
+            xmax = max(x.max() for x, _ in data)
+            ymin = min(np.nanmin(y) for _, y in data)
+            ymax = max(np.nanmax(y) for _, y in data)
+
+            xlo, xhi = ax.get_xlim()
+            if xmin < xlo or xmax > xhi:
+                span = (xmax - xmin) or 1.0
+                ax.set_xlim(xmin, xmax + span * self.lookahead)
+                changed = True
+
+            ylo, yhi = ax.get_ylim()
+            if ymin < ylo or ymax > yhi:
+                pad = (ymax - ymin) * self.margin or 1.0
+                ax.set_ylim(ymin - pad, ymax + pad)
+                changed = True
+        return changed
+
+    def render(self):
+        """Blit the lines, or do a full draw if the limits changed."""
+        if self.updateLimits() or self.background is None:
+            self.canvas.draw()      # Triggers onDraw, which caches the new background
+            return
+        self.canvas.restore_region(self.background)
+        self.drawLines()
+        self.canvas.blit(self.figure.bbox)
@@ -0,0 +1,124 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+        Fixed-capacity circular buffer of samples with several channels.
+
+        Every sample is written twice (at i and i + capacity) so the latest n samples
+        are always a contiguous slice of the backing array: appends are O(1) and
+        windows are zero-copy views. Memory stays constant no matter how long it runs.
+    """
+    def __init__(self, capacity, channels=1, dtype=float):
+        self.capacity = capacity
+        self.data = np.zeros((channels, 2 * capacity), dtype=dtype)
+        self.head = 0       # Next write position
+        self.count = 0      # Valid samples (<= capacity)
+        self.total = 0      # Samples ever appended (consumers use it to find new ones)
+
+    def __len__(self):
+        return self.count
+
+    def append(self, sample):
+        """Append one sample (one value per channel)."""
+        i = self.head
+        self.data[:, i] = sample
+        self.data[:, i + self.capacity] = sample
+        self.head = i + 1 if i + 1 < self.capacity else 0
+        self.count = min(self.count + 1, self.capacity)
+        self.total += 1
+
+    def extend(self, block):
+        """Append a (channels, n) block of samples with one vectorized write."""
+        block = np.asarray(block)
+        self.total += block.shape[1]
+        block = block[:, -self.capacity:]
+        n = block.shape[1]
+        if n == 0:
+            return
+        positions = (self.head + np.arange(n)) % self.capacity
+        self.data[:, positions] = block
+        self.data[:, positions + self.capacity] = block
+        self.head = (self.head + n) % self.capacity
+        self.count = min(self.count + n, self.capacity)
+
+    def window(self, n=None):
+        """View (channels, n) of the latest n samples, oldest first."""
+        n = self.count if n is None else min(n, self.count)
+        end = self.head + self.capacity
+        return self.data[:, end - n:end]
+
+    def last(self):
+        """View of the latest sample, or None if the buffer is empty."""
+        if self.count == 0:
+            return None
+        return self.data[:, self.head + self.capacity - 1]
+
+    def since(self, total):
+        """View of the samples appended after the buffer had total samples (at most capacity)."""
+        return self.window(self.total - total)
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+
+class TimeSeriesStore:
+    """
+        Named channels on top of a single RingBuffer.
+
+        Channels are the global ones (time, setpoint, mean speed) followed by
+        the six telemetry values of each motor, in the same order as Motors.getValues.
+    """
+    GLOBAL_CHANNELS = ["tiempo", "sp", "speed"]
+    MOTOR_CHANNELS = ["velocidad", "error", "PID", "proporcional", "integral", "derivativo"]
+
+    def __init__(self, capacity=1000, motors=6):
+        self.motors = motors
+        names = list(self.GLOBAL_CHANNELS)
+        for idx in range(1, motors + 1):
+            names += [(idx, name) for name in self.MOTOR_CHANNELS]
+        self.index = {name: i for i, name in enumerate(names)}
+        self.buffer = RingBuffer(capacity, len(names))
+        self.sample = np.zeros(len(names))      # Reused for every append
+
+    def __len__(self):
+        return len(self.buffer)
+
+    @property
+    def total(self):
+        """Ticks ever appended; pass it back to since() to get only the new ones."""
+        return self.buffer.total
+
+    def since(self, total):
+        """Zero-copy (channels, n) view of the ticks appended after total, oldest first."""
+        return self.buffer.since(total)
+
+    def rows(self, name):
+        """Rows of a motor channel for every motor, e.g. rows("velocidad") to index since()."""
+        return [self.index[(idx, name)] for idx in range(1, self.motors + 1)]
+
+    def append(self, time, sp, speed, motorValues):
+        """Append one tick. motorValues is a (motors, 6) array, row i is motor i+1."""
+        sample = self.sample
+        sample[0] = time
+        sample[1] = sp
+        sample[2] = speed
+        sample[3:].reshape(self.motors, len(self.MOTOR_CHANNELS))[:] = motorValues
+        self.buffer.append(sample)
+
+    def channel(self, name, n=None):
+        """Zero-copy view of a global channel ("tiempo", "sp", "speed")."""
+        return self.buffer.window(n)[self.index[name]]
+
+    def motor(self, idx, name, n=None):
+        """Zero-copy view of a motor channel, e.g. motor(1, "velocidad")."""
+        return self.buffer.window(n)[self.index[(idx, name)]]
+
+    def clear(self):
+        """Drop every tick (total keeps counting, so since() stays valid)."""
+        self.buffer.clear()
+
+    def last(self, name, default=0.0):
+        sample = self.buffer.last()
+        return default if sample is None else sample[self.index[name]]
@@ -1,3 +1,4 @@
+import os
 import tkinter as tk
 from tkinter import ttk
 from PIL import Image, ImageTk
@@ -7,6 +8,62 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import tkinter as tk
 from PIL import Image, ImageTk  # Asegúrate de importar PIL para el manejo de imágenes
 
+# Recursos junto a este archivo: no depende del directorio desde el que se lance la app
+RESOURCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Recursos")
+SWITCH_SIZE = (40, 40)
+
+
+class ImageCache:
+    """
+    Caché de imágenes de Tk compartida por todo el proceso.
+
+    Cada PNG se decodifica una sola vez y cada variante (asset, tamaño,
+    rotación, tema) se convierte a PhotoImage la primera vez que un widget la
+    pide; después todos los widgets usan la misma. Los temas distintos de
+    "color" agregan su nombre al archivo (switch-on-black.png) y las variantes
+    de derived se obtienen girando otra imagen del mismo tema.
+    """
+    derived = {("switch-off", "black"): ("switch-on", 180)}
+
+    def __init__(self, root=RESOURCES):
+        self.root = root
+        self.sources = {}   # Archivo -> imagen de PIL ya decodificada
+        self.photos = {}    # (asset, tamaño, rotación, tema) -> PhotoImage
+
+    def get(self, asset, size=SWITCH_SIZE, rotation=0, theme="color"):
+        """PhotoImage de asset; lanza FileNotFoundError si el archivo no existe."""
+        key = (asset, tuple(size), rotation % 360, theme)
+        photo = self.photos.get(key)
+        if photo is None:
+            photo = self.photos[key] = ImageTk.PhotoImage(self.render(*key))
+        return photo
+
+    def render(self, asset, size, rotation, theme):
+        if (asset, theme) in self.derived:
+            asset, extra = self.derived[asset, theme]
+            return self.render(asset, size, (rotation + extra) % 360, theme)
+        name = asset + ("" if theme == "color" else f"-{theme}") + ".png"
+        image = self.source(name).resize(size)
+        return image.rotate(rotation, expand=True) if rotation else image
+
+    def source(self, name):
+        image = self.sources.get(name)
+        if image is None:
+            with Image.open(os.path.join(self.root, name)) as file:
+                image = self.sources[name] = file.copy()   # Decodifica y cierra el archivo
+        return image
+
+
+imageCache = ImageCache()
+
+
+def switchImages(color=True, rotation=0):
+    """Imágenes (on, off) de un switch a color o negro, compartidas por todos los switches."""
+    theme = "color" if color else "black"
+    return (imageCache.get("switch-on", SWITCH_SIZE, rotation, theme),
+            imageCache.get("switch-off", SWITCH_SIZE, rotation, theme))
+
+
 class Switch(tk.Frame):
     def __init__(self, parent, color = True, initial_state=False, state = tk.DISABLED, command=None, bg=None, **kwargs):
         """
@@ -26,22 +83,12 @@ class Switch(tk.Frame):
         self.bg = bg
         self.color = color
 
-        # Redimensionar imágenes
+        # Imágenes compartidas (se cargan una vez por proceso, ver ImageCache)
         try:
-            if color:
-                self.on_image = Image.open("Recursos/switch-on.png").resize((40, 40))
-                self.off_image = Image.open("Recursos/switch-off.png").resize((40, 40))
-            else:
-                self.on_image = Image.open("Recursos/switch-on-black.png").resize((40, 40))
-                self.off_image = self.on_image.rotate(180, expand=True)
-
-        except FileNotFoundError:
-            print("Error: Las imágenes no se encuentran en las rutas especificadas.")
+            self.on_image, self.off_image = switchImages(color)
+        except FileNotFoundError as e:
+            print(f"Error: No se encuentra la imagen {e.filename}.")
             return
-
-        # Convertir a formato compatible con Tkinter
-        self.on_image = ImageTk.PhotoImage(self.on_image)
-        self.off_image = ImageTk.PhotoImage(self.off_image)
         
         # Crear botón
         self.button = tk.Button(self, 
@@ -91,22 +138,12 @@ class VerticalSwitch(tk.Frame):
         self.color = color
         
 
-        # Redimensionar imágenes
+        # Imágenes compartidas, giradas 90° (se cargan una vez por proceso, ver ImageCache)
         try:
-            if color:
-                self.on_image = Image.open("Recursos/switch-on.png").resize((40, 40)).rotate(90, expand=True)
-                self.off_image = Image.open("Recursos/switch-off.png").resize((40, 40)).rotate(90, expand=True)
-            else:
-                self.on_image = Image.open("Recursos/switch-on-black.png").resize((40, 40)).rotate(90, expand=True)  
-                self.off_image = self.on_image.rotate(180, expand=True)
-
-        except FileNotFoundError:
-            print("Error: Las imágenes no se encuentran en las rutas especificadas.")
+            self.on_image, self.off_image = switchImages(color, rotation=90)
+        except FileNotFoundError as e:
+            print(f"Error: No se encuentra la imagen {e.filename}.")
             return
-
-        # Convertir a formato compatible con Tkinter
-        self.on_image = ImageTk.PhotoImage(self.on_image)
-        self.off_image = ImageTk.PhotoImage(self.off_image)
         
         # Crear botón
         self.button = tk.Button(self, 
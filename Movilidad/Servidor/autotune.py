@@ -0,0 +1,205 @@
+"""
+Autoajuste de ganancias PID desde el host.
+
+Para cada motor se corre un experimento con el PID de la Tiva en modo P
+(ki = kd = 0) y se registran rpm y la salida pid (la entrada real del
+motor, ya saturada):
+
+    step  : un escalón de setpoint.
+    relay : el setpoint conmuta entre dos niveles cada vez que rpm cruza el
+            punto medio (relevador sobre el setpoint), lo que excita la
+            planta varias veces en el mismo tiempo.
+
+Con esos datos se ajusta un modelo de primer orden con tiempo muerto
+(FOPDT: ganancia K, constante tau y retardo L) por mínimos cuadrados,
+resolviendo todos los retardos candidatos a la vez, y se proponen
+ganancias PI con las reglas SIMC. Cada Tiva corre su experimento en su
+propio hilo, así que ajustar seis motores tarda lo mismo que ajustar uno.
+
+Uso:
+    results = movilidad.autotune(method="relay")
+"""
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from fleet import FIELD_INDEX
+
+# Modelo identificado y ganancias propuestas para un motor
+TuneResult = namedtuple("TuneResult", ["motor", "K", "tau", "L", "fitError", "kp", "ki", "kd"])
+
+
+def fitFOPDT(t, u, y, dt=None, maxDelay=0.25):
+    """
+    Ajusta y' = (K u(t - L) - y) / tau a muestras (t, u, y).
+
+    Las muestras se remuestrean a paso fijo dt y se usa el modelo discreto
+    y[k+1] = a y[k] + b u[k-d] + c. Antes del registro se supone u constante
+    (el motor estaba en reposo). Para todos los retardos d a la vez se arman
+    las ecuaciones normales (arreglo (retardos, 3, 3)) y se resuelven en una
+    sola llamada; se elige el retardo con menor error cuadrático.
+    Regresa (K, tau, L, error relativo) o None si los datos no alcanzan.
+    """
+    t = np.asarray(t, dtype=float)
+    if len(t) < 10:
+        return None
+    if dt is None:
+        dt = float(np.median(np.diff(t)))
+    grid = np.arange(t[0], t[-1], dt)
+    u = np.interp(grid, t, u)
+    y = np.interp(grid, t, y)
+    n = len(grid) - 1
+    delays = min(int(maxDelay / dt), n // 4)
+    if n < 10:
+        return None
+
+    target = y[1:]                                                  # y[k+1]
+    yk = y[:-1]                                                     # y[k]
+    # u[k-d] para cada retardo d: ventanas deslizantes sin copiar
+    history = np.concatenate((np.full(delays, u[0]), u[:-1]))
+    windows = np.lib.stride_tricks.sliding_window_view(history, delays + 1)[:, ::-1]
+    X = np.empty((delays + 1, n, 3))
+    X[:, :, 0] = yk
+    X[:, :, 1] = windows.T
+    X[:, :, 2] = 1.0
+    XtX = np.einsum('dni,dnj->dij', X, X)
+    Xty = np.einsum('dni,n->di', X, target)
+    # Regularización mínima para retardos con columnas casi colineales
+    XtX += np.eye(3) * 1e-12 * np.trace(XtX, axis1=1, axis2=2)[:, None, None]
+    theta = np.linalg.solve(XtX, Xty[..., None])[..., 0]
+    residual = target[None, :] - np.einsum('dni,di->dn', X, theta)
+    sse = np.einsum('dn,dn->d', residual, residual)
+    d = int(np.argmin(sse))
+    a, b, _ = theta[d]
+    if not 0.0 < a < 1.0 or b == 0.0:
+        return None
+    tau = -dt / np.log(a)
+    K = b / (1.0 - a)
+    error = float(np.sqrt(sse[d] / n) / (np.ptp(y) or 1.0))
+    return float(K), float(tau), d * dt, error
+
+
+def simcGains(K, tau, L, tauc=None, firmwareDt=None):
+    """
+    Ganancias PI (SIMC de Skogestad) para el PID u = kp e + ki ∫e dt + kd de/dt.
+    tauc es la constante de tiempo deseada en lazo cerrado (por defecto
+    max(L, tau / 2)). Si la firmware acumula el error por muestra en lugar
+    de integrarlo en el tiempo, firmwareDt es su periodo de control [s].
+    """
+    if tauc is None:
+        tauc = max(L, tau / 2)
+    kp = tau / (K * (tauc + L))
+    ki = kp / min(tau, 4 * (tauc + L))
+    if firmwareDt is not None:
+        ki *= firmwareDt
+    return kp, ki, 0.0
+
+
+class AutoTuner:
+    """Corre los experimentos de una o varias Tivas en paralelo y aplica las ganancias."""
+    def __init__(self, system, method="step", amplitude=100.0, duration=2.0, settle=0.5,
+                 sampleRate=200, experimentKp=None, tauc=None, firmwareDt=None, apply=True):
+        if method not in ("step", "relay"):
+            raise ValueError(f"Método de autoajuste desconocido: {method}")
+        self.system = system
+        self.method = method
+        self.amplitude = amplitude      # Escalón o nivel alto del relevador [rpm]
+        self.duration = duration        # Duración del experimento [s]
+        self.settle = settle            # Espera con setpoint 0 antes de empezar [s]
+        self.sampleRate = sampleRate    # Muestreo del registro [Hz]
+        self.experimentKp = experimentKp  # kp del experimento (None: el kp actual del motor)
+        self.tauc = tauc
+        self.firmwareDt = firmwareDt
+        self.apply = apply
+        self.results = {}
+        self.lock = threading.Lock()
+
+    def run(self, motors=None):
+        """Ajusta los motores dados (por defecto todos). Regresa {motor: TuneResult o None}."""
+        if motors is None:
+            motors = sorted(self.system.motorIndex)
+        byController = {}
+        for idx in motors:
+            controller = self.system.getMotorController(idx)
+            if controller is None:
+                print(f"Can't find motor {idx}")
+                continue
+            byController.setdefault(controller, []).append(idx)
+
+        threads = [threading.Thread(target=self.tuneBoard, args=(indices,), daemon=True)
+                   for indices in byController.values()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return dict(self.results)
+
+    def tuneBoard(self, indices):
+        """Experimento simultáneo de los motores de una Tiva (son lazos independientes)."""
+        motors = {idx: self.system.getMotor(idx) for idx in indices}
+        saved = {idx: motor.getParams() for idx, motor in motors.items()}
+        for idx, motor in motors.items():
+            kp = self.experimentKp or saved[idx][1] or 1.0
+            motor.updateParams(setPoint=0.0, kp=kp, ki=0.0, kd=0.0)
+        time.sleep(self.settle)
+
+        logs = self.record(motors)
+
+        for idx, motor in motors.items():
+            motor.updateParams(setPoint=saved[idx][0])
+            t, u, y = logs[idx]
+            fit = fitFOPDT(t, u, y)
+            if fit is None:
+                print(f"Autoajuste: el motor {idx} no respondió; se conservan sus ganancias.")
+                motor.updateParams(kp=saved[idx][1], ki=saved[idx][2], kd=saved[idx][3])
+                result = None
+            else:
+                K, tau, L, error = fit
+                kp, ki, kd = simcGains(K, tau, L, self.tauc, self.firmwareDt)
+                result = TuneResult(idx, K, tau, L, error, kp, ki, kd)
+                if self.apply:
+                    self.system.updateMotor(idx, kp=kp, ki=ki, kd=kd)
+                else:
+                    motor.updateParams(kp=saved[idx][1], ki=saved[idx][2], kd=saved[idx][3])
+            with self.lock:
+                self.results[idx] = result
+
+    def record(self, motors):
+        """
+        Registra (t, pid, rpm) de cada motor. El primer 10 % del registro es
+        con setpoint 0 para que el ajuste vea el reposo antes del escalón.
+        """
+        fleet = self.system.fleet
+        rows = {idx: motor.row for idx, motor in motors.items()}
+        count = int(self.duration * self.sampleRate)
+        stamps = np.empty(count)
+        samples = {idx: np.empty((count, 2)) for idx in motors}
+        high = {idx: True for idx in motors}
+        columns = [FIELD_INDEX["pid"], FIELD_INDEX["rpm"]]
+        stepAt = count // 10
+
+        period = 1.0 / self.sampleRate
+        start = deadline = time.perf_counter()
+        for k in range(count):
+            if k == stepAt:
+                for motor in motors.values():
+                    motor.updateParams(setPoint=self.amplitude)
+            stamps[k] = time.perf_counter() - start
+            table = fleet.table
+            for idx, row in rows.items():
+                samples[idx][k] = table[row, columns]
+                if self.method == "relay" and k > stepAt:
+                    rpm = samples[idx][k, 1]
+                    if high[idx] and rpm > 0.75 * self.amplitude:
+                        high[idx] = False
+                        motors[idx].updateParams(setPoint=0.25 * self.amplitude)
+                    elif not high[idx] and rpm < 0.5 * self.amplitude:
+                        high[idx] = True
+                        motors[idx].updateParams(setPoint=self.amplitude)
+            deadline += period
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return {idx: (stamps, samples[idx][:, 0], samples[idx][:, 1]) for idx in motors}
@@ -0,0 +1,573 @@
+"""
+Micro-benchmarks del lado del host para el sistema de movilidad.
+
+Uso:
+    python benchmark.py decode
+    python benchmark.py poll --boards 3 30 --seconds 5
+    python benchmark.py poll --baud 1000000 --stream 2000
+    python benchmark.py poll --boards 3 30 --engine asyncio
+    python benchmark.py record
+    python benchmark.py broadcast --boards 3 --engine asyncio
+    python benchmark.py reconnect --engine asyncio
+    python benchmark.py discover --boards 3 30
+    python benchmark.py codec --session sesion.rnq
+    python benchmark.py watchdog --boards 3 --stream 500
+    python benchmark.py drop --drop 0.05 --seconds 10 --engine asyncio
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import types
+
+from controller import Controller, MotorControllerSystem, getNumber, TELEMETRY_FRAME
+
+
+def legacyUpdateValues(motor, data):
+    """Ruta original: seis llamadas a getNumber por motor."""
+    motor.rpm = getNumber(data[0:4], 'f')
+    motor.error = getNumber(data[4:8], 'f')
+    motor.pid = getNumber(data[8:12], 'f')
+    motor.proportional = getNumber(data[12:16], 'f')
+    motor.integral = getNumber(data[16:20], 'f')
+    motor.derivative = getNumber(data[20:24], 'f')
+
+
+def benchDecode(number=200000):
+    """Compara la decodificación por campo contra el Struct precompilado."""
+    data = TELEMETRY_FRAME.pack(*[float(i) for i in range(12)])
+    controller = Controller("BENCH")
+    m1, m2 = types.SimpleNamespace(), types.SimpleNamespace()   # Motors original: atributos en __dict__
+
+    def legacy():
+        legacyUpdateValues(m1, data[0:24])
+        legacyUpdateValues(m2, data[24:48])
+
+    def batched():
+        controller.handleTelemetry(data)
+
+    tLegacy = min(timeit.repeat(legacy, number=number, repeat=3))
+    tBatched = min(timeit.repeat(batched, number=number, repeat=3))
+    print(f"Decodificación de {number} tramas de {TELEMETRY_FRAME.size} bytes")
+    print(f"  getNumber x12   : {tLegacy / number * 1e6:.3f} us/trama")
+    print(f"  Struct('<12f')  : {tBatched / number * 1e6:.3f} us/trama")
+    print(f"  Aceleración     : {tLegacy / tBatched:.1f}x")
+    return tLegacy, tBatched
+
+
+def startSimulatorProcess(boards, *extraArgs):
+    """Lanza simulator.py en otro proceso para no contar su CPU. Regresa (proceso, dispositivos)."""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "simulator.py")
+    proc = subprocess.Popen([sys.executable, script, "--boards", str(boards), *extraArgs],
+                            stdout=subprocess.PIPE, text=True)
+    devices = [proc.stdout.readline().strip() for _ in range(boards)]
+    return proc, devices
+
+
+def benchPoll(boards=3, seconds=5.0, simArgs=(), streamRate=None, engine=None):
+    """
+    Mide tasa de muestreo, periodo de poll y CPU del host contra Tivas simuladas.
+    Con el motor asyncio también verifica que SerialEngine.poll() complete
+    sobre Tivas en poll continuo o streaming sin desalinear el flujo.
+    """
+    proc, devices = startSimulatorProcess(boards, *simArgs)
+    if engine == "asyncio":
+        from engine import SerialEngine
+        system = MotorControllerSystem(engine=SerialEngine())
+    else:
+        system = MotorControllerSystem()
+    try:
+        for device in devices:
+            system.addController(device, streamRate=streamRate)
+        time.sleep(0.5)     # Dejar que los hilos abran los puertos
+        startFrames = [c.frameCount for c in system.controllers]
+        startWall, startCpu = time.perf_counter(), time.process_time()
+        threads = threading.active_count() - 1
+        time.sleep(seconds)
+        wall = time.perf_counter() - startWall
+        cpu = time.process_time() - startCpu
+        frames = [c.frameCount - f for c, f in zip(system.controllers, startFrames)]
+        polled = None
+        if engine == "asyncio":
+            polled = sum(system.engine.submit(system.engine.poll(c)).result(timeout=3)
+                         for c in system.controllers)
+            shortReads = sum(c.linkStats.shortReads for c in system.controllers)
+    finally:
+        system.stopAll()
+        proc.terminate()
+        proc.wait()
+
+    total = sum(frames)
+    perBoard = total / max(len(frames), 1) / wall
+    mode = f"Streaming a {streamRate} Hz" if streamRate else "Poll"
+    print(f"{mode} con {boards} Tivas simuladas durante {wall:.1f} s")
+    print(f"  Muestras/s totales  : {total / wall:.0f}")
+    print(f"  Muestras/s por Tiva : {perBoard:.0f} (periodo {1e3 / perBoard if perBoard else float('inf'):.3f} ms)")
+    print(f"  CPU del host        : {100 * cpu / wall:.1f} %")
+    print(f"  Hilos de E/S        : {threads}")
+    if polled is not None:
+        print(f"  poll() puntual      : {polled}/{len(frames)} (lecturas incompletas {shortReads})")
+    return total / wall, cpu / wall
+
+
+def benchRecord(frames=300000):
+    """Tramas por segundo que acepta SessionRecorder (dos motores por llamada)."""
+    from recorder import SessionRecorder, loadColumns
+    values = [float(i) for i in range(12)]
+    params = [100.0, 52.0, 0.035, 0.05] * 2
+    path = os.path.join(tempfile.mkdtemp(), "bench.rnq")
+    recorder = SessionRecorder(path).start()
+    start = time.perf_counter()
+    for i in range(frames // 2):
+        recorder.recordBoard(i * 1e-3, 1, values, params)
+    recorder.stop()
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(path)
+    assert len(loadColumns(path)["tiempo"]) == recorder.frames
+    print(f"Grabación de {recorder.frames} tramas")
+    print(f"  Tramas/s            : {recorder.frames / elapsed:.0f}")
+    print(f"  Bytes por trama     : {size / recorder.frames:.1f}")
+    print(f"  Esperas por buffer  : {recorder.stalls}")
+    os.remove(path)
+    return recorder.frames / elapsed
+
+
+def benchBroadcast(boards=3, trials=200, engine=None, **simArgs):
+    """
+    Desfase entre Tivas al cambiar el setpoint: cola por Tiva (setAllSetPoints),
+    difusión y difusión en dos fases. Los simuladores corren en este proceso
+    para poder comparar el instante en que cada uno aplica el setpoint.
+    """
+    from simulator import startSimulators
+    import numpy as np
+    sims = startSimulators(boards, **simArgs)
+    if engine == "asyncio":
+        from engine import SerialEngine
+        system = MotorControllerSystem(engine=SerialEngine())
+    else:
+        system = MotorControllerSystem()
+    modes = {
+        "cola por Tiva": lambda rpm: system.setAllSetPoints(rpm),
+        "difusión": lambda rpm: system.broadcastSetPoint(rpm),
+        "dos fases": lambda rpm: system.broadcastSetPoint(rpm, twoPhase=True),
+    }
+    try:
+        for sim in sims:
+            system.addController(sim.device)
+        time.sleep(0.5)
+        print(f"Desfase del setpoint entre {boards} Tivas simuladas ({trials} cambios)")
+        rpm = 0.0
+        for name, send in modes.items():
+            skews = []
+            for _ in range(trials):
+                rpm += 1.0
+                for sim in sims:
+                    sim.applied = 0.0
+                send(rpm)
+                deadline = time.perf_counter() + 1.0
+                while (any(sim.motors[1].setPoint != rpm for sim in sims)
+                       and time.perf_counter() < deadline):
+                    time.sleep(0.0005)
+                applied = [sim.applied for sim in sims]
+                skews.append(max(applied) - min(applied))
+                time.sleep(0.005)
+            skews = np.array(skews) * 1e3
+            print(f"  {name:14s}: mediana {np.median(skews):.3f} ms, p99 {np.percentile(skews, 99):.3f} ms, "
+                  f"máx {skews.max():.3f} ms")
+        print(f"  Desfase de escritura en el host (difusiones): último {system.lastSkew * 1e6:.0f} us, "
+              f"máx {system.maxSkew * 1e6:.0f} us")
+    finally:
+        system.stopAll()
+        for sim in sims:
+            sim.stop()
+
+
+def benchReconnect(boards=3, trials=10, outage=0.5, engine=None):
+    """
+    Tiempo de recuperación tras desconectar y reconectar una Tiva simulada:
+    desde que el puerto reaparece hasta la primera trama, y desde que se
+    detectó la pérdida. También verifica que el setpoint se reenvíe.
+    """
+    from simulator import TivaSimulator
+    import numpy as np
+    folder = tempfile.mkdtemp()
+    sims = [TivaSimulator(link=os.path.join(folder, f"tiva{i}")) for i in range(boards)]
+    for sim in sims:
+        sim.start()
+    if engine == "asyncio":
+        from engine import SerialEngine
+        system = MotorControllerSystem(engine=SerialEngine())
+    else:
+        system = MotorControllerSystem()
+    fromPlug, resumed = [], 0
+    try:
+        for sim in sims:
+            system.addController(sim.device)
+        time.sleep(0.5)
+        for trial in range(trials):
+            sim = sims[trial % boards]
+            controller = system.controllers[trial % boards]
+            controller.m1.updateParams(setPoint=100.0 + trial)
+            time.sleep(0.05)
+            sim.unplug()
+            time.sleep(outage)
+            frames = controller.frameCount
+            start = time.perf_counter()
+            sim.plug()
+            while controller.frameCount == frames and time.perf_counter() - start < 10:
+                time.sleep(0.0005)
+            fromPlug.append(time.perf_counter() - start)
+            time.sleep(0.05)
+            resumed += sim.motors[0].setPoint == 100.0 + trial
+        stats = [c.getStats() for c in system.controllers]
+    finally:
+        system.stopAll()
+        for sim in sims:
+            sim.stop()
+    fromPlug = np.array(fromPlug) * 1e3
+    print(f"Reconexión de {boards} Tivas simuladas ({trials} desconexiones de {outage:.1f} s)")
+    print(f"  Desde que reaparece el puerto : mediana {np.median(fromPlug):.1f} ms, máx {fromPlug.max():.1f} ms")
+    print(f"  Desde que se detectó la pérdida: máx {max(s['maxRecovery'] for s in stats) * 1e3:.1f} ms")
+    print(f"  Reconexiones                   : {sum(s['reconnects'] for s in stats)}")
+    print(f"  Setpoint reenviado             : {resumed}/{trials}")
+
+
+def benchDiscover(boards=3, silent=2, timeout=0.3):
+    """
+    Tiempo de arranque descubriendo Tivas por identidad. Las Tivas simuladas
+    se enumeran en orden aleatorio y hay puertos que no responden (firmware
+    sin consulta de identidad), que son los que agotan el timeout.
+    """
+    import random
+    from simulator import TivaSimulator
+    ids = list(range(1, boards + 1))
+    random.shuffle(ids)
+    sims = [TivaSimulator(boardId=boardId) for boardId in ids]
+    sims += [TivaSimulator() for _ in range(silent)]
+    ports = [sim.start() for sim in sims]
+    random.shuffle(ports)
+    system = MotorControllerSystem()
+    try:
+        start = time.perf_counter()
+        found = system.discover(ports, timeout=timeout)
+        elapsed = time.perf_counter() - start
+        correct = all(sim.device == found.get(sim.boardId) for sim in sims if sim.boardId)
+        mapped = all(system.getMotorController(2 * sim.boardId).COM == sim.device
+                     for sim in sims if sim.boardId)
+    finally:
+        system.stopAll()
+        for sim in sims:
+            sim.stop()
+    print(f"Descubrimiento en {len(ports)} puertos ({boards} Tivas, {silent} sin respuesta)")
+    print(f"  Tiempo de arranque : {elapsed * 1e3:.0f} ms (timeout de consulta {timeout * 1e3:.0f} ms)")
+    print(f"  Tivas encontradas  : {len(found)}/{boards}, identidad correcta: {correct and mapped}")
+    return elapsed
+
+
+def benchTune(boards=3, method="step", gain=1.0, tau=0.15, delay=0.03, engine=None):
+    """
+    Autoajuste de todas las Tivas simuladas: tiempo total (debe ser el de un
+    solo experimento, sin importar el número de Tivas) y modelo identificado
+    contra el verdadero del simulador.
+    """
+    from simulator import startSimulators
+    import numpy as np
+    sims = startSimulators(boards, gain=gain, tau=tau, delay=delay)
+    if engine == "asyncio":
+        from engine import SerialEngine
+        system = MotorControllerSystem(engine=SerialEngine())
+    else:
+        system = MotorControllerSystem()
+    try:
+        for sim in sims:
+            system.addController(sim.device, streamRate=200, batch=True, boardId=sim.boardId)
+        for idx in system.motorIndex:
+            system.getMotor(idx).updateParams(setPoint=0.0, kp=2.0, ki=0.0, kd=0.0)
+        time.sleep(0.5)
+        start = time.perf_counter()
+        results = system.autotune(method=method)
+        elapsed = time.perf_counter() - start
+    finally:
+        system.stopAll()
+        for sim in sims:
+            sim.stop()
+    fits = [result for result in results.values() if result is not None]
+    print(f"Autoajuste ({method}) de {len(results)} motores en {boards} Tivas: {elapsed:.2f} s")
+    print(f"  Identificados : {len(fits)}/{len(results)}")
+    if fits:
+        model = np.array([[r.K, r.tau, r.L] for r in fits])
+        print(f"  K   : {model[:, 0].mean():.3f} ± {model[:, 0].std():.3f} (real {gain})")
+        print(f"  tau : {model[:, 1].mean():.3f} ± {model[:, 1].std():.3f} s (real {tau})")
+        print(f"  L   : {model[:, 2].mean():.3f} ± {model[:, 2].std():.3f} s (real {delay})")
+        print(f"  kp, ki propuestos : {fits[0].kp:.3f}, {fits[0].ki:.3f}")
+    return elapsed
+
+
+def waitFor(condition, timeout=2.0):
+    """Espera a que condition() sea verdadera; regresa el tiempo esperado o None."""
+    start = time.perf_counter()
+    while not condition():
+        if time.perf_counter() - start > timeout:
+            return None
+        time.sleep(0.0005)
+    return time.perf_counter() - start
+
+
+def benchWatchdog(boards=3, trials=5, deadline=0.25, grace=1.0, streamRate=None, engine=None):
+    """
+    Paro por watchdog con los motores girando: cuelga una Tiva simulada y
+    mide cuánto tarda el setpoint 0 en llegar a las demás, desconecta una
+    Tiva más tiempo que la ventana de reconexión y mide lo mismo, y luego
+    deja de mandar latidos del operador. Lo esperado es el plazo (o la
+    ventana) más la latencia del paro; también verifica que una Tiva que se
+    recupera reciba el paro que perdió. Las caídas breves no detienen el
+    rover (ver benchReconnect).
+    """
+    from simulator import TivaSimulator
+    import numpy as np
+    folder = tempfile.mkdtemp()
+    sims = [TivaSimulator(link=os.path.join(folder, f"tiva{i}"), boardId=i + 1) for i in range(boards)]
+    for sim in sims:
+        sim.start()
+    if engine == "asyncio":
+        from engine import SerialEngine
+        system = MotorControllerSystem(engine=SerialEngine())
+    else:
+        system = MotorControllerSystem()
+    system.watchdog.telemetryDeadline = deadline
+    system.watchdog.commandDeadline = deadline
+    system.watchdog.reconnectGrace = grace
+    spinning = lambda group: all(m.setPoint == 100.0 for sim in group for m in sim.motors)
+    stopped = lambda group: all(m.setPoint == 0.0 for sim in group for m in sim.motors)
+    board, unplugged, operator, recovered = [], [], [], 0
+    try:
+        for sim in sims:
+            system.addController(sim.device, streamRate=streamRate, boardId=sim.boardId)
+        time.sleep(0.5)
+        for trial in range(trials):
+            victim = sims[trial % boards]
+            others = [sim for sim in sims if sim is not victim]
+            system.broadcastSetPoint(100.0)
+            waitFor(lambda: spinning(sims))
+            victim.stall()
+            board.append(waitFor(lambda: stopped(others)))
+            victim.resume()
+            if waitFor(lambda: stopped([victim])) is not None:
+                recovered += 1
+        for victim in sims:
+            others = [sim for sim in sims if sim is not victim]
+            system.broadcastSetPoint(100.0)
+            waitFor(lambda: spinning(sims))
+            victim.unplug()
+            unplugged.append(waitFor(lambda: stopped(others), timeout=grace + 2.0))
+            victim.plug()
+            waitFor(lambda: victim.boardId not in system.watchdog.tripped, timeout=3.0)
+        for trial in range(trials):
+            system.broadcastSetPoint(100.0)
+            waitFor(lambda: spinning(sims))
+            system.heartbeat()
+            operator.append(waitFor(lambda: stopped(sims)))
+    finally:
+        system.stopAll()
+        for sim in sims:
+            sim.stop()
+    stats = system.watchdogStats()
+    mode = f"streaming {streamRate} Hz" if streamRate else "poll"
+    print(f"Watchdog con {boards} Tivas simuladas ({mode}), plazo {deadline * 1e3:.0f} ms, "
+          f"ventana de reconexión {grace * 1e3:.0f} ms")
+    for name, times in (("Tiva colgada", board), ("desconectada", unplugged), ("sin operador", operator)):
+        done = np.array([t for t in times if t is not None]) * 1e3
+        print(f"  {name:13}: {len(done)}/{len(times)} paros, hasta el paro "
+              f"mediana {np.median(done):.1f} ms, máx {done.max():.1f} ms" if done.size else
+              f"  {name:13}: 0/{len(times)} paros")
+    print(f"  Paro tras recuperarse : {recovered}/{trials}")
+    print(f"  Latencia del paro     : última {stats['lastLatency'] * 1e3:.2f} ms, "
+          f"máx {stats['maxLatency'] * 1e3:.2f} ms")
+    print(f"  Plazos vencidos       : Tivas {stats['missed']}, operador {stats['operatorMissed']}")
+    return stats["maxLatency"]
+
+
+def benchDrop(boards=3, seconds=10.0, drop=0.05, streamRate=None, engine=None):
+    """
+    Paros falsos del watchdog con bytes perdidos: simulator.py --drop quita un
+    byte de una fracción de las respuestas, así que algunas lecturas quedan
+    incompletas y esperan el timeout de lectura. El enlace sigue sano, así
+    que el watchdog (con su plazo por defecto) no debe detener el rover.
+    """
+    proc, devices = startSimulatorProcess(boards, "--drop", str(drop))
+    if engine == "asyncio":
+        from engine import SerialEngine
+        system = MotorControllerSystem(engine=SerialEngine())
+    else:
+        system = MotorControllerSystem()
+    try:
+        for device in devices:
+            system.addController(device, streamRate=streamRate)
+        time.sleep(0.5)
+        system.broadcastSetPoint(100.0)
+        startFrames = sum(c.frameCount for c in system.controllers)
+        start = time.perf_counter()
+        time.sleep(seconds)
+        wall = time.perf_counter() - start
+        frames = sum(c.frameCount for c in system.controllers) - startFrames
+        shortReads = sum(c.linkStats.shortReads for c in system.controllers)
+        running = all(m.setPoint == 100.0 for c in system.controllers for m in c.motors)
+    finally:
+        system.stopAll()
+        proc.terminate()
+        proc.wait()
+    stats = system.watchdogStats()
+    mode = f"streaming {streamRate} Hz" if streamRate else "poll"
+    print(f"Bytes perdidos ({drop:.0%} de las respuestas) con {boards} Tivas simuladas ({mode}) "
+          f"durante {wall:.1f} s, plazo {system.watchdog.telemetryDeadline * 1e3:.0f} ms")
+    print(f"  Muestras/s totales    : {frames / wall:.0f}")
+    print(f"  Lecturas incompletas  : {shortReads}")
+    print(f"  Paros del watchdog    : {stats['stops']} (plazos vencidos {stats['missed']})")
+    print(f"  Setpoints intactos    : {'sí' if running else 'no'}")
+    return stats["stops"]
+
+
+def sessionFrames(path):
+    """
+    Reconstruye las tramas de flota (n, motores, 6) de una sesión grabada: la
+    i-ésima trama junta la i-ésima muestra de cada motor. Regresa (tiempos, tramas).
+    """
+    from recorder import loadColumns
+    from fleet import VALUE_FIELDS
+    import numpy as np
+    columns = loadColumns(path)
+    motors = np.unique(columns["motor"])
+    rows = [np.flatnonzero(columns["motor"] == motor) for motor in motors]
+    n = min(len(r) for r in rows)
+    frames = np.empty((n, len(motors), len(VALUE_FIELDS)))
+    for m, r in enumerate(rows):
+        for c, name in enumerate(VALUE_FIELDS):
+            frames[:, m, c] = columns[name][r[:n]]
+    return columns["tiempo"][rows[0][:n]], frames
+
+
+def recordSession(boards=3, seconds=5.0):
+    """Graba una sesión contra Tivas simuladas con cambios de setpoint. Regresa la ruta."""
+    from simulator import startSimulators
+    path = os.path.join(tempfile.mkdtemp(), "codec.rnq")
+    sims = startSimulators(boards)
+    system = MotorControllerSystem()
+    try:
+        for sim in sims:
+            system.addController(sim.device, streamRate=500, boardId=sim.boardId)
+        time.sleep(0.5)
+        system.startRecording(path)
+        for step in range(int(seconds)):
+            system.broadcastSetPoint(100.0 * (step % 3))
+            time.sleep(1.0)
+    finally:
+        system.stopAll()
+        for sim in sims:
+            sim.stop()
+    return path
+
+
+def benchCodec(paths=None, keyInterval=100, boards=3, seconds=5.0):
+    """
+    Tasa de compresión y velocidad de codec.py sobre sesiones grabadas (una
+    sesión contra Tivas simuladas si no se da ninguna), con la precisión por
+    defecto y sin pérdida. Verifica que el decodificador reconstruya el flujo.
+    """
+    import zlib
+    import numpy as np
+    from codec import TelemetryEncoder, TelemetryDecoder, DEFAULT_PRECISION
+    if not paths:
+        paths = [recordSession(boards, seconds)]
+    ratio = None
+    for path in paths:
+        stamps, frames = sessionFrames(path)
+        n, motors = frames.shape[:2]
+        raw = frames.astype(np.float32).nbytes + 8 * n
+        print(f"Codec sobre {os.path.basename(path)}: {n} tramas de {motors} motores")
+        print(f"  float32 crudo       : {raw / n:.1f} B/trama")
+        # Referencia comparable a un enlace: zlib en flujo, vaciado en cada trama
+        stream = zlib.compressobj()
+        size = sum(len(stream.compress(frame.astype(np.float32).tobytes()) + stream.flush(zlib.Z_SYNC_FLUSH)) + 8
+                   for frame in frames)
+        print(f"  zlib por trama      : {raw / size:.2f}x")
+        for name, precision in (("precisión por defecto", DEFAULT_PRECISION), ("sin pérdida", {})):
+            encoder = TelemetryEncoder(precision=precision, keyInterval=keyInterval)
+            start = time.perf_counter()
+            encoded = [encoder.encode(stamp, frame) for stamp, frame in zip(stamps.tolist(), frames)]
+            encodeTime = time.perf_counter() - start
+            decoder = TelemetryDecoder()
+            start = time.perf_counter()
+            decoded = [decoder.decode(data) for data in encoded]
+            decodeTime = time.perf_counter() - start
+            for (stamp, values), frame in zip(decoded, frames):
+                assert np.array_equal(values, encoder.layout.values(*encoder.layout.state(frame)))
+            size = sum(len(data) for data in encoded)
+            ratio = raw / size
+            print(f"  {name}:")
+            print(f"    Compresión        : {ratio:.2f}x ({size / n:.1f} B/trama, "
+                  f"{encoder.keyframes} tramas clave)")
+            print(f"    Codificación      : {n / encodeTime:.0f} tramas/s ({raw / encodeTime / 1e6:.1f} MB/s)")
+            print(f"    Decodificación    : {n / decodeTime:.0f} tramas/s ({raw / decodeTime / 1e6:.1f} MB/s)")
+            if precision:
+                error = np.abs(np.array([values for _, values in decoded]) - frames).max(axis=(0, 1))
+                print("    Error máximo      : " + ", ".join(
+                    f"{field} {error[i]:.3g}" for i, field in enumerate(encoder.channels) if field in precision))
+    return ratio
+
+
+BENCHMARKS = {
+    "decode": benchDecode,
+    "poll": benchPoll,
+    "record": benchRecord,
+    "broadcast": benchBroadcast,
+    "reconnect": benchReconnect,
+    "discover": benchDiscover,
+    "tune": benchTune,
+    "codec": benchCodec,
+    "watchdog": benchWatchdog,
+    "drop": benchDrop,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks del sistema de movilidad")
+    parser.add_argument("names", nargs="*", default=list(BENCHMARKS), choices=list(BENCHMARKS))
+    parser.add_argument("--boards", type=int, nargs="+", default=[3])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--baud", type=int, default=None, help="Simular tiempo en el cable")
+    parser.add_argument("--stream", type=int, default=None, help="Frecuencia del modo streaming [Hz]")
+    parser.add_argument("--engine", choices=["threads", "asyncio"], default="threads")
+    parser.add_argument("--session", nargs="+", default=None, help="Sesiones .rnq para el benchmark codec")
+    parser.add_argument("--drop", type=float, default=0.05, help="Fracción de respuestas con un byte perdido")
+    args = parser.parse_args()
+    simArgs = ("--baud", str(args.baud)) if args.baud else ()
+
+    for name in args.names:
+        if name == "poll":
+            for boards in args.boards:
+                benchPoll(boards, args.seconds, simArgs, args.stream, args.engine)
+        elif name == "broadcast":
+            for boards in args.boards:
+                benchBroadcast(boards, engine=args.engine, baudRate=args.baud)
+        elif name == "discover":
+            for boards in args.boards:
+                benchDiscover(boards)
+        elif name == "tune":
+            for boards in args.boards:
+                benchTune(boards, engine=args.engine)
+        elif name == "watchdog":
+            for boards in args.boards:
+                benchWatchdog(boards, streamRate=args.stream, engine=args.engine)
+        elif name == "drop":
+            for boards in args.boards:
+                benchDrop(boards, args.seconds, args.drop, streamRate=args.stream, engine=args.engine)
+        elif name == "codec":
+            benchCodec(args.session, boards=args.boards[0], seconds=args.seconds)
+        elif name == "reconnect":
+            for boards in args.boards:
+                benchReconnect(boards, engine=args.engine)
+        else:
+            BENCHMARKS[name]()
@@ -0,0 +1,216 @@
+"""
+Codificación compacta de la telemetría para enlaces remotos.
+
+Cada trama es una matriz (motores, canales). La mayoría de los valores casi
+no cambian entre tramas, así que sólo se envía la diferencia con la trama
+anterior:
+
+    canal cuantizado (precision[canal] = q)
+        estado k = round(valor / q); se envía k - k_anterior (zigzag).
+        El decodificador reconstruye k * q: exactamente lo que el
+        codificador cuantizó, sin deriva acumulada.
+    canal sin pérdida (precision[canal] = None)
+        estado = bits del float32; se envía bits XOR bits_anterior
+        (estilo Gorilla). Valores iguales dan 0 y valores cercanos
+        comparten los bytes altos. Se reconstruye bit a bit.
+
+Los enteros resultantes se empacan por tamaño: un bit por valor que dice si
+cambió, 2 bits de ancho (1 a 4 bytes) por cada valor que cambió y luego los
+valores agrupados por ancho, todo con operaciones vectorizadas. Una trama
+sin cambios cuesta la cabecera más un bit por valor.
+
+Una trama clave (KEYFRAME) lleva el estado completo y la precisión de cada
+canal, así que el decodificador se configura solo. Se envía al inicio,
+cada keyInterval tramas y cuando una diferencia no cabe en 32 bits. Si el
+decodificador ve un hueco en la secuencia, descarta las diferencias hasta
+la siguiente trama clave.
+
+Uso:
+    encoder = TelemetryEncoder(VALUE_FIELDS)
+    decoder = TelemetryDecoder()
+    stamp, values = decoder.decode(encoder.encode(stamp, motors.getValues()))
+"""
+import struct
+
+import numpy as np
+
+from fleet import VALUE_FIELDS
+
+KEYFRAME, DELTA = 1, 2
+FRAME_HEADER = struct.Struct('<BB')     # Tipo, secuencia (mod 256)
+KEY_HEADER = struct.Struct('<dBB')      # Tiempo, motores, canales
+DELTA_HEADER = struct.Struct('<I')      # Microsegundos desde la trama anterior
+MAX_DELTA = 0xFFFFFFFF
+
+# Precisión por defecto de los valores de Motors.getValues: RPM y error con
+# centésimas, los términos del PID sin pérdida (ganancias pequeñas como ki)
+DEFAULT_PRECISION = {"rpm": 0.01, "error": 0.01}
+
+
+def zigzag(d):
+    return ((d << 1) ^ (d >> 63)).astype(np.uint64)
+
+
+def unzigzag(u):
+    u = u.astype(np.int64)
+    return (u >> 1) ^ -(u & 1)
+
+
+def packInts(u):
+    """Empaca enteros sin signo < 2**32: máscara de cambios, anchos de 2 bits y los valores por ancho."""
+    changed = u != 0
+    values = u[changed].astype('<u4')
+    widths = (1 + (values >= 0x100).astype(np.uint8) + (values >= 0x10000) + (values >= 0x1000000))
+    parts = [np.packbits(changed, bitorder='little').tobytes(),
+             np.packbits(np.unpackbits((widths - 1)[:, None], axis=1, count=2, bitorder='little'),
+                         bitorder='little').tobytes()]
+    octets = values.view(np.uint8).reshape(-1, 4)
+    for width in range(1, 5):
+        parts.append(octets[widths == width, :width].tobytes())
+    return b''.join(parts)
+
+
+def unpackInts(data, n, offset=0):
+    """Inverso de packInts para n valores a partir de offset. Regresa un arreglo uint64."""
+    size = -(-n // 8)
+    changed = np.unpackbits(np.frombuffer(data, dtype=np.uint8, count=size, offset=offset),
+                            count=n, bitorder='little').astype(bool)
+    offset += size
+    count = int(np.count_nonzero(changed))
+    size = -(-count // 4)
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8, count=size, offset=offset),
+                         count=2 * count, bitorder='little')
+    widths = 1 + bits[0::2] + 2 * bits[1::2]
+    offset += size
+    octets = np.zeros((count, 4), dtype=np.uint8)
+    for width in range(1, 5):
+        mask = widths == width
+        rows = int(np.count_nonzero(mask))
+        if rows:
+            octets[mask, :width] = np.frombuffer(data, dtype=np.uint8, count=rows * width,
+                                                 offset=offset).reshape(rows, width)
+            offset += rows * width
+    u = np.zeros(n, dtype=np.uint64)
+    u[changed] = octets.view('<u4').ravel()
+    return u
+
+
+class ChannelLayout:
+    """Qué columnas se cuantizan y con qué paso; el resto va sin pérdida."""
+    def __init__(self, quanta):
+        self.quanta = np.asarray(quanta, dtype=np.float32)     # 0 = sin pérdida
+        self.quantized = np.flatnonzero(self.quanta > 0)
+        self.lossless = np.flatnonzero(self.quanta == 0)
+        self.steps = self.quanta[self.quantized].astype(np.float64)
+
+    @classmethod
+    def fromPrecision(cls, channels, precision):
+        return cls([precision.get(name) or 0.0 for name in channels])
+
+    def state(self, values):
+        """(enteros cuantizados int64, bits float32 uint32) de una trama (motores, canales)."""
+        values = np.asarray(values, dtype=np.float64)
+        q = values[:, self.quantized] / self.steps
+        k = np.rint(np.nan_to_num(q, nan=0.0, posinf=2.0 ** 62, neginf=-2.0 ** 62)).astype(np.int64)
+        bits = values[:, self.lossless].astype(np.float32).view(np.uint32)
+        return k, bits
+
+    def values(self, k, bits):
+        out = np.empty((k.shape[0], len(self.quanta)))
+        out[:, self.quantized] = k * self.steps
+        out[:, self.lossless] = bits.view(np.float32)
+        return out
+
+
+class TelemetryEncoder:
+    """Codifica tramas (motores, canales) en tramas clave y diferencias."""
+    def __init__(self, channels=VALUE_FIELDS, precision=DEFAULT_PRECISION, keyInterval=100):
+        self.channels = list(channels)
+        self.layout = ChannelLayout.fromPrecision(self.channels, precision)
+        self.keyInterval = keyInterval
+        self.seq = 0
+        self.sinceKey = None        # None: la siguiente trama es clave
+        self.k = None
+        self.bits = None
+        self.stamp = 0.0            # Tiempo reconstruido por el decodificador
+        self.keyframes = 0
+        self.deltas = 0
+
+    def requestKeyframe(self):
+        """La siguiente trama será clave (p. ej. al conectarse un cliente nuevo)."""
+        self.sinceKey = None
+
+    def encode(self, stamp, values):
+        values = np.asarray(values, dtype=np.float64)
+        k, bits = self.layout.state(values)
+        self.seq = (self.seq + 1) & 0xFF
+        micros = round((stamp - self.stamp) * 1e6)
+        if (self.sinceKey is not None and self.sinceKey < self.keyInterval and self.k is not None
+                and k.shape == self.k.shape and 0 <= micros <= MAX_DELTA):
+            d = zigzag(k - self.k).ravel()
+            x = (bits ^ self.bits).ravel().astype(np.uint64)
+            u = np.concatenate((d, x))
+            if not u.size or u.max() <= MAX_DELTA:
+                self.k, self.bits = k, bits
+                self.stamp += micros / 1e6
+                self.sinceKey += 1
+                self.deltas += 1
+                return FRAME_HEADER.pack(DELTA, self.seq) + DELTA_HEADER.pack(micros) + packInts(u)
+        return self.keyframe(stamp, k, bits)
+
+    def keyframe(self, stamp, k, bits):
+        self.k, self.bits = k, bits
+        self.stamp = stamp
+        self.sinceKey = 0
+        self.keyframes += 1
+        motors = k.shape[0]
+        return b''.join((FRAME_HEADER.pack(KEYFRAME, self.seq),
+                         KEY_HEADER.pack(stamp, motors, len(self.channels)),
+                         self.layout.quanta.astype('<f4').tobytes(),
+                         k.astype('<i8').tobytes(),
+                         bits.astype('<u4').tobytes()))
+
+
+class TelemetryDecoder:
+    """Reconstruye las tramas de un TelemetryEncoder (la precisión viene en las tramas clave)."""
+    def __init__(self):
+        self.layout = None
+        self.seq = None
+        self.k = None
+        self.bits = None
+        self.stamp = 0.0
+        self.skipped = 0            # Diferencias descartadas por falta de trama clave
+
+    def decode(self, data):
+        """Regresa (tiempo, arreglo (motores, canales)) o None si falta la trama clave."""
+        kind, seq = FRAME_HEADER.unpack_from(data)
+        offset = FRAME_HEADER.size
+        if kind == KEYFRAME:
+            self.stamp, motors, channels = KEY_HEADER.unpack_from(data, offset)
+            offset += KEY_HEADER.size
+            quanta = np.frombuffer(data, dtype='<f4', count=channels, offset=offset)
+            offset += 4 * channels
+            if self.layout is None or not np.array_equal(quanta, self.layout.quanta):
+                self.layout = ChannelLayout(quanta)
+            nq, nl = len(self.layout.quantized), len(self.layout.lossless)
+            self.k = np.frombuffer(data, dtype='<i8', count=motors * nq, offset=offset).reshape(motors, nq)
+            offset += 8 * motors * nq
+            self.bits = np.frombuffer(data, dtype='<u4', count=motors * nl, offset=offset).reshape(motors, nl)
+        elif kind == DELTA:
+            if self.k is None or seq != (self.seq + 1) & 0xFF:
+                self.seq = None if self.k is None else seq
+                self.k = None       # Se perdió una trama: esperar la siguiente clave
+                self.skipped += 1
+                return None
+            micros, = DELTA_HEADER.unpack_from(data, offset)
+            offset += DELTA_HEADER.size
+            motors, nq = self.k.shape
+            nl = self.bits.shape[1]
+            u = unpackInts(data, motors * (nq + nl), offset)
+            self.k = self.k + unzigzag(u[:motors * nq]).reshape(motors, nq)
+            self.bits = self.bits ^ u[motors * nq:].astype(np.uint32).reshape(motors, nl)
+            self.stamp += micros / 1e6
+        else:
+            raise ValueError(f"Tipo de trama desconocido: {kind}")
+        self.seq = seq
+        return self.stamp, self.layout.values(self.k, self.bits)
@@ -0,0 +1,170 @@
+"""
+Configuración de Tivas y motores (config.json) con validación y recarga en caliente.
+
+Formato:
+    {
+        "COM12": {
+            "1": {"setPoint": 0.0, "kp": 52.0, "ki": 0.035, "kd": 0.05},
+            "2": {"setPoint": 0.0, "kp": 52.0, "ki": 0.035, "kd": 0.05}
+        },
+        ...
+    }
+
+Cada puerto agrupa los motores de una Tiva (2n-1 y 2n para la Tiva n). Los
+errores se reportan con ConfigError indicando el archivo y la clave exacta.
+ConfigWatcher revisa el archivo periódicamente y entrega la configuración
+nueva sólo si es válida, así un error de edición no detiene al rover.
+"""
+import difflib
+import json
+import math
+import os
+import threading
+from collections import namedtuple
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
+
+# Campos de cada motor, todos obligatorios y numéricos
+MOTOR_FIELDS = ("setPoint", "kp", "ki", "kd")
+MotorConfig = namedtuple("MotorConfig", MOTOR_FIELDS)
+BoardConfig = namedtuple("BoardConfig", ["COM", "boardId", "motors"])   # motors: {índice: MotorConfig}
+
+
+class ConfigError(ValueError):
+    """Configuración inválida; el mensaje indica el archivo y la clave."""
+    def __init__(self, path, where, message):
+        self.path = path
+        self.where = where
+        super().__init__(f"{path}: {where}: {message}" if where else f"{path}: {message}")
+
+
+class RoverConfig:
+    """Configuración validada: Tivas por puerto y parámetros por índice de motor."""
+    def __init__(self, path, boards):
+        self.path = path
+        self.boards = boards        # Lista de BoardConfig en el orden del archivo
+        self.motors = {idx: motor for board in boards for idx, motor in board.motors.items()}
+
+    def diff(self, other):
+        """Motores de other cuyos parámetros cambiaron respecto a esta configuración."""
+        return {idx: motor for idx, motor in other.motors.items() if self.motors.get(idx) != motor}
+
+
+def parseNumber(path, where, value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ConfigError(path, where, f"se esperaba un número, no {json.dumps(value)}")
+    if not math.isfinite(value):
+        raise ConfigError(path, where, "el valor debe ser finito")
+    return float(value)
+
+
+def parseMotor(path, where, params):
+    if not isinstance(params, dict):
+        raise ConfigError(path, where, "se esperaba un objeto con " + ", ".join(MOTOR_FIELDS))
+    for key in params:
+        if key not in MOTOR_FIELDS:
+            close = difflib.get_close_matches(key, MOTOR_FIELDS, n=1, cutoff=0.5)
+            hint = f" (¿quisiste decir '{close[0]}'?)" if close else ""
+            raise ConfigError(path, f"{where}.{key}", f"clave desconocida{hint}")
+    missing = [field for field in MOTOR_FIELDS if field not in params]
+    if missing:
+        raise ConfigError(path, where, "faltan " + ", ".join(missing))
+    return MotorConfig(*(parseNumber(path, f"{where}.{field}", params[field]) for field in MOTOR_FIELDS))
+
+
+def parseConfig(path, data):
+    """Valida el contenido ya decodificado de config.json y regresa un RoverConfig."""
+    if not isinstance(data, dict):
+        raise ConfigError(path, "", "se esperaba un objeto {puerto: {motor: parámetros}}")
+    boards = []
+    owner = {}      # Índice de motor -> puerto que lo declaró
+    boardOwner = {} # Número de Tiva -> puerto que la declaró
+    for com, motors in data.items():
+        if not isinstance(motors, dict) or not motors:
+            raise ConfigError(path, com, "se esperaba un objeto {motor: parámetros} no vacío")
+        parsed = {}
+        for key, params in motors.items():
+            where = f"{com}.{key}"
+            try:
+                idx = int(key)
+            except ValueError:
+                raise ConfigError(path, where, "el índice de motor debe ser un entero") from None
+            if idx < 1:
+                raise ConfigError(path, where, "el índice de motor empieza en 1")
+            if idx in owner:
+                raise ConfigError(path, where, f"el motor {idx} ya está en {owner[idx]}")
+            owner[idx] = com
+            parsed[idx] = parseMotor(path, where, params)
+        boardIds = {(idx + 1) // 2 for idx in parsed}
+        if len(boardIds) > 1:
+            raise ConfigError(path, com, f"los motores {sorted(parsed)} no son de la misma Tiva "
+                                         "(la Tiva n controla los motores 2n-1 y 2n)")
+        boardId = boardIds.pop()
+        if boardId in boardOwner:
+            raise ConfigError(path, com, f"la Tiva {boardId} (motores {2 * boardId - 1} y {2 * boardId}) "
+                                         f"ya está en {boardOwner[boardId]}")
+        boardOwner[boardId] = com
+        boards.append(BoardConfig(com, boardId, parsed))
+    return RoverConfig(path, boards)
+
+
+def loadConfig(path=DEFAULT_PATH):
+    """Lee y valida config.json. Lanza ConfigError con la ubicación del problema."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except OSError as e:
+        raise ConfigError(path, "", f"no se pudo leer ({e.strerror})") from None
+    except json.JSONDecodeError as e:
+        raise ConfigError(path, f"línea {e.lineno}, columna {e.colno}", e.msg) from None
+    return parseConfig(path, data)
+
+
+class ConfigWatcher:
+    """
+    Revisa el archivo cada period segundos (fecha y tamaño, sin dependencias
+    externas) y llama a callback(RoverConfig) cuando cambia y es válido.
+    """
+    def __init__(self, path, callback, period=0.5):
+        self.path = path
+        self.callback = callback
+        self.period = period
+        self.running = False
+        self.thread = None
+        self.wake = threading.Event()
+        self.signature = self.stat()
+
+    def stat(self):
+        try:
+            info = os.stat(self.path)
+        except OSError:
+            return None
+        return info.st_mtime_ns, info.st_size
+
+    def start(self):
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self.watchLoop)
+            self.thread.daemon = True
+            self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def watchLoop(self):
+        while self.running:
+            self.wake.wait(self.period)
+            signature = self.stat()
+            if signature is None or signature == self.signature:
+                continue
+            self.signature = signature
+            try:
+                config = loadConfig(self.path)
+            except ConfigError as e:
+                print(f"Error en la configuración, se conserva la anterior: {e}")
+                continue
+            self.callback(config)
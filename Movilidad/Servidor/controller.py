@@ -1,51 +1,229 @@
 import serial
-import serial.tools.list_ports
 import time
 import struct
 import threading
-import json
+
+from snapshot import TelemetrySnapshot
+from recorder import SessionRecorder
+from linkstats import LinkStats
+from supervisor import ConnectionSupervisor, portCache, RECONNECT_MIN
+from discovery import discoverBoards
+from config import ConfigError, ConfigWatcher, loadConfig
+from fleet import MotorFleet, FIELD_INDEX, VALUES, PARAMS
+from autotune import AutoTuner
+from stepmetrics import StepMetrics
+from watchdog import Watchdog
+
+# Trama de telemetría de una Tiva: 2 motores x 6 floats (little-endian)
+TELEMETRY_FRAME = struct.Struct('<12f')
+# Espera máxima por una respuesta: una trama tarda < 1 ms en el cable, así que
+# un byte perdido sólo cuesta este tiempo. Debe quedar muy por debajo del plazo
+# de telemetría del watchdog para que un enlace sano no lo dispare
+READ_TIMEOUT = 0.1
+MOTOR_FRAME = struct.Struct('<6f')
+# Paquete de parámetros: '&', motor (1 o 2), setPoint, kp, ki, kd
+PARAMS_PACKET = struct.Struct('<cIfffd')
+# Modo streaming: 'S' + frecuencia en Hz (0 cancela la suscripción)
+SUBSCRIBE_PACKET = struct.Struct('<cH')
+# Trama de streaming: sincronía, secuencia, telemetría y checksum
+STREAM_SYNC = b'\xaa\x55'
+STREAM_FRAME = struct.Struct('<2sH12fB')
+STREAM_TIMEOUT = 1.0    # Segundos sin tramas válidas antes de volver a poll
+# Lote de parámetros: 'B', secuencia, máscara de motores y [setPoint, kp, ki, kd] de ambos motores
+BATCH_PACKET = struct.Struct('<cBBfffdfffd')
+# Confirmación del lote: sincronía, secuencia y su complemento
+ACK_SYNC = b'\xaa\x5a'
+ACK_PACKET = struct.Struct('<2sBB')
+ACK_TIMEOUT = 0.5       # Segundos sin confirmación antes de volver a paquetes '&'
+# Setpoint en dos fases: 'P' guarda los setpoints de ambos motores, 'C' los aplica
+STAGE_PACKET = struct.Struct('<cBff')
+COMMIT_PACKET = struct.Struct('<cB')
+
 
 class MotorControllerSystem:
-    def __init__(self):
+    def __init__(self, engine=None):
         self.controllers = []  # Lista para almacenar controladores de Tiva
+        self.motorIndex = {}   # Motor (1-6) -> (controlador, posición 0 o 1), por identidad de la Tiva
         self.running = True
+        self.engine = engine   # SerialEngine opcional: un solo hilo para todas las Tivas
+        self.snapshot = TelemetrySnapshot()  # Última trama consistente de todos los motores
+        self.fleet = MotorFleet()  # Telemetría y parámetros de todos los motores (fila = motor - 1)
+        self.metrics = StepMetrics()  # Respuesta al escalón de cada motor, trama por trama
+        self.recorder = None   # SessionRecorder activo
+        self.broadcastSeq = 0
+        self.broadcasts = 0    # Setpoints difundidos y desfase entre Tivas [s]
+        self.lastSkew = 0.0
+        self.maxSkew = 0.0
+        self.supervisor = ConnectionSupervisor(self)  # Reconexión de Tivas desconectadas
+        self.watchdog = Watchdog(self)  # Setpoint 0 si una Tiva o el operador dejan de responder
+        self.config = None     # RoverConfig aplicado (config.py)
+        self.configWatcher = None
 
-    def addController(self, COM, baudRate=1000000):
-        """Agrega un nuevo controlador de Tiva al sistema."""
-        # Verificar si el puerto COM existe
-        available_ports = [port.device for port in serial.tools.list_ports.comports()]
-        
-        if COM not in available_ports:
-            print(f"Error: El puerto {COM} no está disponible. No se puede agregar el controlador.")
-            return  # No agregar el controlador si el puerto no existe
+    def addController(self, COM, baudRate=1000000, streamRate=None, batch=False, boardId=None):
+        """
+        Agrega un nuevo controlador de Tiva al sistema.
+        Si se indica streamRate (Hz) la Tiva se suscribe al modo streaming
+        y regresa a poll si la firmware no responde.
+        Con batch=True los parámetros de ambos motores se envían en un solo
+        paquete confirmado; si la firmware no confirma se usa '&'.
+        boardId (1, 2, 3...) fija los motores 2*boardId-1 y 2*boardId; sin él
+        se usa la primera Tiva libre. Regresa el Controller o None.
+        """
+        if boardId is None:
+            boardId = 1
+            while 2 * boardId in self.motorIndex:
+                boardId += 1
+        elif 2 * boardId in self.motorIndex:
+            other = self.motorIndex[2 * boardId][0].COM
+            print(f"Error: La Tiva {boardId} ya está en {other}. No se puede agregar {COM}.")
+            return None
+
+        # Si el puerto aún no existe, el supervisor conecta la Tiva cuando aparezca
+        controller = Controller(COM, baudRate, streamRate, batch)
+        controller.boardId = boardId
+        controller.row = (boardId - 1) * 2
+        controller.snapshot = self.snapshot
+        controller.recorder = self.recorder
+        controller.metrics = self.metrics
+        self.controllers.append(controller)
+        self.motorIndex[2 * boardId - 1] = (controller, 0)
+        self.motorIndex[2 * boardId] = (controller, 1)
+        self.snapshot.resize(max(self.motorIndex))
+        self.fleet.resize(max(self.motorIndex))
+        self.metrics.resize(max(self.motorIndex))
+        controller.bind(self.fleet, controller.row)
+        if portCache.exists(COM):
+            self.connect(controller)
+        else:
+            controller.present = False
+            print(f"El puerto {COM} no está disponible, se conectará cuando aparezca.")
+        self.supervisor.start()
+        self.watchdog.start()
+        return controller
+
+    def discover(self, ports=None, baudRate=1000000, timeout=0.3, **kwargs):
+        """
+        Consulta la identidad de todos los puertos en paralelo y agrega cada
+        Tiva que responda en la posición que indica su número de tarjeta.
+        Regresa {tarjeta: puerto}. Ver discovery.py.
+        """
+        boards = discoverBoards(ports, baudRate, timeout)
+        for boardId, (port, version) in sorted(boards.items()):
+            controller = self.addController(port, baudRate, boardId=boardId, **kwargs)
+            if controller is not None:
+                controller.firmware = version
+        return {boardId: port for boardId, (port, _) in boards.items()}
+
+    def connect(self, controller):
+        """Abre la conexión de una Tiva en su hilo o en el SerialEngine."""
+        controller.active = True
+        if self.engine is not None:
+            self.engine.addController(controller)
         else:
-            controller = Controller(COM, baudRate)
-            self.controllers.append(controller)
             controller.startThread()
+
+    def isConnected(self):
+        """True si todas las Tivas tienen su puerto abierto."""
+        return bool(self.controllers) and all(c.port is not None for c in self.controllers)
     
-    def jsonConfig(self, path):
-        with open(path, 'r') as f:
-            config = json.load(f)
-            # Iterar por cada COM y sus motores
-            for com, motors in config.items():
-                # Crear un controlador para cada COM
-                self.addController(com)
-                for idx, param in motors.items():
-                    m=self.getMotor(int(idx))
-                    if m is None:  # Validar si el motor existe
-                        print(f"Error: Motor con índice {idx} no encontrado en COM {com}.")
-                        continue
-                    m.setParams(setPoint = param.get("SetPoint"))
-                    m.setParams(kp = param.get("kp"))
-                    m.setParams(ki = param.get("ki"))
-                    m.setParams(kd = param.get("kd"))
-    
+    def jsonConfig(self, path, discover=True, watch=False):
+        """
+        Carga Tivas y parámetros validados (ver config.py) y los envía a las
+        Tivas. Los índices de motor de cada COM definen la Tiva (motores 3 y
+        4 -> Tiva 2); con discover=True se busca esa Tiva por identidad en
+        todos los puertos y el COM sólo se usa si no responde. Con watch=True
+        los cambios al archivo se aplican sin reiniciar las conexiones.
+        Regresa False si la configuración no es válida.
+        """
+        try:
+            config = loadConfig(path)
+        except ConfigError as e:
+            print(f"Error en la configuración: {e}")
+            return False
+        found = discoverBoards() if discover else {}
+        for board in config.boards:
+            port = found[board.boardId][0] if board.boardId in found else board.COM
+            # Crear un controlador para cada COM
+            controller = self.addController(port, boardId=board.boardId)
+            if controller is not None and board.boardId in found:
+                controller.firmware = found[board.boardId][1]
+        self.config = None
+        self.applyConfig(config)
+        if watch:
+            self.watchConfig(path)
+        return True
+
+    def applyConfig(self, config):
+        """
+        Envía sólo los motores que cambiaron respecto a la configuración
+        aplicada, y de cada uno sólo los campos que cambiaron: editar kp no
+        debe regresar el setpoint actual al del archivo. La primera carga
+        aplica todo. Cada cambio pasa por la cola de comandos de su Tiva, así
+        que ambos motores de una Tiva salen en una sola escritura.
+        """
+        previous = {} if self.config is None else self.config.motors
+        changed = config.motors if self.config is None else self.config.diff(config)
+        for board in config.boards:
+            if self.getMotorController(2 * board.boardId) is None:
+                print(f"La Tiva {board.boardId} ({board.COM}) es nueva; se agrega.")
+                self.addController(board.COM, boardId=board.boardId)
+        for idx, params in changed.items():
+            motor = self.getMotor(idx)
+            if motor is None:  # Validar si el motor existe
+                print(f"Error: Motor con índice {idx} no encontrado.")
+                continue
+            old = previous.get(idx)
+            fields = {field: value for field, value in params._asdict().items()
+                      if old is None or getattr(old, field) != value}
+            motor.updateParams(**fields)
+        self.config = config
+        return changed
+
+    def watchConfig(self, path):
+        """Recarga en caliente: aplica el archivo cada vez que cambie y sea válido."""
+        if self.configWatcher is not None:
+            self.configWatcher.stop()
+        self.configWatcher = ConfigWatcher(path, self.onConfigChanged)
+        self.configWatcher.start()
+
+    def onConfigChanged(self, config):
+        changed = self.applyConfig(config)
+        if changed:
+            print(f"Configuración recargada: motores {sorted(changed)} actualizados.")
+
+
+    def startRecording(self, path, **kwargs):
+        """Empieza a grabar cada trama de telemetría en path (ver recorder.py)."""
+        if self.recorder is not None:
+            self.stopRecording()
+        self.recorder = SessionRecorder(path, **kwargs).start()
+        for controller in self.controllers:
+            controller.recorder = self.recorder
+        return self.recorder
+
+    def stopRecording(self):
+        """Termina la grabación y cierra el archivo."""
+        recorder = self.recorder
+        if recorder is None:
+            return
+        self.recorder = None
+        for controller in self.controllers:
+            controller.recorder = None
+        recorder.stop()
+        print(f"Sesión guardada en {recorder.path} ({recorder.frames} tramas).")
 
     def stopAll(self):
         """Detiene todos los hilos en el sistema."""
         self.running = False
+        self.watchdog.stop()
+        if self.configWatcher is not None:
+            self.configWatcher.stop()
+        self.supervisor.stop()
         for controller in self.controllers:
             controller.stopThread()
+        self.stopRecording()
+        if self.engine is not None:
+            self.engine.stop()
 
     def showAllMotors(self):
         """Muestra los valores de todos los motores."""
@@ -56,51 +234,132 @@ class MotorControllerSystem:
     def getAllParams(self):
         """
             Regresa un diccionario con los parámetros de todos los motores.
-            Los índices de los motores están basados en su posición:
+            Los índices de los motores dependen del número de cada Tiva:
             - Motor 1 y 2 del controlador 1 → índices 1, 2
             - Motor 1 y 2 del controlador 2 → índices 3, 4
             - Motor 1 y 2 del controlador 3 → índices 5, 6
         """
-        allParams = {}
-
-        for mIdx in range(1,len(self.controllers)*2+1):
-            motor = self.getMotor(mIdx)
-            allParams[mIdx] = motor.getParams()
-
-        return allParams
+        rows = self.fleet.params().tolist()
+        return {mIdx: rows[mIdx - 1] for mIdx in sorted(self.motorIndex)}
 
     def getAllValues(self):
         """
         Regresa un diccionario con los parámetros de todos los motores.
-        Los índices de los motores están basados en su posición:
+        Los índices de los motores dependen del número de cada Tiva:
         - Motor 1 y 2 del controlador 1 → índices 1, 2
         - Motor 1 y 2 del controlador 2 → índices 3, 4
         - Motor 1 y 2 del controlador 3 → índices 5, 6
         """
-        allValues = {}
+        rows = self.fleet.values().tolist()
+        return {mIdx: rows[mIdx - 1] for mIdx in sorted(self.motorIndex)}
+
+    def getFleetValues(self):
+        """Vista (motores, 6) de la telemetría de todos los motores, sin copiar; fila i = motor i+1."""
+        return self.fleet.values()
 
-        for mIdx in range(1,len(self.controllers)*2+1):
-            motor = self.getMotor(mIdx)
-            allValues[mIdx] = motor.getValues()
+    def getFleetParams(self):
+        """Vista (motores, 4) de setPoint, kp, ki y kd de todos los motores, sin copiar."""
+        return self.fleet.params()
 
-        return allValues
+    def getSnapshot(self, out=None):
+        """
+        Copia consistente de la telemetría de todos los motores como arreglo
+        (motor, columna); la fila i corresponde al motor i+1. Ver snapshot.py.
+        """
+        return self.snapshot.copy(out)
             
     def getMotor(self, idx=None):
-        if len(self.controllers)>0:
-            if idx<=len(self.controllers)*2:
-                tivaNum = (idx - 1) // 2  # Determina la Tiva (1, 2, 3)
-                motorNum = (idx - 1) % 2  # Determina el motor (1 o 2)
-                return self.controllers[tivaNum].motors[motorNum]
-        else:
+        # Índice por identidad de la Tiva: no cambia si un puerto falla o se enumera en otro orden
+        entry = self.motorIndex.get(idx)
+        if entry is None:
             return None
+        controller, motorNum = entry
+        return controller.motors[motorNum]
         
     def getMotorController(self, idx=None):
-        if len(self.controllers)>0:
-            if idx<=len(self.controllers)*2:
-                tivaNum = (idx - 1) // 2  # Determina la Tiva (1, 2, 3)
-                return self.controllers[tivaNum]
-        else:
+        entry = self.motorIndex.get(idx)
+        if entry is None:
             return None
+        return entry[0]
+
+    def setAllSetPoints(self, setPoint):
+        """Nuevo setpoint para todos los motores: un solo paquete por Tiva."""
+        for controller in self.controllers:
+            for motor in controller.motors:
+                motor.updateParams(setPoint=setPoint)
+
+    def broadcastSetPoint(self, setPoint, twoPhase=False, controllers=None):
+        """
+        Envía el mismo setpoint a todas las Tivas una tras otra desde un solo
+        hilo, con los paquetes ya codificados. Con twoPhase=True primero se
+        guarda el setpoint en cada Tiva ('P') y luego se aplica con un paquete
+        de dos bytes ('C'), lo que reduce el desfase al mínimo (requiere
+        firmware con soporte). controllers limita la difusión a esas Tivas.
+        Las Tivas sin puerto guardan el setpoint y lo reciben al reconectar.
+        Regresa el desfase entre la primera y la última escritura en segundos.
+        """
+        targets = list(self.controllers if controllers is None else controllers)
+        for controller in targets:
+            for motor in controller.motors:
+                motor.setParams(setPoint=setPoint)
+        controllers = [c for c in targets if c.port is not None]
+        for controller in targets:
+            if controller.port is None:
+                self.queueSetPoints(controller)
+        if not controllers:
+            return 0.0
+
+        if twoPhase:
+            self.broadcastSeq = (self.broadcastSeq + 1) & 0xFF
+            stage = STAGE_PACKET.pack(b'P', self.broadcastSeq, setPoint, setPoint)
+            commit = COMMIT_PACKET.pack(b'C', self.broadcastSeq)
+            rounds = [[(c, stage) for c in controllers], [(c, commit) for c in controllers]]
+        else:
+            rounds = [[(c, b''.join(PARAMS_PACKET.pack(b'&', slot, *motor.getParams())
+                                    for slot, motor in enumerate(c.motors, 1)))
+                       for c in controllers]]
+
+        if self.engine is not None:
+            stamps = self.engine.submit(self.engine.broadcast(rounds)).result()
+        else:
+            # Tomar todos los candados primero para que ningún '$' se meta entre Tivas
+            for controller in controllers:
+                controller.writeLock.acquire()
+            try:
+                stamps = writeRounds(rounds)
+            finally:
+                for controller in controllers:
+                    controller.writeLock.release()
+
+        # Un puerto que se cerró después del filtro no se escribió: queda en su cola
+        for controller in controllers:
+            if controller.port is None:
+                self.queueSetPoints(controller)
+        if not stamps:
+            return 0.0
+        skew = stamps[-1] - stamps[0]
+        self.broadcasts += 1
+        self.lastSkew = skew
+        self.maxSkew = max(self.maxSkew, skew)
+        return skew
+
+    def queueSetPoints(self, controller):
+        """Encola el setpoint guardado de ambos motores (sale al reconectar o en su propio hilo)."""
+        for motor in controller.motors:
+            motor.update = True
+            controller.commands.push(motor.slot, True)
+
+    def stats(self):
+        """Estadísticas del enlace de cada Tiva, por puerto (ver linkstats.py)."""
+        return {controller.COM: controller.getStats() for controller in self.controllers}
+
+    def heartbeat(self, alive=True):
+        """Latido del operador para el watchdog; alive=False deja de vigilarlo (ver watchdog.py)."""
+        self.watchdog.heartbeat(alive)
+
+    def watchdogStats(self):
+        """Plazos vencidos y latencia de paro del watchdog."""
+        return self.watchdog.stats()
 
     def updateMotor(self, idx=None, setPoint=None, kp=None, ki=None, kd=None):
         """Agrega un nuevo controlador de Tiva al sistema."""
@@ -110,20 +369,58 @@ class MotorControllerSystem:
             print(f"Updated motor: {idx}")
         else:
             print(f"Can't find motor {idx}")
+
+    def autotune(self, motors=None, method="step", apply=True, **kwargs):
+        """
+        Identifica cada motor y le aplica ganancias PI (ver autotune.py).
+        Las Tivas se ajustan en paralelo. Regresa {motor: TuneResult o None}.
+        """
+        return AutoTuner(self, method=method, apply=apply, **kwargs).run(motors)
         
             
 class Controller:
-    def __init__(self, COM, baudRate=1000000):
+    def __init__(self, COM, baudRate=1000000, streamRate=None, batch=False):
         self.COM = COM
         self.baudRate = baudRate
+        self.streamRate = streamRate    # None: modo poll ('$' por muestra)
+        self.batch = batch              # Lotes 'B' confirmados en lugar de paquetes '&'
+        self.commands = CommandQueue()  # Parámetros pendientes por motor
+        self.unacked = {}               # Secuencia -> (motores, envío) de los lotes sin confirmar
+        self.port = None                # Puerto abierto (serial o SerialLink) mientras corre
+        self.linkStats = LinkStats()
+        self.decoder = None             # Último StreamDecoder (pérdidas del modo streaming)
+        self.writeLock = threading.Lock()
         self.m1 = Motors()
         self.m2 = Motors()
         self.motors = [self.m1, self.m2]
+        self.bind(MotorFleet(2), 0)     # Flota propia hasta agregarse a un MotorControllerSystem
+        self.m1.attach(self.commands, 1)
+        self.m2.attach(self.commands, 2)
         self.running = True
         self.thread = None
+        self.frameCount = 0     # Tramas de telemetría recibidas
+        self.lastFrame = None   # perf_counter de la última trama (plazo del watchdog)
+        self.snapshot = None    # TelemetrySnapshot compartido del sistema
+        self.recorder = None    # SessionRecorder del sistema mientras se graba
+        self.metrics = None     # StepMetrics compartido del sistema
+        self.row = 0            # Fila del motor 1 en la instantánea
+        self.boardId = None     # Número de tarjeta (motores 2*boardId-1 y 2*boardId)
+        self.firmware = None    # Versión reportada en el descubrimiento
+        self.active = False     # Hilo o tarea de conexión en curso
+        self.present = True     # El puerto existía en la última revisión del supervisor
+        self.backoff = RECONNECT_MIN
+        self.nextAttempt = 0.0
+        self.lostAt = None      # Momento en que se perdió la conexión (tiempo de recuperación)
+
+    def bind(self, fleet, row):
+        """Mueve ambos motores a las filas row y row+1 de fleet."""
+        self.m1.bind(fleet, row)
+        self.m2.bind(fleet, row + 1)
+        self.fleet, self.fleetRow = fleet, row
 
     def startThread(self):
         self.running = True
+        self.active = True
         self.thread = threading.Thread(target=self.requestLoop)
         self.thread.daemon = True
         self.thread.start()
@@ -135,39 +432,173 @@ class Controller:
 
     def requestLoop(self):
         try:
-            with serial.Serial(port=self.COM, baudrate=self.baudRate, timeout=1) as tiva:
+            with serial.Serial(port=self.COM, baudrate=self.baudRate, timeout=READ_TIMEOUT) as tiva:
+                self.connected(tiva)
+                if self.streamRate and not self.streamLoop(tiva):
+                    print(f"{self.COM} no responde en modo streaming, usando poll.")
+                    tiva.reset_input_buffer()
                 while self.running:
-                    if self.m1.update or self.m2.update:
-                        self.sendParams(tiva)
+                    if self.commands and self.sendParams(tiva):
+                        self.receiveAck(tiva)
                     self.recieveParams(tiva)
         except serial.SerialException as e:
+            self.linkStats.errors += 1
             print(f"Error en la conexión serial ({self.COM}): {e}")
-            time.sleep(2)
+        finally:
+            self.disconnected()
+
+    def connected(self, port):
+        """Puerto abierto: si es una reconexión, reenviar los parámetros de ambos motores."""
+        self.port = port
+        self.linkStats.connects += 1
+        if self.linkStats.connects > 1:
+            for slot, motor in enumerate(self.motors, 1):
+                motor.update = True
+                self.commands.push(slot, True)
+
+    def disconnected(self):
+        """El hilo o la tarea terminó; el supervisor decide cuándo reintentar."""
+        self.port = None
+        self.active = False
+        if self.running and self.lostAt is None:
+            self.lostAt = time.perf_counter()
+            portCache.invalidate()
+
+    def streamLoop(self, tiva):
+        """
+        Recibe telemetría continua tras una sola suscripción.
+        Regresa False si no llegan tramas válidas para volver al modo poll.
+        """
+        decoder = self.decoder = StreamDecoder()
+        self.write(tiva, SUBSCRIBE_PACKET.pack(b'S', self.streamRate))
+        lastFrame = time.perf_counter()
+        while self.running:
+            if self.commands:
+                self.sendParams(tiva)   # La confirmación llega dentro del flujo
+            data = tiva.read(tiva.in_waiting or STREAM_FRAME.size)
+            self.linkStats.bytesIn += len(data)
+            frames = decoder.feed(data)
+            for seq in decoder.takeAcks():
+                self.unacked.pop(seq, None)
+            now = time.perf_counter()
+            self.checkAcks(now)
+            if frames:
+                lastFrame = now
+                for values in frames:
+                    self.applyValues(values)
+            elif now - lastFrame > STREAM_TIMEOUT:
+                self.write(tiva, SUBSCRIBE_PACKET.pack(b'S', 0))
+                return False
+        self.write(tiva, SUBSCRIBE_PACKET.pack(b'S', 0))
+        return True
+
+    def write(self, tiva, data):
+        """Escribe al puerto sin mezclarse con una difusión de setpoint en curso."""
+        with self.writeLock:
+            tiva.write(data)
+        self.linkStats.bytesOut += len(data)
 
     def recieveParams(self, tiva):
-        tiva.write('$'.encode('utf-8'))
-        data = tiva.read(48)
-        if len(data) == 48:
-            self.m1.updateValues(data[0:24])
-            self.m2.updateValues(data[24:48])
+        sent = time.perf_counter()
+        self.write(tiva, '$'.encode('utf-8'))
+        data = tiva.read(TELEMETRY_FRAME.size)
+        self.linkStats.bytesIn += len(data)
+        if len(data) == TELEMETRY_FRAME.size:
+            self.linkStats.poll(time.perf_counter() - sent)
+            self.handleTelemetry(data)
+        else:
+            self.linkStats.shortReads += 1
+
+    def handleTelemetry(self, data):
+        """Decodifica la trama de ambos motores en una sola llamada."""
+        self.applyValues(TELEMETRY_FRAME.unpack_from(data))
+
+    def applyValues(self, values):
+        """Asigna los 12 valores decodificados a ambos motores."""
+        if self.lostAt is not None:
+            # Primera trama tras reconectar
+            self.linkStats.recovery(time.perf_counter() - self.lostAt)
+            self.lostAt = None
+            self.backoff = RECONNECT_MIN
+        self.frameCount += 1
+        self.lastFrame = time.perf_counter()
+        # Ambos motores en filas contiguas de la flota: una sola asignación
+        self.fleet.table[self.fleetRow:self.fleetRow + 2, VALUES].flat = values
+        stamp = time.time()
+        if self.snapshot is not None:
+            self.snapshot.publish(self.row, values, self.frameCount, stamp)
+        if self.metrics is not None:
+            setPoints = self.fleet.table[self.fleetRow:self.fleetRow + 2, FIELD_INDEX["setPoint"]].tolist()
+            self.metrics.update(self.fleetRow, stamp, setPoints, (values[0], values[6]))
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.recordBoard(self.lastFrame, self.row + 1, values, self.m1.getParams() + self.m2.getParams())
 
     def sendParams(self, tiva):
-        if self.m1.update:
-            params = self.m1.getParams()
-            self.m1.update = False
-            idx = 1
-        else:
-            params = self.m2.getParams()
-            self.m2.update = False
-            idx = 2
-
-        out = '&'.encode('utf-8')
-        out += struct.pack('I', idx)
-        out += struct.pack('f', params[0])
-        out += struct.pack('f', params[1])
-        out += struct.pack('f', params[2])
-        out += struct.pack('d', params[3])
-        tiva.write(out)
+        """
+        Envía los parámetros pendientes, setpoints primero. Con lotes manda
+        ambos motores en un solo paquete y regresa cuántos bytes de
+        confirmación esperar (0 con paquetes '&').
+        """
+        slots = self.commands.take()
+        if not slots:
+            return 0
+        for slot in slots:
+            self.motors[slot - 1].update = False
+
+        if self.batch:
+            seq = self.commands.nextSeq()
+            mask = 0
+            for slot in slots:
+                mask |= 1 << (slot - 1)
+            self.unacked[seq] = (slots, time.perf_counter())
+            self.linkStats.paramWrites += 1
+            self.write(tiva, BATCH_PACKET.pack(b'B', seq, mask, *self.m1.getParams(), *self.m2.getParams()))
+            return ACK_PACKET.size
+
+        self.write(tiva, b''.join(PARAMS_PACKET.pack(b'&', slot, *self.motors[slot - 1].getParams())
+                                  for slot in slots))
+        self.linkStats.paramWrites += len(slots)
+        return 0
+
+    def receiveAck(self, tiva):
+        """Lee la confirmación del último lote (modo poll)."""
+        data = tiva.read(ACK_PACKET.size)
+        self.linkStats.bytesIn += len(data)
+        if not self.handleAck(data):
+            self.ackFailed()
+            tiva.reset_input_buffer()
+
+    def handleAck(self, data):
+        """Valida una confirmación; regresa True si corresponde a un lote pendiente."""
+        if len(data) != ACK_PACKET.size:
+            return False
+        sync, seq, check = ACK_PACKET.unpack(data)
+        if sync != ACK_SYNC or check != seq ^ 0xFF:
+            return False
+        return self.unacked.pop(seq, None) is not None
+
+    def checkAcks(self, now):
+        """En streaming las confirmaciones llegan con el flujo: revisar las vencidas."""
+        for slots, sentAt in self.unacked.values():
+            if now - sentAt > ACK_TIMEOUT:
+                self.ackFailed()
+                return
+
+    def ackFailed(self):
+        """La firmware no confirmó: volver a paquetes '&' y reenviar lo pendiente."""
+        print(f"{self.COM} no confirma lotes de parámetros, usando paquetes '&'.")
+        self.batch = False
+        for slots, _ in self.unacked.values():
+            for slot in slots:
+                self.commands.push(slot)
+        self.unacked.clear()
+
+    def getStats(self):
+        decoder = self.decoder
+        return self.linkStats.asDict(self.frameCount, self.commands.pushed,
+                                     decoder.lost if decoder else 0,
+                                     decoder.corrupt if decoder else 0)
 
     def showMotors(self):
         print("----- Motor 1 -----")
@@ -175,27 +606,201 @@ class Controller:
         print("----- Motor 2 -----")
         self.m2.showValues()
 
+class CommandQueue:
+    """
+    Parámetros pendientes de una Tiva. Sólo se guarda qué motor tiene cambios
+    y su prioridad: los valores se leen de Motors al enviar, así que varios
+    cambios seguidos se combinan en un solo paquete con el último valor.
+    """
+    SETPOINT, GAINS = 0, 1      # Prioridad: los setpoints salen primero
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}       # Motor (1 o 2) -> prioridad
+        self.seq = 0
+        self.pushed = 0         # Cambios recibidos (los enviados son menos al combinarse)
+
+    def __bool__(self):
+        return bool(self.pending)
+
+    def push(self, slot, setPoint=False):
+        priority = self.SETPOINT if setPoint else self.GAINS
+        with self.lock:
+            self.pushed += 1
+            self.pending[slot] = min(priority, self.pending.get(slot, self.GAINS))
+
+    def take(self):
+        """Vacía la cola y regresa los motores pendientes en orden de prioridad."""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        return sorted(pending, key=pending.get)
+
+    def nextSeq(self):
+        self.seq = (self.seq + 1) & 0xFF
+        return self.seq
+
+
+class StreamDecoder:
+    """Separa las tramas del flujo continuo y se resincroniza tras bytes corruptos."""
+    def __init__(self):
+        self.buffer = bytearray()
+        self.lastSeq = None
+        self.lost = 0       # Tramas perdidas según la secuencia
+        self.corrupt = 0    # Bytes descartados al resincronizar
+        self.acks = []      # Secuencias de lotes confirmados dentro del flujo
+
+    def takeAcks(self):
+        acks, self.acks = self.acks, []
+        return acks
+
+    def feed(self, data):
+        """Agrega bytes recibidos y regresa la lista de telemetrías (12 floats) válidas."""
+        self.buffer += data
+        frames = []
+        size = STREAM_FRAME.size
+        while True:
+            # Tramas y confirmaciones comparten el primer byte de sincronía
+            start = self.buffer.find(STREAM_SYNC[:1])
+            if start < 0:
+                self.corrupt += len(self.buffer)
+                self.buffer.clear()
+                break
+            if start > 0:
+                self.corrupt += start
+                del self.buffer[:start]
+            if len(self.buffer) < 2:
+                break
+            if self.buffer[:2] == ACK_SYNC:
+                if len(self.buffer) < ACK_PACKET.size:
+                    break
+                _, seq, check = ACK_PACKET.unpack_from(self.buffer)
+                if check == seq ^ 0xFF:
+                    self.acks.append(seq)
+                    del self.buffer[:ACK_PACKET.size]
+                else:
+                    self.corrupt += 1
+                    del self.buffer[0]
+                continue
+            if self.buffer[:2] != STREAM_SYNC:
+                self.corrupt += 1
+                del self.buffer[0]
+                continue
+            if len(self.buffer) < size:
+                break
+            if streamChecksum(self.buffer[2:size - 1]) != self.buffer[size - 1]:
+                # Encabezado falso o trama dañada: buscar el siguiente
+                self.corrupt += 1
+                del self.buffer[0]
+                continue
+            frame = STREAM_FRAME.unpack_from(self.buffer)
+            del self.buffer[:size]
+            seq = frame[1]
+            if self.lastSeq is not None:
+                self.lost += (seq - self.lastSeq - 1) & 0xFFFF
+            self.lastSeq = seq
+            frames.append(frame[2:14])
+        return frames
+
+
+def writeRounds(rounds):
+    """
+    Escribe cada ronda de (controlador, paquete) a todas las Tivas seguidas.
+    Se llama con los candados de escritura tomados; las Tivas cuyo puerto se
+    cerró mientras tanto se omiten (reciben el setpoint guardado al
+    reconectar). Regresa el instante de cada escritura de la última ronda.
+    """
+    def write(controller, data):
+        port = controller.port
+        if port is None:
+            return False
+        try:
+            port.write(data)
+        except OSError:     # Incluye serial.SerialException: el puerto se cerró
+            return False
+        controller.linkStats.bytesOut += len(data)
+        return True
+
+    for batch in rounds[:-1]:
+        for controller, data in batch:
+            write(controller, data)
+    stamps = []
+    for controller, data in rounds[-1]:
+        if write(controller, data):
+            stamps.append(time.perf_counter())
+    return stamps
+
+
+def streamChecksum(data):
+    """Suma de 8 bits sobre secuencia y telemetría."""
+    return sum(data) & 0xFF
+
+
+def fleetField(name):
+    """Atributo de Motors guardado en la columna name de su fila en la flota."""
+    column = FIELD_INDEX[name]
+
+    def get(self):
+        return self.fleet.table[self.row, column]
+
+    def set(self, value):
+        self.fleet.table[self.row, column] = value
+    return property(get, set)
+
+
 class Motors:
+    """
+    Vista de un motor sobre una fila de MotorFleet (ver fleet.py). Un Motors
+    suelto tiene su propia flota de una fila; MotorControllerSystem lo mueve
+    a la flota del sistema con bind().
+    """
+    __slots__ = ("fleet", "row", "commands", "slot")
+
+    rpm = fleetField("rpm")
+    error = fleetField("error")
+    pid = fleetField("pid")
+    proportional = fleetField("proportional")
+    integral = fleetField("integral")
+    derivative = fleetField("derivative")
+    setPoint = fleetField("setPoint")
+    kp = fleetField("kp")
+    ki = fleetField("ki")
+    kd = fleetField("kd")
+
     def __init__(self, setPoint=0, kp=0, ki=0, kd=0):
-        self.rpm = 0
-        self.error = 0
-        self.pid = 0
-        self.proportional = 0
-        self.derivative = 0
-        self.integral = 0
-        self.setPoint = setPoint
-        self.kp = kp
-        self.ki = ki
-        self.kd = kd
-        self.update = False
+        self.fleet = MotorFleet(1)
+        self.row = 0
+        self.setParams(setPoint, kp, ki, kd)
+        self.commands = None    # CommandQueue de la Tiva a la que pertenece
+        self.slot = None        # Motor 1 o 2 dentro de la Tiva
+
+    @property
+    def update(self):
+        return bool(self.fleet.updates[self.row])
+
+    @update.setter
+    def update(self, value):
+        self.fleet.updates[self.row] = value
+
+    def bind(self, fleet, row):
+        """Mueve el motor a la fila row de fleet conservando sus valores."""
+        fleet.table[row] = self.fleet.table[self.row]
+        fleet.updates[row] = self.fleet.updates[self.row]
+        self.fleet, self.row = fleet, row
 
     def updateValues(self, data):
-        self.rpm = getNumber(data[0:4], 'f')
-        self.error = getNumber(data[4:8], 'f')
-        self.pid = getNumber(data[8:12], 'f')
-        self.proportional = getNumber(data[12:16], 'f')
-        self.integral = getNumber(data[16:20], 'f')
-        self.derivative = getNumber(data[20:24], 'f')
+        """Decodifica los 24 bytes de un motor (rpm, error, pid, p, i, d)."""
+        if len(data) < MOTOR_FRAME.size:
+            return
+        self.setValues(MOTOR_FRAME.unpack_from(data))
+
+    def setValues(self, values):
+        """Asigna de una vez los seis valores ya decodificados."""
+        self.fleet.table[self.row, VALUES] = values
+
+    def attach(self, commands, slot):
+        """Asocia el motor a la cola de comandos de su Tiva."""
+        self.commands = commands
+        self.slot = slot
 
     def updateParams(self, setPoint=None, kp=None, ki=None, kd=None):
         self.update = True
@@ -207,6 +812,8 @@ class Motors:
             self.ki = ki
         if kd is not None:
             self.kd = kd
+        if self.commands is not None:
+            self.commands.push(self.slot, setPoint is not None)
     
     def setParams(self, setPoint=None, kp=None, ki=None, kd=None):
         if setPoint is not None:
@@ -219,10 +826,10 @@ class Motors:
             self.kd = kd
 
     def getParams(self):
-        return [self.setPoint, self.kp, self.ki, self.kd]
+        return self.fleet.table[self.row, PARAMS].tolist()
     
     def getValues(self):
-        return [self.rpm, self.error, self.pid, self.proportional, self.integral, self.derivative]
+        return self.fleet.table[self.row, VALUES].tolist()
 
     def showValues(self):
         print(f"RPM: {self.rpm}")
@@ -0,0 +1,74 @@
+"""
+Descubrimiento de Tivas por identidad.
+
+Cada puerto serial se abre y se le envía la consulta '?'. Una firmware con
+soporte responde con ID_PACKET: sincronía, número de tarjeta (1, 2, 3...),
+versión de firmware y un byte de verificación. La tarjeta n controla los
+motores 2n-1 y 2n sin importar el nombre del puerto ni el orden en que se
+enumeró. Todos los puertos se consultan a la vez, así que el arranque tarda
+lo mismo con uno que con muchos puertos (el timeout de la consulta).
+
+Uso:
+    boards = discoverBoards()       # {1: "/dev/ttyACM2", 2: "/dev/ttyACM0", ...}
+"""
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+import serial
+
+from supervisor import portCache
+
+ID_QUERY = b'?'
+ID_SYNC = b'\xaa\x49'
+# Respuesta: sincronía, tarjeta, versión de firmware, tarjeta ^ versión ^ 0xFF
+ID_PACKET = struct.Struct('<2sBBB')
+
+
+def idPacket(boardId, version):
+    return ID_PACKET.pack(ID_SYNC, boardId, version, boardId ^ version ^ 0xFF)
+
+
+def parseIdentity(data):
+    """Regresa (tarjeta, versión) o None si la respuesta no es válida."""
+    start = data.find(ID_SYNC)
+    if start < 0 or len(data) - start < ID_PACKET.size:
+        return None
+    _, boardId, version, check = ID_PACKET.unpack_from(data, start)
+    if check != boardId ^ version ^ 0xFF or boardId == 0:
+        return None
+    return boardId, version
+
+
+def probePort(port, baudRate=1000000, timeout=0.3):
+    """Consulta la identidad de la Tiva en port. Regresa (tarjeta, versión) o None."""
+    try:
+        with serial.Serial(port=port, baudrate=baudRate, timeout=timeout) as tiva:
+            tiva.reset_input_buffer()
+            tiva.write(ID_QUERY)
+            return parseIdentity(tiva.read(ID_PACKET.size))
+    except (serial.SerialException, OSError):
+        return None
+
+
+def discoverBoards(ports=None, baudRate=1000000, timeout=0.3):
+    """
+    Consulta todos los puertos en paralelo (por defecto los de comports()).
+    Regresa {tarjeta: (puerto, versión)}; si dos puertos dicen ser la misma
+    tarjeta se avisa y se conserva el primero.
+    """
+    ports = sorted(portCache.ports()) if ports is None else list(ports)
+    if not ports:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(ports)) as pool:
+        identities = list(pool.map(lambda port: probePort(port, baudRate, timeout), ports))
+
+    boards = {}
+    for port, identity in zip(ports, identities):
+        if identity is None:
+            continue
+        boardId, version = identity
+        if boardId in boards:
+            print(f"Error: la Tiva {boardId} responde en {boards[boardId][0]} y en {port}; se ignora {port}.")
+            continue
+        boards[boardId] = (port, version)
+    return boards
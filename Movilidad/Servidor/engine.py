@@ -0,0 +1,347 @@
+"""
+Motor de E/S serial con asyncio: un solo hilo atiende a todas las Tivas.
+
+Cada puerto se abre en modo no bloqueante y se registra con
+loop.add_reader, así que agregar tarjetas no agrega hilos. Requiere un
+sistema POSIX (los descriptores seriales de Windows no funcionan con
+add_reader); en Windows se siguen usando los hilos de Controller.
+
+Uso:
+    engine = SerialEngine()
+    movilidad = MotorControllerSystem(engine=engine)
+    movilidad.addController("/dev/ttyACM0")
+"""
+import asyncio
+import os
+import threading
+import time
+
+import serial
+
+from controller import TELEMETRY_FRAME, READ_TIMEOUT, STREAM_TIMEOUT, SUBSCRIBE_PACKET, StreamDecoder, writeRounds
+
+
+class SerialLink:
+    """Puerto serial no bloqueante de una Tiva dentro del event loop."""
+    def __init__(self, controller, loop):
+        self.controller = controller
+        self.loop = loop
+        self.serial = serial.Serial(port=controller.COM, baudrate=controller.baudRate, timeout=0)
+        self.fd = self.serial.fileno()
+        self.buffer = bytearray()
+        self.waiter = None      # (bytes esperados, future)
+        self.frameWaiters = []  # Futures de SerialEngine.poll que esperan la siguiente trama
+        self.deadline = 0.0     # Límite de la lectura pendiente (loop.time())
+        self.polling = False    # Poll continuo manejado desde onReadable
+        self.ackSize = 0        # Bytes de confirmación que preceden a la siguiente trama
+        self.timeout = READ_TIMEOUT
+        self.decoder = None     # StreamDecoder en modo streaming
+        self.lastFrame = time.perf_counter()
+        self.sent = 0.0         # Envío del último '$' (latencia de ida y vuelta)
+        self.failed = False     # El puerto se desconectó
+        loop.add_reader(self.fd, self.onReadable)
+
+    def onReadable(self):
+        try:
+            data = os.read(self.fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self.fail(serial.SerialException(str(e)))
+            return
+        if not data:
+            # Listo para leer sin datos: el dispositivo desapareció (USB desconectado)
+            self.fail(serial.SerialException("el dispositivo no regresó datos"))
+            return
+        self.controller.linkStats.bytesIn += len(data)
+        if self.decoder is not None:
+            frames = self.decoder.feed(data)
+            for seq in self.decoder.takeAcks():
+                self.controller.unacked.pop(seq, None)
+            if frames:
+                self.lastFrame = time.perf_counter()
+                for values in frames:
+                    self.controller.applyValues(values)
+                self.frameArrived(True)
+            return
+        self.buffer += data
+        if self.polling:
+            if self.ackSize and len(self.buffer) >= self.ackSize:
+                ok = self.controller.handleAck(self.buffer[:self.ackSize])
+                del self.buffer[:self.ackSize]
+                self.ackSize = 0
+                if not ok:
+                    self.controller.ackFailed()
+                    self.buffer.clear()
+                    self.requestFrame()
+                    return
+            if not self.ackSize and len(self.buffer) >= TELEMETRY_FRAME.size:
+                self.controller.linkStats.poll(time.perf_counter() - self.sent)
+                self.controller.handleTelemetry(self.buffer[:TELEMETRY_FRAME.size])
+                del self.buffer[:TELEMETRY_FRAME.size]
+                self.frameArrived(True)
+                self.requestFrame()
+            return
+        if self.waiter and len(self.buffer) >= self.waiter[0]:
+            size, future = self.waiter
+            self.waiter = None
+            if not future.done():
+                future.set_result(bytes(self.buffer[:size]))
+            del self.buffer[:size]
+
+    def frameArrived(self, ok):
+        """Entrega el resultado a los poll() que esperan la siguiente trama."""
+        waiters, self.frameWaiters = self.frameWaiters, []
+        for future in waiters:
+            if not future.done():
+                future.set_result(ok)
+
+    @property
+    def continuous(self):
+        """La telemetría llega sola (poll continuo o streaming): nadie más debe escribir '$'."""
+        return self.polling or self.decoder is not None
+
+    def fail(self, exc):
+        print(f"Error en la conexión serial ({self.controller.COM}): {exc}")
+        self.controller.linkStats.errors += 1
+        self.failed = True
+        self.loop.remove_reader(self.fd)
+        self.polling = False
+        if self.waiter and not self.waiter[1].done():
+            self.waiter[1].set_exception(exc)
+        self.waiter = None
+        self.frameArrived(False)
+
+    def startPolling(self):
+        """Poll continuo: cada trama completa dispara el siguiente '$' sin pasar por una tarea."""
+        if self.waiter:
+            # Una lectura puntual pendiente ya no recibiría sus bytes: el poll continuo los toma
+            size, future = self.waiter
+            self.waiter = None
+            self.buffer.clear()
+            if not future.done():
+                future.set_result(b'')
+        self.polling = True
+        self.requestFrame()
+
+    def requestFrame(self):
+        controller = self.controller
+        if not controller.running:
+            self.polling = False
+            return
+        if controller.commands:
+            self.ackSize = controller.sendParams(self)
+        self.deadline = self.loop.time() + self.timeout
+        self.sent = time.perf_counter()
+        controller.write(self, b'$')
+
+    def write(self, data):
+        """Escritura directa al descriptor; los paquetes son pequeños y no bloquean."""
+        os.write(self.fd, data)
+
+    async def read(self, size, timeout=1.0):
+        """Espera exactamente size bytes; regresa b'' si se agota el tiempo."""
+        if len(self.buffer) >= size:
+            data = bytes(self.buffer[:size])
+            del self.buffer[:size]
+            return data
+        future = self.loop.create_future()
+        self.waiter = (size, future)
+        # El barrido de SerialEngine revisa el límite; evita un timer por lectura
+        self.deadline = self.loop.time() + timeout
+        return await future
+
+    def expire(self, now):
+        """Si se agotó el tiempo, descarta la respuesta incompleta para no desalinear la siguiente."""
+        if self.polling and now > self.deadline:
+            self.buffer.clear()
+            self.controller.linkStats.shortReads += 1
+            if self.ackSize:
+                self.ackSize = 0
+                self.controller.ackFailed()
+            self.requestFrame()
+        if self.waiter and now > self.deadline:
+            future = self.waiter[1]
+            self.waiter = None
+            self.buffer.clear()
+            if not future.done():
+                future.set_result(b'')
+
+    def close(self):
+        self.loop.remove_reader(self.fd)
+        self.polling = False
+        if self.waiter and not self.waiter[1].done():
+            self.waiter[1].set_result(b'')
+        self.waiter = None
+        self.frameArrived(False)
+        self.serial.close()
+
+
+class SerialEngine:
+    """Event loop compartido por todos los Controller, con puente para hilos (Tk)."""
+    SWEEP_PERIOD = 0.05     # Resolución de los timeouts de lectura [s]
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = None
+        self.links = {}     # Controller -> SerialLink
+        self.tasks = {}     # Controller -> asyncio.Task
+
+    def start(self):
+        if self.thread is None:
+            self.loop.call_soon_threadsafe(self.sweep)
+            self.thread = threading.Thread(target=self.loop.run_forever)
+            self.thread.daemon = True
+            self.thread.start()
+
+    def sweep(self):
+        """Un solo timer revisa los timeouts de todas las lecturas pendientes."""
+        now = self.loop.time()
+        for link in self.links.values():
+            link.expire(now)
+        self.sweepHandle = self.loop.call_later(self.SWEEP_PERIOD, self.sweep)
+
+    def stop(self):
+        """Detiene todas las tareas, cierra los puertos y el hilo del loop."""
+        if self.thread is None:
+            return
+        self.submit(self._shutdown()).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.thread = None
+
+    async def _shutdown(self):
+        self.sweepHandle.cancel()
+        for task in self.tasks.values():
+            task.cancel()
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+        for link in self.links.values():
+            link.close()
+        self.tasks.clear()
+        self.links.clear()
+
+    # --- Puente seguro para otros hilos (GUI) ---
+
+    def submit(self, coro):
+        """Programa una corrutina desde cualquier hilo. Regresa un concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def submitToTk(self, widget, coro, callback):
+        """Ejecuta coro en el loop y entrega el resultado a callback en el hilo de Tk."""
+        future = self.submit(coro)
+        future.add_done_callback(lambda f: widget.after(0, callback, f.result()))
+        return future
+
+    def addController(self, controller):
+        """Registra un Controller y arranca su tarea de adquisición (seguro entre hilos)."""
+        self.start()
+        return self.submit(self._attach(controller))
+
+    def removeController(self, controller):
+        return self.submit(self._detach(controller))
+
+    # --- API asíncrona ---
+
+    async def _attach(self, controller):
+        controller.running = True
+        controller.active = True
+        try:
+            link = self.links[controller] = SerialLink(controller, self.loop)
+        except serial.SerialException as e:
+            controller.linkStats.errors += 1
+            print(f"Error en la conexión serial ({controller.COM}): {e}")
+            controller.disconnected()
+            return
+        controller.connected(link)
+        self.tasks[controller] = self.loop.create_task(self.run(controller))
+
+    async def _detach(self, controller):
+        controller.running = False
+        task = self.tasks.pop(controller, None)
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        link = self.links.pop(controller, None)
+        if link:
+            link.close()
+        controller.disconnected()
+
+    async def poll(self, controller, timeout=1.0):
+        """
+        Espera una trama de telemetría nueva. Regresa True si llegó completa.
+        Si la Tiva ya está en poll continuo o streaming se espera la siguiente
+        trama de ese flujo (un '$' extra desalinearía sus respuestas); si no,
+        se envía '$' y se lee la respuesta.
+        """
+        link = self.links.get(controller)
+        if link is None or link.failed:
+            return False
+        if link.continuous:
+            future = self.loop.create_future()
+            link.frameWaiters.append(future)
+            try:
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                controller.linkStats.shortReads += 1
+                return False
+        sent = time.perf_counter()
+        controller.write(link, b'$')
+        data = await link.read(TELEMETRY_FRAME.size, timeout)
+        if len(data) == TELEMETRY_FRAME.size:
+            controller.linkStats.poll(time.perf_counter() - sent)
+            controller.handleTelemetry(data)
+            return True
+        controller.linkStats.shortReads += 1
+        return False
+
+    async def broadcast(self, rounds):
+        """Escribe los paquetes de una difusión en un solo turno del loop (ver broadcastSetPoint)."""
+        return writeRounds(rounds)
+
+    async def send_params(self, controller):
+        """Envía los parámetros pendientes de la Tiva (la confirmación llega con el flujo)."""
+        controller.sendParams(self.links[controller])
+
+    async def stream(self, controller):
+        """Modo streaming; regresa False si la firmware no responde para volver a poll."""
+        link = self.links[controller]
+        link.decoder = controller.decoder = StreamDecoder()
+        link.lastFrame = time.perf_counter()
+        controller.write(link, SUBSCRIBE_PACKET.pack(b'S', controller.streamRate))
+        period = min(1.0 / controller.streamRate, 0.01)
+        try:
+            while controller.running and not link.failed:
+                if controller.commands:
+                    await self.send_params(controller)
+                now = time.perf_counter()
+                controller.checkAcks(now)
+                if now - link.lastFrame > STREAM_TIMEOUT:
+                    return False
+                await asyncio.sleep(period)
+            return True
+        finally:
+            if not link.failed:
+                controller.write(link, SUBSCRIBE_PACKET.pack(b'S', 0))
+            link.decoder = None
+            link.buffer.clear()
+
+    async def run(self, controller):
+        """Equivalente a Controller.requestLoop dentro del event loop."""
+        try:
+            if controller.streamRate and not await self.stream(controller):
+                print(f"{controller.COM} no responde en modo streaming, usando poll.")
+            link = self.links[controller]
+            if link.failed:
+                return
+            link.startPolling()
+            while controller.running and link.polling:
+                await asyncio.sleep(self.SWEEP_PERIOD)
+        except (serial.SerialException, OSError) as e:
+            print(f"Error en la conexión serial ({controller.COM}): {e}")
+        finally:
+            # Liberar el puerto; si la Tiva sigue activa el supervisor la reconecta
+            self.tasks.pop(controller, None)
+            link = self.links.pop(controller, None)
+            if link:
+                link.close()
+            controller.disconnected()
@@ -0,0 +1,59 @@
+"""
+Estado de todos los motores en un solo arreglo NumPy.
+
+Cada fila es un motor (la fila i es el motor i+1) y las columnas son la
+telemetría y los parámetros en el orden de FIELDS. Motors es sólo una vista
+(flota, fila) sobre este arreglo, así que leer la flota completa es tomar
+una rebanada sin copiar nada: values() para la telemetría, params() para
+setpoints y ganancias, o records() para verla como arreglo estructurado.
+"""
+import threading
+
+import numpy as np
+
+VALUE_FIELDS = ["rpm", "error", "pid", "proportional", "integral", "derivative"]
+PARAM_FIELDS = ["setPoint", "kp", "ki", "kd"]
+FIELDS = VALUE_FIELDS + PARAM_FIELDS
+FIELD_INDEX = {name: i for i, name in enumerate(FIELDS)}
+MOTOR_DTYPE = np.dtype([(name, np.float64) for name in FIELDS])
+VALUES = slice(0, len(VALUE_FIELDS))
+PARAMS = slice(len(VALUE_FIELDS), len(FIELDS))
+
+
+class MotorFleet:
+    """Arreglo (motores, FIELDS) y banderas de parámetros pendientes por motor."""
+    def __init__(self, motors=6):
+        self.table = np.zeros((motors, len(FIELDS)))
+        self.updates = np.zeros(motors, dtype=bool)
+        self.lock = threading.Lock()
+
+    @property
+    def motors(self):
+        return self.table.shape[0]
+
+    def resize(self, motors):
+        """Agranda la flota conservando los valores (las vistas Motors siguen siendo válidas)."""
+        with self.lock:
+            if motors <= self.motors:
+                return
+            table = np.zeros((motors, len(FIELDS)))
+            table[:self.motors] = self.table
+            updates = np.zeros(motors, dtype=bool)
+            updates[:self.motors] = self.updates
+            self.table, self.updates = table, updates
+
+    def values(self):
+        """Vista (motores, 6) de la telemetría, sin copiar."""
+        return self.table[:, VALUES]
+
+    def params(self):
+        """Vista (motores, 4) de setPoint, kp, ki y kd, sin copiar."""
+        return self.table[:, PARAMS]
+
+    def column(self, name):
+        """Vista de un campo de todos los motores, p. ej. column("rpm")."""
+        return self.table[:, FIELD_INDEX[name]]
+
+    def records(self):
+        """La flota como arreglo estructurado MOTOR_DTYPE (misma memoria)."""
+        return self.table.view(MOTOR_DTYPE).reshape(-1)
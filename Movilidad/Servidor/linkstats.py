@@ -0,0 +1,99 @@
+"""
+Estadísticas del enlace serial de cada Tiva.
+
+Los contadores sólo se incrementan desde el hilo (o el event loop) que
+atiende a la Tiva, así que no llevan candado: registrar una muestra cuesta
+unas cuantas sumas. La latencia de ida y vuelta se guarda en un histograma
+de potencias de dos en microsegundos, suficiente para medianas y p99 sin
+guardar muestras.
+"""
+import time
+
+BUCKETS = 32    # Cubeta i: latencias en [2^(i-1), 2^i) us
+
+
+class LinkStats:
+    """Contadores e histograma de latencia de un Controller."""
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.polls = 0          # '$' respondidos completos
+        self.shortReads = 0     # Respuestas incompletas o vacías (timeout)
+        self.bytesIn = 0
+        self.bytesOut = 0
+        self.paramWrites = 0    # Paquetes de parámetros enviados ('&' o lotes 'B')
+        self.connects = 0       # Veces que se abrió el puerto
+        self.errors = 0         # Errores del puerto serial
+        self.recoveries = 0     # Reconexiones completas (hasta la primera trama)
+        self.lastRecovery = 0.0
+        self.maxRecovery = 0.0
+        self.rtt = [0] * BUCKETS
+        self.rttSum = 0.0
+        self.rttMax = 0.0
+        self.rate = 0.0         # Muestras/s en la última ventana
+        self.rateMark = (self.started, 0)
+
+    def poll(self, rtt):
+        """Registra un '$' respondido; rtt en segundos."""
+        self.polls += 1
+        self.rttSum += rtt
+        if rtt > self.rttMax:
+            self.rttMax = rtt
+        self.rtt[min(int(rtt * 1e6).bit_length(), BUCKETS - 1)] += 1
+
+    def recovery(self, elapsed):
+        """Registra el tiempo desde la pérdida de la conexión hasta la primera trama."""
+        self.recoveries += 1
+        self.lastRecovery = elapsed
+        self.maxRecovery = max(self.maxRecovery, elapsed)
+
+    def percentile(self, q):
+        """Límite superior [s] de la cubeta que contiene el percentil q (0-100)."""
+        total = sum(self.rtt)
+        if not total:
+            return 0.0
+        target = total * q / 100.0
+        count = 0
+        for i, n in enumerate(self.rtt):
+            count += n
+            if count >= target:
+                return (1 << i) * 1e-6
+        return self.rttMax
+
+    def sampleRate(self, frames, window=1.0):
+        """Muestras/s, actualizada a lo más una vez por ventana sin importar quién pregunte."""
+        now = time.perf_counter()
+        markTime, markFrames = self.rateMark
+        if now - markTime >= window:
+            self.rate = (frames - markFrames) / (now - markTime)
+            self.rateMark = (now, frames)
+        elif markFrames == 0 and now > markTime:
+            self.rate = frames / (now - markTime)
+        return self.rate
+
+    def reset(self):
+        self.__init__()
+
+    def asDict(self, frames=0, queued=0, lost=0, corrupt=0):
+        """Resumen legible; frames, queued, lost y corrupt vienen del Controller."""
+        return {
+            "frames": frames,
+            "rate": self.sampleRate(frames),
+            "polls": self.polls,
+            "rttMean": self.rttSum / self.polls if self.polls else 0.0,
+            "rttP50": self.percentile(50),
+            "rttP99": self.percentile(99),
+            "rttMax": self.rttMax,
+            "rttHistogram": list(self.rtt),
+            "shortReads": self.shortReads,
+            "bytesIn": self.bytesIn,
+            "bytesOut": self.bytesOut,
+            "paramsQueued": queued,
+            "paramWrites": self.paramWrites,
+            "reconnects": max(self.connects - 1, 0),
+            "errors": self.errors,
+            "lastRecovery": self.lastRecovery,
+            "maxRecovery": self.maxRecovery,
+            "streamLost": lost,
+            "streamCorrupt": corrupt,
+            "uptime": time.perf_counter() - self.started,
+        }
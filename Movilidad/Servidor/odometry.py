@@ -0,0 +1,89 @@
+"""
+Odometría por navegación a estima (dead reckoning) del rover.
+
+Integra las RPM de las seis ruedas en una pose (x, y, theta) con el modelo
+de dirección diferencial (skid-steer): la velocidad de cada lado es el
+promedio de sus ruedas y el giro es la diferencia entre lados dividida
+entre la vía efectiva. En un skid-steer las ruedas derrapan al girar, así
+que la vía efectiva es mayor que la geométrica (slip > 1, se calibra
+girando el rover en su lugar).
+
+Las muestras se integran por lotes con NumPy (sumas acumuladas), no una por
+una, así que el costo por muestra es mínimo aunque la adquisición sea de
+cientos de Hz y la interfaz sólo pida la pose a 25 FPS.
+
+Uso:
+    odometry = Odometry()
+    x, y, theta = odometry.integrate(times, rpm)    # rpm: (6, n) por motor
+"""
+from collections import namedtuple
+
+import numpy as np
+
+# Geometría del rover. left/right son los índices de motor de cada lado y
+# signs el sentido de giro de cada motor (+1 adelante, -1 montado al revés).
+Geometry = namedtuple("Geometry", ["wheelRadius", "trackWidth", "slip", "left", "right", "signs"])
+DEFAULT_GEOMETRY = Geometry(
+    wheelRadius=0.1,            # [m]
+    trackWidth=0.6,             # Distancia entre las ruedas izquierdas y derechas [m]
+    slip=1.0,                   # Vía efectiva / vía geométrica
+    left=(1, 3, 5),             # La Tiva n mueve la rueda izquierda 2n-1 y la derecha 2n
+    right=(2, 4, 6),
+    signs=(1, 1, 1, 1, 1, 1),
+)
+
+
+class Odometry:
+    """Pose integrada y último instante visto; integrate() avanza con un lote de muestras."""
+    def __init__(self, geometry=DEFAULT_GEOMETRY):
+        self.setGeometry(geometry)
+        self.reset()
+
+    def setGeometry(self, geometry):
+        self.geometry = geometry
+        # Matriz (2, motores) que pasa de rpm por motor a velocidad [m/s] por lado
+        motors = len(geometry.signs)
+        rpmToSpeed = 2 * np.pi * geometry.wheelRadius / 60
+        self.sides = np.zeros((2, motors))
+        for row, wheels in enumerate((geometry.left, geometry.right)):
+            for idx in wheels:
+                self.sides[row, idx - 1] = geometry.signs[idx - 1] * rpmToSpeed / len(wheels)
+
+    def reset(self, x=0.0, y=0.0, theta=0.0):
+        self.x = x
+        self.y = y
+        self.theta = theta          # [rad], 0 hacia +x y positivo en sentido antihorario
+        self.speed = 0.0            # Velocidad lineal de la última muestra [m/s]
+        self.lastTime = None
+
+    def integrate(self, times, rpm):
+        """
+        Integra un lote de n muestras: times (n,) en segundos y rpm (motores, n).
+        Regresa los arreglos (x, y, theta) de la pose tras cada muestra.
+        Tiempos repetidos no avanzan la pose y un lote que empieza antes del
+        anterior (se reinició la adquisición) continúa desde la pose actual.
+        """
+        times = np.asarray(times, dtype=float)
+        if times.size == 0:
+            return np.empty(0), np.empty(0), np.empty(0)
+        if self.lastTime is None or times[0] < self.lastTime:
+            previous = times[0]
+        else:
+            previous = self.lastTime
+        dt = np.diff(times, prepend=previous)
+        np.maximum(dt, 0.0, out=dt)
+        self.lastTime = times[-1]
+
+        left, right = self.sides @ np.asarray(rpm, dtype=float)[:self.sides.shape[1]]
+        speed = (left + right) / 2
+        omega = (right - left) / (self.geometry.trackWidth * self.geometry.slip)
+
+        theta = self.theta + np.cumsum(omega * dt)
+        # Rumbo al punto medio de cada intervalo (integración de segundo orden)
+        heading = theta - omega * dt / 2
+        x = self.x + np.cumsum(speed * np.cos(heading) * dt)
+        y = self.y + np.cumsum(speed * np.sin(heading) * dt)
+
+        self.x, self.y, self.theta = float(x[-1]), float(y[-1]), float(theta[-1])
+        self.speed = float(speed[-1])
+        return x, y, theta
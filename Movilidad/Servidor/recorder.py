@@ -0,0 +1,244 @@
+"""
+Grabación de sesiones de telemetría en un archivo binario columnar.
+
+Formato (little-endian):
+    Encabezado  : FILE_HEADER ('RNQS', versión, banderas) y CLOCK_HEADER (época)
+    Bloques     : CHUNK_HEADER + columnas del bloque (opcionalmente zlib)
+    Índice      : 'INDX' + número de bloques + INDEX_ENTRY por bloque
+    Cierre      : FILE_TRAILER (posición del índice, 'RNQE')
+
+Cada bloque guarda sus columnas una tras otra: tiempo (float64), motor
+(uint8) y los diez valores float32 de COLUMNS (telemetría y parámetros
+activos). Los bloques se escriben en un hilo aparte y la memoria está
+acotada por un grupo fijo de buffers: si el disco no da abasto, record()
+espera en lugar de perder tramas.
+
+El tiempo es time.perf_counter (monotónico): un ajuste del reloj de pared
+(NTP, horario de verano) no lo hace retroceder. Además nunca decrece dentro
+del archivo aunque varias Tivas graben desde sus hilos, así que los bloques
+quedan ordenados para buscar con searchsorted (replay.py). La época del
+encabezado convierte a hora de pared: tiempo + época = time.time(). Las
+sesiones de la versión 1 guardaban time.time() directamente (época 0).
+"""
+import csv
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+FILE_HEADER = struct.Struct('<4sHH')
+CLOCK_HEADER = struct.Struct('<d')          # Época: time.time() - time.perf_counter() al grabar
+CHUNK_HEADER = struct.Struct('<4sIIIdd')   # 'CHNK', tramas, bytes guardados, bytes crudos, t0, t1
+INDEX_ENTRY = struct.Struct('<QddI')       # posición, t0, t1, tramas
+FILE_TRAILER = struct.Struct('<Q4s')
+VERSION = 2
+COMPRESSED = 0x1
+
+COLUMNS = ["tiempo", "motor", "rpm", "error", "pid", "proportional", "integral", "derivative",
+           "setPoint", "kp", "ki", "kd"]
+VALUE_COLUMNS = COLUMNS[2:]
+
+
+class ChunkBuffer:
+    """Bloque preasignado de tramas, fila por trama."""
+    def __init__(self, frames):
+        self.stamps = np.zeros(frames, dtype=np.float64)
+        self.motors = np.zeros(frames, dtype=np.uint8)
+        self.values = np.zeros((frames, len(VALUE_COLUMNS)), dtype=np.float32)
+        self.count = 0
+
+    def encode(self, compress):
+        """Serializa por columnas. Regresa (encabezado, datos)."""
+        n = self.count
+        raw = b''.join([self.stamps[:n].tobytes(), self.motors[:n].tobytes(),
+                        np.ascontiguousarray(self.values[:n].T).tobytes()])
+        payload = zlib.compress(raw, 1) if compress else raw
+        header = CHUNK_HEADER.pack(b'CHNK', n, len(payload), len(raw), self.stamps[0], self.stamps[n - 1])
+        return header, payload
+
+
+def readHeader(data):
+    """Regresa (banderas, época, posición del primer bloque) del inicio de una sesión."""
+    magic, version, flags = FILE_HEADER.unpack_from(data, 0)
+    if magic != b'RNQS':
+        raise ValueError("El archivo no es una sesión grabada.")
+    if version < 2:
+        return flags, 0.0, FILE_HEADER.size
+    epoch, = CLOCK_HEADER.unpack_from(data, FILE_HEADER.size)
+    return flags, epoch, FILE_HEADER.size + CLOCK_HEADER.size
+
+
+def decodeChunk(header, payload, compressed):
+    """Regresa un diccionario de columnas numpy a partir de un bloque."""
+    n = header[1]
+    raw = zlib.decompress(payload) if compressed else payload
+    stamps = np.frombuffer(raw, dtype=np.float64, count=n)
+    motors = np.frombuffer(raw, dtype=np.uint8, count=n, offset=8 * n)
+    values = np.frombuffer(raw, dtype=np.float32, offset=9 * n).reshape(len(VALUE_COLUMNS), n)
+    columns = {"tiempo": stamps, "motor": motors}
+    columns.update(zip(VALUE_COLUMNS, values))
+    return columns
+
+
+class SessionRecorder:
+    """Escribe tramas de telemetría a disco desde un hilo de fondo."""
+    def __init__(self, path, chunkFrames=4096, compress=True, buffers=16):
+        self.path = path
+        self.chunkFrames = chunkFrames
+        self.compress = compress
+        self.free = queue.Queue()       # Buffers disponibles (memoria acotada)
+        for _ in range(buffers):
+            self.free.put(ChunkBuffer(chunkFrames))
+        self.full = queue.Queue()       # Bloques llenos pendientes de escribir
+        self.chunk = None
+        self.lock = threading.Lock()    # Varias Tivas graban desde sus propios hilos
+        self.thread = None
+        self.file = None
+        self.index = []
+        self.frames = 0
+        self.stalls = 0                 # Veces que record() esperó por un buffer libre
+        self.lastStamp = float('-inf')  # Mantiene el tiempo no decreciente entre hilos
+        self.stopped = False            # stop() ya corrió: las tramas tardías se descartan
+
+    def start(self):
+        self.file = open(self.path, 'wb')
+        self.file.write(FILE_HEADER.pack(b'RNQS', VERSION, COMPRESSED if self.compress else 0))
+        self.file.write(CLOCK_HEADER.pack(time.time() - time.perf_counter()))
+        self.chunk = self.free.get()
+        self.thread = threading.Thread(target=self.writerLoop)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def record(self, stamp, motor, values, params):
+        """
+        Agrega una trama: tiempo (time.perf_counter), motor (1-6), seis valores
+        de telemetría y [setPoint, kp, ki, kd].
+        """
+        with self.lock:
+            if self.stopped:
+                return      # Un hilo que aún tenía el recorder tras stopRecording
+            if self.chunk.count == self.chunkFrames:
+                self._rotate()
+            # Otra Tiva pudo tomar su tiempo antes y entrar después: no retroceder
+            stamp = self.lastStamp = max(stamp, self.lastStamp)
+            chunk = self.chunk
+            n = chunk.count
+            chunk.stamps[n] = stamp
+            chunk.motors[n] = motor
+            chunk.values[n] = (*values, *params)
+            chunk.count = n + 1
+            self.frames += 1
+
+    def recordBoard(self, stamp, motor, values, params):
+        """Agrega las tramas de los dos motores de una Tiva (12 valores y 8 parámetros)."""
+        with self.lock:
+            if self.stopped:
+                return
+            if self.chunk.count + 2 > self.chunkFrames:
+                self._rotate()
+            stamp = self.lastStamp = max(stamp, self.lastStamp)
+            chunk = self.chunk
+            n = chunk.count
+            chunk.stamps[n:n + 2] = stamp
+            chunk.motors[n] = motor
+            chunk.motors[n + 1] = motor + 1
+            chunk.values[n:n + 2].reshape(-1)[:] = (*values[0:6], *params[0:4], *values[6:12], *params[4:8])
+            chunk.count = n + 2
+            self.frames += 2
+
+    def _rotate(self):
+        """Entrega el bloque lleno al escritor y toma uno libre (espera si no hay)."""
+        self.full.put(self.chunk)
+        try:
+            self.chunk = self.free.get_nowait()
+        except queue.Empty:
+            self.stalls += 1
+            self.chunk = self.free.get()
+
+    def writerLoop(self):
+        while True:
+            chunk = self.full.get()
+            if chunk is None:
+                break
+            header, payload = chunk.encode(self.compress)
+            _, n, _, _, t0, t1 = CHUNK_HEADER.unpack(header)
+            self.index.append((self.file.tell(), t0, t1, n))
+            self.file.write(header)
+            self.file.write(payload)
+            chunk.count = 0
+            self.free.put(chunk)
+
+    def stop(self):
+        """Escribe el bloque parcial, el índice y cierra el archivo."""
+        with self.lock:
+            if self.stopped:
+                return
+            self.stopped = True
+            if self.chunk.count:
+                self.full.put(self.chunk)
+                self.chunk = None
+            self.full.put(None)
+        self.thread.join()
+        indexPos = self.file.tell()
+        self.file.write(b'INDX' + struct.pack('<I', len(self.index)))
+        for entry in self.index:
+            self.file.write(INDEX_ENTRY.pack(*entry))
+        self.file.write(FILE_TRAILER.pack(indexPos, b'RNQE'))
+        self.file.close()
+
+
+def iterChunks(path, wallClock=False):
+    """
+    Recorre los bloques de una sesión en orden (también si no se cerró bien).
+    Con wallClock el tiempo se convierte a hora de pared (time.time()).
+    """
+    with open(path, 'rb') as f:
+        try:
+            flags, epoch, start = readHeader(f.read(FILE_HEADER.size + CLOCK_HEADER.size))
+        except (ValueError, struct.error):
+            raise ValueError(f"{path} no es una sesión grabada.")
+        f.seek(start)
+        while True:
+            data = f.read(CHUNK_HEADER.size)
+            if len(data) < CHUNK_HEADER.size or data[:4] != b'CHNK':
+                break
+            header = CHUNK_HEADER.unpack(data)
+            payload = f.read(header[2])
+            if len(payload) < header[2]:
+                break   # Bloque truncado
+            columns = decodeChunk(header, payload, flags & COMPRESSED)
+            if wallClock:
+                columns["tiempo"] = columns["tiempo"] + epoch
+            yield columns
+
+
+def loadColumns(path, wallClock=False):
+    """Carga una sesión completa como columnas numpy (estilo Parquet)."""
+    chunks = list(iterChunks(path, wallClock))
+    if not chunks:
+        return {name: np.zeros(0) for name in COLUMNS}
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in COLUMNS}
+
+
+def exportCSV(path, csvPath):
+    """Exporta una sesión a CSV, un bloque a la vez."""
+    with open(csvPath, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for chunk in iterChunks(path, wallClock=True):
+            writer.writerows(zip(*(chunk[name].tolist() for name in COLUMNS)))
+
+
+def exportParquet(path, parquetPath):
+    """Exporta una sesión a Parquet (requiere pyarrow)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("Error: exportar a Parquet requiere pyarrow (pip install pyarrow).")
+        return
+    pq.write_table(pa.table(loadColumns(path, wallClock=True)), parquetPath)
@@ -0,0 +1,223 @@
+"""
+Cliente del servidor de telemetría (server.py).
+
+RemoteSystem se comporta como MotorControllerSystem pero no abre ningún
+puerto serial: recibe la flota del demonio en su propio hilo, la publica en
+el mismo TelemetrySnapshot, MotorFleet y StepMetrics que usa MovilidadTab, y
+envía los setpoints y ganancias como comandos. Con precision el servidor
+manda la flota comprimida con codec.py (ver COMPRESS en server.py), útil en
+enlaces remotos lentos. startRecording graba la flota tal como llega del
+demonio. Si el demonio se reinicia el cliente se reconecta solo; cerrar el cliente (stopAll) sólo lo desconecta,
+las Tivas siguen controladas por el demonio.
+
+Uso:
+    movilidad = RemoteSystem("127.0.0.1:5760")
+    movilidad = RemoteSystem("rover:5760", precision=DEFAULT_PRECISION)
+    movilidad.broadcastSetPoint(100)
+"""
+import json
+import math
+import socket
+import threading
+import time
+from collections import namedtuple
+
+from codec import TelemetryDecoder
+from controller import MotorControllerSystem, Motors
+from fleet import VALUES, FIELD_INDEX
+from server import (DEFAULT_ADDRESS, HELLO, TELEMETRY, STATS, COMPRESSED, SETPOINT, PARAMS, SUBSCRIBE,
+                    COMPRESS, HEARTBEAT, HEARTBEAT_PACKET, SETPOINT_PACKET, PARAMS_MESSAGE, SUBSCRIBE_PACKET, HELLO_PACKET, COMPRESSED_HEADER,
+                    PROTOCOL_VERSION, message, parseMessages, parseAddress, decodeTelemetry)
+
+# Lo que la interfaz necesita saber de la Tiva de un motor remoto
+RemoteBoard = namedtuple("RemoteBoard", ["COM", "boardId"])
+
+
+class RemoteSystem(MotorControllerSystem):
+    """MotorControllerSystem que refleja un demonio server.py en lugar de hablar con las Tivas."""
+    def __init__(self, address=DEFAULT_ADDRESS, rate=0, retry=1.0, precision=None, keyInterval=100):
+        super().__init__()
+        self.address = address
+        self.rate = rate                # Tramas por segundo pedidas (0: todas las del servidor)
+        self.precision = precision      # Paso por campo para COMPRESS (None: sin comprimir)
+        self.keyInterval = keyInterval
+        self.decoder = None
+        self.retry = retry              # Espera entre intentos de conexión [s]
+        self.sock = None
+        self.sendLock = threading.Lock()
+        self.remoteStats = {}           # Último STATS del servidor
+        self.remoteWatchdog = {}
+        self.remoteConnected = False
+        self.remoteMotors = {}          # Motor -> Motors sobre la flota local
+        self.frames = 0
+        self.lastSeq = None
+        self.lost = 0                   # Tramas que el servidor descartó o se perdieron
+        self.thread = threading.Thread(target=self.receiveLoop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def addController(self, COM, baudRate=1000000, streamRate=None, batch=False, boardId=None):
+        print(f"Modo remoto: las Tivas las controla el servidor en {self.address}; no se agrega {COM}.")
+
+    def jsonConfig(self, path, discover=True, watch=False):
+        return True
+
+    def openSocket(self):
+        family, address = parseAddress(self.address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            return None
+        if family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(1.0)
+        return sock
+
+    def receiveLoop(self):
+        while self.running:
+            sock = self.openSocket()
+            if sock is None:
+                time.sleep(self.retry)
+                continue
+            self.sock = sock
+            print(f"Conectado al servidor de telemetría {self.address}")
+            if self.rate:
+                self.send(message(SUBSCRIBE, SUBSCRIBE_PACKET.pack(self.rate)))
+            if self.precision is not None:
+                self.decoder = TelemetryDecoder()
+                options = {"precision": self.precision, "keyInterval": self.keyInterval}
+                self.send(message(COMPRESS, json.dumps(options).encode()))
+            inbox = bytearray()
+            while self.running:
+                try:
+                    data = sock.recv(65536)
+                except socket.timeout:
+                    continue
+                except OSError:
+                    data = b''
+                if not data:
+                    break
+                inbox += data
+                for kind, payload in parseMessages(inbox):
+                    self.handle(kind, payload)
+            self.sock = None
+            self.remoteConnected = False
+            sock.close()
+            if self.running:
+                print(f"Se perdió el servidor de telemetría {self.address}; reintentando.")
+
+    def handle(self, kind, payload):
+        if kind == TELEMETRY:
+            self.applyTelemetry(*decodeTelemetry(payload))
+        elif kind == COMPRESSED:
+            seq, = COMPRESSED_HEADER.unpack_from(payload)
+            frame = self.decoder.decode(payload[COMPRESSED_HEADER.size:])
+            if frame is not None:
+                self.applyTelemetry(frame[0], seq, frame[1])
+        elif kind == STATS:
+            stats = json.loads(payload)
+            self.remoteStats = stats["links"]
+            self.remoteWatchdog = stats.get("watchdog", {})
+            self.remoteConnected = stats["connected"]
+        elif kind == HELLO:
+            version, motors = HELLO_PACKET.unpack(payload)
+            if version != PROTOCOL_VERSION:
+                print(f"Aviso: el servidor usa la versión {version} del protocolo (cliente {PROTOCOL_VERSION}).")
+            self.resize(motors)
+
+    def resize(self, motors):
+        self.fleet.resize(motors)
+        self.snapshot.resize(motors)
+        self.metrics.resize(motors)
+
+    def applyTelemetry(self, stamp, seq, table):
+        motors = table.shape[0]
+        if motors > self.fleet.motors:
+            self.resize(motors)
+        if self.lastSeq is not None and seq != self.lastSeq + 1:
+            self.lost += (seq - self.lastSeq - 1) & 0xFFFFFFFF
+        self.lastSeq = seq
+        self.frames += 1
+        self.fleet.table[:motors] = table
+        recorder = self.recorder
+        now = time.perf_counter()
+        # Las filas de cada Tiva se publican (y graban) juntas, igual que lo hace su Controller
+        for row in range(0, motors - 1, 2):
+            values = self.fleet.table[row:row + 2, VALUES].ravel().tolist()
+            self.snapshot.publish(row, values, seq, stamp)
+            if recorder is not None:
+                recorder.recordBoard(now, row + 1, values, self.fleet.params()[row:row + 2].ravel().tolist())
+        self.metrics.update(0, stamp, self.fleet.table[:motors, FIELD_INDEX["setPoint"]].tolist(),
+                            self.fleet.table[:motors, FIELD_INDEX["rpm"]].tolist())
+
+    def send(self, data):
+        sock = self.sock
+        if sock is None:
+            print("Sin conexión con el servidor de telemetría; no se envió el comando.")
+            return False
+        try:
+            with self.sendLock:
+                sock.sendall(data)
+            return True
+        except OSError as e:
+            print(f"Error al enviar al servidor: {e}")
+            return False
+
+    def isConnected(self):
+        return self.sock is not None and self.remoteConnected
+
+    def stats(self):
+        return self.remoteStats
+
+    def watchdogStats(self):
+        return self.remoteWatchdog
+
+    def heartbeat(self, alive=True):
+        """El latido lo vigila el watchdog del servidor; sin conexión no hay nada que enviar."""
+        if self.sock is not None:
+            self.send(message(HEARTBEAT, HEARTBEAT_PACKET.pack(alive)))
+
+    def getMotor(self, idx=None):
+        if idx is None or not 1 <= idx <= self.fleet.motors:
+            return None
+        motor = self.remoteMotors.get(idx)
+        if motor is None:
+            motor = self.remoteMotors[idx] = Motors()
+        # Siempre sobre la flota actual (resize la reemplaza)
+        motor.fleet, motor.row = self.fleet, idx - 1
+        return motor
+
+    def getMotorController(self, idx=None):
+        if self.getMotor(idx) is None:
+            return None
+        return RemoteBoard(self.address, (idx + 1) // 2)
+
+    def updateMotor(self, idx=None, setPoint=None, kp=None, ki=None, kd=None):
+        params = (math.nan if value is None else value for value in (setPoint, kp, ki, kd))
+        if self.send(message(PARAMS, PARAMS_MESSAGE.pack(idx, *params))):
+            print(f"Updated motor: {idx}")
+
+    def broadcastSetPoint(self, setPoint, twoPhase=False, controllers=None):
+        self.send(message(SETPOINT, SETPOINT_PACKET.pack(setPoint)))
+        return 0.0
+
+    def setAllSetPoints(self, setPoint):
+        self.broadcastSetPoint(setPoint)
+
+    def autotune(self, motors=None, method="step", apply=True, **kwargs):
+        print("El autoajuste se corre en el servidor, no en un cliente remoto.")
+        return {}
+
+    def stopAll(self):
+        """Se desconecta del servidor; las Tivas siguen bajo su control."""
+        self.running = False
+        sock = self.sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.thread.join()
+        self.stopRecording()
@@ -0,0 +1,204 @@
+"""
+Reproducción de sesiones grabadas con recorder.py.
+
+El archivo se abre con mmap, así que sólo se leen (y descomprimen) los
+bloques que se van reproduciendo. El índice de bloques del final del
+archivo permite buscar por tiempo en O(log n); si la sesión no se cerró
+bien, el índice se reconstruye leyendo sólo los encabezados de bloque.
+
+ReplaySystem publica las tramas en el mismo TelemetrySnapshot que
+MotorControllerSystem, de modo que MovilidadTab las grafica sin cambios, y
+startRecording graba lo que se va reproduciendo (p. ej. un tramo de la
+sesión).
+
+Uso:
+    movilidad = ReplaySystem("sesion.rnq", speed=4.0)
+    movilidad.play()
+"""
+import mmap
+import struct
+import threading
+import time
+
+import numpy as np
+
+from controller import MotorControllerSystem
+from recorder import CHUNK_HEADER, FILE_TRAILER, COMPRESSED, VALUE_COLUMNS, decodeChunk, readHeader
+
+INDEX_DTYPE = np.dtype([('offset', '<u8'), ('t0', '<f8'), ('t1', '<f8'), ('frames', '<u4')])
+TELEMETRY_COLUMNS = VALUE_COLUMNS[:6]
+PARAM_COLUMNS = VALUE_COLUMNS[6:]
+
+
+class SessionReplay:
+    """Acceso aleatorio por tiempo a una sesión grabada."""
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            flags, self.epoch, self.dataStart = readHeader(self.mm)
+        except (ValueError, struct.error):
+            raise ValueError(f"{path} no es una sesión grabada.")
+        self.compressed = bool(flags & COMPRESSED)
+        self.index = self.readIndex()
+        self.cache = (None, None)   # (bloque, columnas) del último bloque decodificado
+
+    def readIndex(self):
+        """Índice de bloques (posición, t0, t1, tramas) sin copiar desde el mmap."""
+        size = len(self.mm)
+        if size >= FILE_TRAILER.size:
+            indexPos, magic = FILE_TRAILER.unpack_from(self.mm, size - FILE_TRAILER.size)
+            if magic == b'RNQE' and self.mm[indexPos:indexPos + 4] == b'INDX':
+                count = int.from_bytes(self.mm[indexPos + 4:indexPos + 8], 'little')
+                return np.frombuffer(self.mm, dtype=INDEX_DTYPE, count=count, offset=indexPos + 8)
+        # Sesión sin cerrar: recorrer sólo los encabezados de bloque
+        entries = []
+        pos = self.dataStart
+        while pos + CHUNK_HEADER.size <= size and self.mm[pos:pos + 4] == b'CHNK':
+            _, n, stored, _, t0, t1 = CHUNK_HEADER.unpack_from(self.mm, pos)
+            if pos + CHUNK_HEADER.size + stored > size:
+                break
+            entries.append((pos, t0, t1, n))
+            pos += CHUNK_HEADER.size + stored
+        return np.array(entries, dtype=INDEX_DTYPE)
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def start(self):
+        return float(self.index['t0'][0]) if len(self.index) else 0.0
+
+    @property
+    def end(self):
+        return float(self.index['t1'][-1]) if len(self.index) else 0.0
+
+    def chunk(self, i):
+        """Columnas del bloque i (se conserva el último decodificado)."""
+        if self.cache[0] == i:
+            return self.cache[1]
+        offset = int(self.index['offset'][i])
+        header = CHUNK_HEADER.unpack_from(self.mm, offset)
+        start = offset + CHUNK_HEADER.size
+        payload = memoryview(self.mm)[start:start + header[2]]
+        columns = decodeChunk(header, payload, self.compressed)
+        self.cache = (i, columns)
+        return columns
+
+    def seek(self, stamp):
+        """Regresa (bloque, trama) de la primera trama con tiempo >= stamp, en O(log n)."""
+        i = int(np.searchsorted(self.index['t1'], stamp, side='left'))
+        if i >= len(self.index):
+            return len(self.index), 0
+        stamps = self.chunk(i)["tiempo"]
+        return i, int(np.searchsorted(stamps, stamp, side='left'))
+
+    def close(self):
+        self.cache = (None, None)
+        self.index = None
+        self.mm.close()
+        self.file.close()
+
+
+class ReplaySystem(MotorControllerSystem):
+    """MotorControllerSystem que reproduce una sesión en lugar de hablar con las Tivas."""
+    def __init__(self, path, speed=1.0):
+        super().__init__()
+        self.session = SessionReplay(path)
+        self.speed = speed              # 1.0 = tiempo real, N = N veces, 0 = lo más rápido posible
+        self.position = self.session.start
+        self.playing = False
+        self.thread = None
+        self.seekTo = None
+        self.seeks = 0                  # Saltos aplicados (la interfaz reinicia sus gráficas)
+
+    def addController(self, COM, baudRate=1000000, streamRate=None, batch=False, boardId=None):
+        print(f"Modo reproducción: no se agrega el controlador {COM}.")
+
+    def jsonConfig(self, path, discover=True, watch=False):
+        return True
+
+    @property
+    def elapsed(self):
+        """Tiempo de sesión reproducido [s], según los tiempos grabados (no el reloj de pared)."""
+        return self.position - self.session.start
+
+    @property
+    def duration(self):
+        return self.session.end - self.session.start
+
+    def play(self):
+        if self.playing:
+            return
+        self.playing = True
+        self.thread = threading.Thread(target=self.playLoop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def pause(self):
+        self.playing = False
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def seek(self, stamp):
+        """Salta al tiempo stamp (absoluto, como en la columna tiempo)."""
+        if self.playing:
+            self.seekTo = stamp         # playLoop lo aplica entre tramas
+        else:
+            self.position = stamp
+            self.metrics.reset()
+            self.seeks += 1
+
+    def playLoop(self):
+        session = self.session
+        chunkIdx, frameIdx = session.seek(self.position)
+        wallStart, sessionStart = time.perf_counter(), self.position
+        while self.playing and chunkIdx < len(session):
+            columns = session.chunk(chunkIdx)
+            stamps = columns["tiempo"]
+            motors = columns["motor"]
+            values = np.column_stack([columns[name] for name in TELEMETRY_COLUMNS]).tolist()
+            params = np.column_stack([columns[name] for name in PARAM_COLUMNS]).tolist()
+            setPoints = columns["setPoint"].tolist()
+            n = len(stamps)
+            while self.playing and frameIdx < n:
+                if self.seekTo is not None:
+                    break
+                if self.speed > 0:
+                    # Publicar todo lo que ya debió mostrarse y dormir hasta la siguiente trama
+                    due = sessionStart + (time.perf_counter() - wallStart) * self.speed
+                    last = int(np.searchsorted(stamps, due, side='right'))
+                    if last <= frameIdx:
+                        time.sleep(min((stamps[frameIdx] - due) / self.speed, 0.05))
+                        continue
+                else:
+                    last = n
+                recorder = self.recorder
+                now = time.perf_counter()
+                for i in range(frameIdx, last):
+                    row = int(motors[i]) - 1
+                    if row >= self.snapshot.motors:
+                        self.snapshot.resize(row + 1)
+                        self.metrics.resize(row + 1)
+                    self.snapshot.publishMotor(row, values[i], i, stamps[i])
+                    self.metrics.update(row, float(stamps[i]), (setPoints[i],), (values[i][0],))
+                    if recorder is not None:
+                        recorder.record(now, row + 1, values[i], params[i])
+                frameIdx = last
+                self.position = float(stamps[last - 1])
+            if self.seekTo is not None:
+                self.position, self.seekTo = self.seekTo, None
+                self.metrics.reset()        # Los escalones en curso ya no son continuos
+                self.seeks += 1
+                chunkIdx, frameIdx = session.seek(self.position)
+                wallStart, sessionStart = time.perf_counter(), self.position
+                continue
+            if frameIdx >= n:
+                chunkIdx, frameIdx = chunkIdx + 1, 0
+        self.playing = False
+
+    def stopAll(self):
+        self.pause()
+        super().stopAll()
+        self.session.close()
@@ -0,0 +1,404 @@
+"""
+Servidor de telemetría sin interfaz gráfica.
+
+El demonio es dueño de las Tivas (MotorControllerSystem) y publica la flota
+por un socket local (TCP en loopback o Unix) con un protocolo binario. La
+interfaz, loggers o análisis se conectan como clientes (ver remote.py) y
+pueden entrar y salir sin tocar los hilos seriales: el lazo de control
+sigue corriendo aunque no haya ningún cliente.
+
+Cada mensaje es HEADER (sincronía, tipo, largo del contenido) seguido del
+contenido:
+
+    HELLO      servidor -> cliente   <BB    versión del protocolo, motores
+    TELEMETRY  servidor -> cliente   <dIB   tiempo, secuencia, motores; luego
+                                            motores x 10 float32 (FIELDS de fleet.py)
+    STATS      servidor -> cliente   JSON   {"connected": bool, "links": {puerto: stats},
+                                             "watchdog": stats de watchdog.py}
+    COMPRESSED servidor -> cliente   <I     secuencia; luego una trama de codec.py
+                                            (tramas clave y diferencias de la flota)
+    SETPOINT   cliente -> servidor   <f     setpoint para todos los motores
+    PARAMS     cliente -> servidor   <Bffff motor, setPoint, kp, ki, kd (NaN = sin cambio)
+    SUBSCRIBE  cliente -> servidor   <H     tramas por segundo (0 = pausa)
+    COMPRESS   cliente -> servidor   JSON   {"precision": {campo: paso}, "keyInterval": n}
+                                            cambia TELEMETRY por COMPRESSED ({} = sin pérdida)
+    HEARTBEAT  cliente -> servidor   <B     latido del operador (0 = deja de vigilarlo);
+                                            se ignora si el cliente no es el operador
+
+Un cliente que maneja el rover manda HEARTBEAT periódicamente: si el enlace
+se cae o el cliente se congela, el watchdog del demonio detiene los motores.
+Sólo cuenta el latido del operador, el último cliente que mandó SETPOINT o
+PARAMS; los de los demás (loggers, visores) se ignoran, así que no pueden
+desarmar ni rearmar el watchdog de quien maneja. Si el operador se
+desconecta deja de serlo y su último latido vence como si se hubiera
+congelado.
+
+Con COMPRESS cada cliente tiene su propio TelemetryEncoder: sólo avanza con
+las tramas que de verdad se le envían, así que descartar tramas por
+contrapresión no rompe la cadena de diferencias.
+
+Contrapresión: cada cliente tiene su propio buffer de salida y el servidor
+nunca espera a un cliente. El buffer del kernel de cada socket se limita a
+sendBuffer para que un cliente lento no acumule segundos de tramas viejas;
+si además acumula más de maxPending bytes sin enviar, sus tramas de
+telemetría se descartan (recibe la más nueva cuando se pone al día) y si no
+avanza en stallTimeout segundos se desconecta.
+
+Uso:
+    python server.py --listen 127.0.0.1:5760 --config config.json
+    python server.py --listen /tmp/rover.sock
+"""
+import argparse
+import json
+import math
+import os
+import selectors
+import signal
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+from codec import TelemetryEncoder
+from fleet import FIELDS, VALUE_FIELDS, VALUES, PARAMS as PARAM_COLUMNS
+
+PROTOCOL_VERSION = 1
+DEFAULT_ADDRESS = "127.0.0.1:5760"
+SYNC = b'\xaa\x54'
+HEADER = struct.Struct('<2sBH')
+HELLO, TELEMETRY, STATS, COMPRESSED = 1, 2, 3, 4
+SETPOINT, PARAMS, SUBSCRIBE, COMPRESS, HEARTBEAT = 16, 17, 18, 19, 20
+HELLO_PACKET = struct.Struct('<BB')
+TELEMETRY_HEADER = struct.Struct('<dIB')
+SETPOINT_PACKET = struct.Struct('<f')
+PARAMS_MESSAGE = struct.Struct('<Bffff')
+SUBSCRIBE_PACKET = struct.Struct('<H')
+COMPRESSED_HEADER = struct.Struct('<I')
+HEARTBEAT_PACKET = struct.Struct('<B')
+
+
+def message(kind, payload=b''):
+    return HEADER.pack(SYNC, kind, len(payload)) + payload
+
+
+def parseMessages(buffer):
+    """
+    Separa los mensajes completos al inicio de buffer (bytearray), que se
+    recorta. Regresa una lista de (tipo, contenido); los bytes basura antes
+    de una sincronía se descartan.
+    """
+    messages = []
+    while True:
+        start = buffer.find(SYNC)
+        if start < 0:
+            del buffer[:max(len(buffer) - 1, 0)]    # Puede quedar medio SYNC al final
+            return messages
+        if len(buffer) - start < HEADER.size:
+            del buffer[:start]
+            return messages
+        _, kind, length = HEADER.unpack_from(buffer, start)
+        end = start + HEADER.size + length
+        if len(buffer) < end:
+            del buffer[:start]
+            return messages
+        messages.append((kind, bytes(buffer[start + HEADER.size:end])))
+        del buffer[:end]
+
+
+def parseAddress(address):
+    """"host:puerto" -> (AF_INET, (host, puerto)); una ruta -> (AF_UNIX, ruta)."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    return socket.AF_UNIX, address
+
+
+def encodeTelemetry(table, seq, stamp):
+    motors = table.shape[0]
+    return message(TELEMETRY, TELEMETRY_HEADER.pack(stamp, seq, motors) + table.astype(np.float32).tobytes())
+
+
+def decodeTelemetry(payload):
+    """Regresa (tiempo, secuencia, arreglo (motores, len(FIELDS)) float32)."""
+    stamp, seq, motors = TELEMETRY_HEADER.unpack_from(payload)
+    table = np.frombuffer(payload, dtype=np.float32, offset=TELEMETRY_HEADER.size)
+    return stamp, seq, table.reshape(motors, len(FIELDS))
+
+
+class ClientConnection:
+    """Estado de un cliente: buffers, frecuencia pedida y contadores de contrapresión."""
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.inbox = bytearray()
+        self.outbox = bytearray()
+        self.period = 0.0           # Periodo pedido con SUBSCRIBE (0: cada trama del servidor)
+        self.paused = False
+        self.nextSend = 0.0
+        self.encoder = None         # TelemetryEncoder si el cliente pidió COMPRESS
+        self.writing = False        # Registrado con EVENT_WRITE (quedaron bytes por enviar)
+        self.sent = 0
+        self.dropped = 0            # Tramas descartadas por contrapresión
+        self.lastProgress = time.perf_counter()
+
+
+class TelemetryServer:
+    """Publica la flota de un MotorControllerSystem a todos los clientes conectados."""
+    def __init__(self, system, address=DEFAULT_ADDRESS, rate=100, maxPending=16384,
+                 sendBuffer=65536, stallTimeout=10.0, statsPeriod=1.0):
+        self.system = system
+        self.address = address
+        self.period = 1.0 / rate
+        self.maxPending = maxPending    # Bytes en espera por cliente antes de descartar tramas
+        self.sendBuffer = sendBuffer    # SO_SNDBUF de cada cliente: acota lo que el kernel acumula
+        self.stallTimeout = stallTimeout
+        self.statsPeriod = statsPeriod
+        self.selector = selectors.DefaultSelector()
+        self.listener = None
+        self.clients = {}           # socket -> ClientConnection
+        self.operator = None        # ClientConnection que maneja el rover (sus latidos alimentan el watchdog)
+        self.seq = 0
+        self.frame = None           # Copia consistente del TelemetrySnapshot (reutilizada)
+        self.table = None           # Flota publicada: telemetría de frame y parámetros actuales
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        family, address = parseAddress(self.address)
+        if family == socket.AF_UNIX and os.path.exists(address):
+            os.unlink(address)      # Socket de una ejecución anterior
+        self.listener = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(address)
+        self.listener.listen()
+        self.listener.setblocking(False)
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.running = True
+        self.thread = threading.Thread(target=self.serveLoop)
+        self.thread.daemon = True
+        self.thread.start()
+        print(f"Servidor de telemetría en {self.address}")
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        for sock in list(self.clients):
+            self.drop(sock)
+        if self.listener is not None:
+            self.selector.unregister(self.listener)
+            self.listener.close()
+            family, address = parseAddress(self.address)
+            if family == socket.AF_UNIX and os.path.exists(address):
+                os.unlink(address)
+            self.listener = None
+
+    def serveLoop(self):
+        nextTick = nextStats = time.perf_counter()
+        while self.running:
+            for key, events in self.selector.select(max(nextTick - time.perf_counter(), 0)):
+                if key.fileobj is self.listener:
+                    self.accept()
+                    continue
+                if events & selectors.EVENT_READ:
+                    self.receive(key.fileobj)
+                if events & selectors.EVENT_WRITE and key.fileobj in self.clients:
+                    self.flush(self.clients[key.fileobj])
+            now = time.perf_counter()
+            if now >= nextTick:
+                self.publish(now)
+                nextTick += self.period
+                if nextTick < now:
+                    nextTick = now + self.period    # Atrasado: no publicar en ráfaga
+            if now >= nextStats:
+                self.publishStats()
+                nextStats = now + self.statsPeriod
+
+    def accept(self):
+        try:
+            sock, address = self.listener.accept()
+        except OSError:
+            return
+        sock.setblocking(False)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.sendBuffer)
+        if sock.family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client = ClientConnection(sock, address or "unix")
+        self.clients[sock] = client
+        self.selector.register(sock, selectors.EVENT_READ)
+        print(f"Cliente conectado: {client.address}")
+        self.send(client, message(HELLO, HELLO_PACKET.pack(PROTOCOL_VERSION, self.system.fleet.motors)))
+        self.sendStats(client)
+
+    def drop(self, sock):
+        client = self.clients.pop(sock, None)
+        if client is None:
+            return
+        self.selector.unregister(sock)
+        sock.close()
+        print(f"Cliente desconectado: {client.address} ({client.sent} tramas, {client.dropped} descartadas)")
+        if client is self.operator:
+            # Sin heartbeat(False): si estaba vigilado, su último latido vence y el watchdog detiene el rover
+            self.operator = None
+
+    def receive(self, sock):
+        client = self.clients.get(sock)
+        if client is None:
+            return
+        try:
+            data = sock.recv(4096)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self.drop(sock)
+            return
+        client.inbox += data
+        for kind, payload in parseMessages(client.inbox):
+            self.handle(client, kind, payload)
+
+    def handle(self, client, kind, payload):
+        """Aplica un comando de un cliente. Los comandos mal formados se ignoran."""
+        try:
+            if kind == SETPOINT:
+                setPoint, = SETPOINT_PACKET.unpack(payload)
+                self.operator = client
+                self.system.broadcastSetPoint(setPoint)
+            elif kind == PARAMS:
+                idx, *params = PARAMS_MESSAGE.unpack(payload)
+                setPoint, kp, ki, kd = (None if math.isnan(value) else value for value in params)
+                self.operator = client
+                self.system.updateMotor(idx, setPoint=setPoint, kp=kp, ki=ki, kd=kd)
+            elif kind == SUBSCRIBE:
+                rate, = SUBSCRIBE_PACKET.unpack(payload)
+                client.paused = rate == 0
+                client.period = 1.0 / rate if rate else 0.0
+            elif kind == HEARTBEAT:
+                alive, = HEARTBEAT_PACKET.unpack(payload)
+                if client is self.operator:
+                    self.system.heartbeat(bool(alive))
+            elif kind == COMPRESS:
+                options = json.loads(payload)
+                client.encoder = TelemetryEncoder(FIELDS, options.get("precision", {}),
+                                                  options.get("keyInterval", 100))
+            else:
+                print(f"Mensaje desconocido de {client.address}: {kind}")
+        except (struct.error, ValueError, AttributeError):
+            print(f"Mensaje mal formado de {client.address}: {kind}")
+
+    def send(self, client, data):
+        client.outbox += data
+        self.flush(client)
+
+    def flush(self, client):
+        """Envía lo que acepte el socket sin bloquear y pide EVENT_WRITE si quedó algo."""
+        if client.outbox:
+            try:
+                sent = client.sock.send(client.outbox)
+            except (BlockingIOError, InterruptedError):
+                sent = 0
+            except OSError:
+                self.drop(client.sock)
+                return
+            if sent:
+                del client.outbox[:sent]
+                client.lastProgress = time.perf_counter()
+        writing = bool(client.outbox)
+        if writing != client.writing:
+            client.writing = writing
+            self.selector.modify(client.sock, selectors.EVENT_READ | (selectors.EVENT_WRITE if writing else 0))
+
+    def publish(self, now):
+        """Codifica la flota una sola vez y la entrega a cada cliente que la quiera."""
+        if not self.clients:
+            return
+        self.seq += 1
+        seq, stamp = self.seq & 0xFFFFFFFF, time.time()
+        table = self.fleetTable()
+        frame = None
+        for sock, client in list(self.clients.items()):
+            if client.paused or now < client.nextSend:
+                continue
+            client.nextSend = now + client.period
+            if len(client.outbox) > self.maxPending:
+                client.dropped += 1
+                if now - client.lastProgress > self.stallTimeout:
+                    print(f"El cliente {client.address} no recibe datos; se desconecta.")
+                    self.drop(sock)
+                continue
+            client.sent += 1
+            if client.encoder is not None:
+                payload = COMPRESSED_HEADER.pack(seq) + client.encoder.encode(stamp, table)
+                self.send(client, message(COMPRESSED, payload))
+                continue
+            if frame is None:
+                frame = encodeTelemetry(table, seq, stamp)
+            self.send(client, frame)
+
+    def fleetTable(self):
+        """
+        La flota a publicar sin mezclar muestras: la telemetría sale de una copia
+        consistente del TelemetrySnapshot (nunca de fleet.table mientras los hilos
+        seriales la escriben) y los parámetros, de la flota.
+        """
+        fleet = self.system.fleet
+        self.frame = self.system.getSnapshot(self.frame)
+        if self.table is None or self.table.shape[0] != fleet.motors:
+            self.table = np.zeros((fleet.motors, len(FIELDS)))
+        rows = min(len(self.frame), fleet.motors)
+        self.table[:rows, VALUES] = self.frame[:rows, :len(VALUE_FIELDS)]
+        self.table[:, PARAM_COLUMNS] = fleet.params()
+        return self.table
+
+    def statsMessage(self):
+        links = self.system.stats()
+        return message(STATS, json.dumps({"connected": self.system.isConnected(), "links": links,
+                                          "watchdog": self.system.watchdogStats()}).encode())
+
+    def sendStats(self, client):
+        self.send(client, self.statsMessage())
+
+    def publishStats(self):
+        if not self.clients:
+            return
+        data = self.statsMessage()
+        for client in list(self.clients.values()):
+            if len(client.outbox) <= self.maxPending:
+                self.send(client, data)
+
+    def clientStats(self):
+        """{dirección: {"sent", "dropped", "pending"}} de cada cliente conectado."""
+        return {str(c.address): {"sent": c.sent, "dropped": c.dropped, "pending": len(c.outbox)}
+                for c in self.clients.values()}
+
+
+if __name__ == "__main__":
+    from config import DEFAULT_PATH
+    from controller import MotorControllerSystem
+
+    parser = argparse.ArgumentParser(description="Demonio de telemetría del rover (sin interfaz)")
+    parser.add_argument("--listen", default=DEFAULT_ADDRESS, help='"host:puerto" o ruta de socket Unix')
+    parser.add_argument("--config", default=DEFAULT_PATH, help="config.json de las Tivas (se recarga al cambiar)")
+    parser.add_argument("--rate", type=int, default=100, help="Tramas por segundo publicadas")
+    args = parser.parse_args()
+
+    system = MotorControllerSystem()
+    if not system.jsonConfig(args.config, watch=True):
+        raise SystemExit(1)
+    server = TelemetryServer(system, args.listen, args.rate).start()
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        while not stop.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        pass
+    server.stop()
+    system.stopAll()
@@ -0,0 +1,318 @@
+"""
+Simulador de la firmware de las Tiva sobre un pseudo-terminal (Linux).
+
+Cada TivaSimulator abre un par pty y habla el mismo protocolo que
+Controller: responde '$' con los 48 bytes de telemetría, acepta los
+paquetes '&' y los lotes 'B' de parámetros, el setpoint en dos fases
+('P' y 'C'), la consulta de identidad '?' y la suscripción 'S' del modo
+streaming. stall() emula una firmware colgada: el puerto sigue abierto
+pero la Tiva no responde ni transmite. Los motores se modelan como plantas de primer
+orden con su propio PID, de modo que los setpoints enviados se reflejan en
+la telemetría.
+
+Uso:
+    python simulator.py --boards 3 --latency 0.002 --jitter 0.001
+    python simulator.py --boards 3 --stall 10      # La Tiva 1 se cuelga a los 10 s
+"""
+import argparse
+import os
+import random
+import select
+import struct
+import threading
+import time
+import tty
+from collections import deque
+
+from controller import (TELEMETRY_FRAME, PARAMS_PACKET, SUBSCRIBE_PACKET, BATCH_PACKET,
+                        ACK_SYNC, ACK_PACKET, STAGE_PACKET, COMMIT_PACKET, STREAM_SYNC,
+                        streamChecksum)
+from discovery import ID_QUERY, idPacket
+
+
+class MotorPlant:
+    """Motor de primer orden (ganancia, constante de tiempo y retardo) con lazo PID."""
+    def __init__(self, gain=1.0, tau=0.15, uMax=1023.0, delay=0.0):
+        self.gain = gain
+        self.tau = tau
+        self.uMax = uMax
+        self.delay = delay          # Tiempo muerto entre pid y el motor [s]
+        self.pending = deque()      # (tiempo, pid) aún no aplicados por el retardo
+        self.clock = 0.0
+        self.drive = 0.0            # pid que ve el motor
+        self.setPoint = 0.0
+        self.kp = 0.0
+        self.ki = 0.0
+        self.kd = 0.0
+        self.rpm = 0.0
+        self.error = 0.0
+        self.prevError = 0.0
+        self.pid = 0.0
+        self.proportional = 0.0
+        self.integral = 0.0
+        self.derivative = 0.0
+
+    def setParams(self, setPoint, kp, ki, kd):
+        self.setPoint = setPoint
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+
+    def step(self, dt):
+        """Avanza el lazo cerrado dt segundos."""
+        self.error = self.setPoint - self.rpm
+        self.proportional = self.kp * self.error
+        self.integral += self.ki * self.error * dt
+        self.derivative = self.kd * (self.error - self.prevError) / dt
+        self.prevError = self.error
+        u = self.proportional + self.integral + self.derivative
+        self.pid = max(-self.uMax, min(self.uMax, u))
+        if self.delay > 0:
+            self.clock += dt
+            self.pending.append((self.clock, self.pid))
+            while self.pending and self.clock - self.pending[0][0] >= self.delay:
+                self.drive = self.pending.popleft()[1]
+        else:
+            self.drive = self.pid
+        self.rpm += dt / self.tau * (self.gain * self.drive - self.rpm)
+
+    def getValues(self):
+        return [self.rpm, self.error, self.pid, self.proportional, self.integral, self.derivative]
+
+
+class TivaSimulator:
+    """Tiva falsa conectada a un pseudo-terminal."""
+    def __init__(self, latency=0.0, jitter=0.0, dropRate=0.0, baudRate=None, dt=0.001, seed=None,
+                 streaming=True, batch=True, link=None, boardId=None, version=1, **plantArgs):
+        self.latency = latency      # Retardo fijo de respuesta [s]
+        self.jitter = jitter        # Retardo aleatorio adicional máximo [s]
+        self.dropRate = dropRate    # Probabilidad de perder un byte por respuesta
+        self.baudRate = baudRate    # Si se indica, simula el tiempo en el cable (10 bits/byte)
+        self.dt = dt                # Paso de integración de la planta [s]
+        self.streaming = streaming  # False emula una firmware sin modo streaming
+        self.batch = batch          # False emula una firmware sin lotes 'B'
+        self.staged = None          # (secuencia, setpoints) guardados por 'P'
+        self.applied = 0.0          # Último cambio de setpoint (perf_counter) para medir desfase
+        self.stalled = False        # Firmware colgada: descarta lo que llega y no transmite
+        self.streamPeriod = None
+        self.nextFrame = 0.0
+        self.seq = 0
+        self.random = random.Random(seed)
+        self.link = link            # Ruta fija (symlink) que sobrevive a desconectar y reconectar
+        self.boardId = boardId      # None emula una firmware sin consulta de identidad
+        self.version = version
+        self.plantArgs = plantArgs
+        self.motors = [MotorPlant(**plantArgs), MotorPlant(**plantArgs)]
+        self.master = None
+        self.slave = None
+        self.device = None
+        self.running = False
+        self.thread = None
+        self.buffer = bytearray()
+        self.lastStep = time.perf_counter()
+
+    def start(self):
+        """Crea el pty y arranca el hilo de la firmware. Regresa la ruta del dispositivo."""
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.master)
+        tty.setraw(self.slave)
+        self.device = os.ttyname(self.slave)
+        if self.link:
+            if os.path.lexists(self.link):
+                os.remove(self.link)
+            os.symlink(self.device, self.link)
+            self.device = self.link
+        self.running = True
+        self.lastStep = time.perf_counter()
+        self.thread = threading.Thread(target=self.serveLoop)
+        self.thread.daemon = True
+        self.thread.start()
+        return self.device
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+        for fd in (self.master, self.slave):
+            if fd is not None:
+                os.close(fd)
+        self.master = self.slave = None
+        if self.link and os.path.lexists(self.link):
+            os.remove(self.link)
+
+    def unplug(self):
+        """Emula desconectar el USB: el puerto desaparece."""
+        self.stop()
+
+    def stall(self):
+        """Emula una firmware colgada: el puerto sigue abierto pero nada responde."""
+        self.stalled = True
+
+    def resume(self):
+        """La firmware vuelve a responder (la suscripción al streaming se conserva)."""
+        self.stalled = False
+        self.buffer.clear()
+        self.nextFrame = time.perf_counter()
+
+    def plug(self):
+        """Emula reconectar el USB: la Tiva arranca de nuevo con parámetros en cero."""
+        self.motors = [MotorPlant(**self.plantArgs), MotorPlant(**self.plantArgs)]
+        self.staged = None
+        self.streamPeriod = None
+        self.buffer.clear()
+        return self.start()
+
+    def serveLoop(self):
+        while self.running:
+            timeout = 0.1
+            if self.streamPeriod and not self.stalled:
+                timeout = max(0.0, self.nextFrame - time.perf_counter())
+            ready, _, _ = select.select([self.master], [], [], timeout)
+            if ready:
+                try:
+                    data = os.read(self.master, 4096)
+                except OSError:
+                    break
+                if self.stalled:
+                    continue
+                self.buffer += data
+                self.processBuffer()
+            if self.stalled:
+                continue
+            if self.streamPeriod and time.perf_counter() >= self.nextFrame:
+                self.reply(self.streamFrame())
+                self.nextFrame += self.streamPeriod
+                # Si el enlace no da abasto, no acumular tramas atrasadas
+                self.nextFrame = max(self.nextFrame, time.perf_counter() - self.streamPeriod)
+
+    def processBuffer(self):
+        """Consume todos los comandos completos del buffer."""
+        while self.buffer:
+            cmd = self.buffer[0:1]
+            if cmd == b'$':
+                del self.buffer[0]
+                self.reply(self.telemetry())
+            elif cmd == b'&':
+                if len(self.buffer) < PARAMS_PACKET.size:
+                    return      # Paquete incompleto, esperar más bytes
+                _, idx, setPoint, kp, ki, kd = PARAMS_PACKET.unpack_from(self.buffer)
+                del self.buffer[0:PARAMS_PACKET.size]
+                if idx in (1, 2):
+                    self.motors[idx - 1].setParams(setPoint, kp, ki, kd)
+                    self.applied = time.perf_counter()
+            elif cmd == b'B' and self.batch:
+                if len(self.buffer) < BATCH_PACKET.size:
+                    return
+                _, seq, mask, *params = BATCH_PACKET.unpack_from(self.buffer)
+                del self.buffer[0:BATCH_PACKET.size]
+                for i, motor in enumerate(self.motors):
+                    if mask & (1 << i):
+                        motor.setParams(*params[4 * i:4 * i + 4])
+                self.applied = time.perf_counter()
+                self.reply(ACK_PACKET.pack(ACK_SYNC, seq, seq ^ 0xFF))
+            elif cmd == ID_QUERY and self.boardId:
+                del self.buffer[0]
+                self.reply(idPacket(self.boardId, self.version))
+            elif cmd == b'P':
+                if len(self.buffer) < STAGE_PACKET.size:
+                    return
+                _, seq, *setPoints = STAGE_PACKET.unpack_from(self.buffer)
+                del self.buffer[0:STAGE_PACKET.size]
+                self.staged = (seq, setPoints)
+            elif cmd == b'C':
+                if len(self.buffer) < COMMIT_PACKET.size:
+                    return
+                _, seq = COMMIT_PACKET.unpack_from(self.buffer)
+                del self.buffer[0:COMMIT_PACKET.size]
+                if self.staged and self.staged[0] == seq:
+                    for motor, setPoint in zip(self.motors, self.staged[1]):
+                        motor.setPoint = setPoint
+                    self.applied = time.perf_counter()
+                    self.staged = None
+            elif cmd == b'S' and self.streaming:
+                if len(self.buffer) < SUBSCRIBE_PACKET.size:
+                    return
+                _, rate = SUBSCRIBE_PACKET.unpack_from(self.buffer)
+                del self.buffer[0:SUBSCRIBE_PACKET.size]
+                self.streamPeriod = 1.0 / rate if rate else None
+                self.nextFrame = time.perf_counter()
+            else:
+                del self.buffer[0]  # Byte desconocido
+
+    def advance(self):
+        """Integra las plantas hasta el instante actual."""
+        now = time.perf_counter()
+        steps = min(int((now - self.lastStep) / self.dt), 10000)
+        for _ in range(steps):
+            for motor in self.motors:
+                motor.step(self.dt)
+        self.lastStep += steps * self.dt
+        if steps == 10000:
+            self.lastStep = now
+
+    def telemetry(self):
+        self.advance()
+        return TELEMETRY_FRAME.pack(*self.motors[0].getValues(), *self.motors[1].getValues())
+
+    def streamFrame(self):
+        body = struct.pack('<H', self.seq) + self.telemetry()
+        self.seq = (self.seq + 1) & 0xFFFF
+        return STREAM_SYNC + body + bytes([streamChecksum(body)])
+
+    def reply(self, data):
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if self.baudRate:
+            delay += len(data) * 10 / self.baudRate
+        if delay > 0:
+            time.sleep(delay)
+        if self.dropRate and self.random.random() < self.dropRate:
+            pos = self.random.randrange(len(data))
+            data = data[:pos] + data[pos + 1:]
+        os.write(self.master, data)
+
+
+def startSimulators(boards=3, identify=True, **kwargs):
+    """
+    Arranca varias Tiva simuladas y regresa la lista de simuladores.
+    Con identify=True la i-ésima responde a '?' como la Tiva i+1.
+    """
+    sims = []
+    for i in range(boards):
+        sim = TivaSimulator(boardId=i + 1 if identify else None, **kwargs)
+        sim.start()
+        sims.append(sim)
+    return sims
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulador de Tivas sobre pty")
+    parser.add_argument("--boards", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--drop", type=float, default=0.0)
+    parser.add_argument("--baud", type=int, default=None)
+    parser.add_argument("--no-stream", action="store_true", help="Ignorar la suscripción 'S'")
+    parser.add_argument("--no-batch", action="store_true", help="Ignorar los lotes 'B'")
+    parser.add_argument("--no-id", action="store_true", help="Ignorar la consulta de identidad '?'")
+    parser.add_argument("--gain", type=float, default=1.0)
+    parser.add_argument("--tau", type=float, default=0.15)
+    parser.add_argument("--delay", type=float, default=0.0, help="Tiempo muerto del motor [s]")
+    parser.add_argument("--stall", type=float, default=None, help="Colgar la Tiva 1 tras estos segundos")
+    args = parser.parse_args()
+
+    sims = startSimulators(args.boards, latency=args.latency, jitter=args.jitter,
+                           dropRate=args.drop, baudRate=args.baud, streaming=not args.no_stream,
+                           batch=not args.no_batch, identify=not args.no_id, gain=args.gain, tau=args.tau,
+                           delay=args.delay)
+    for sim in sims:
+        print(sim.device, flush=True)
+    try:
+        if args.stall is not None:
+            time.sleep(args.stall)
+            sims[0].stall()
+            print(f"{sims[0].device} dejó de responder", flush=True)
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        for sim in sims:
+            sim.stop()
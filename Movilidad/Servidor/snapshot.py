@@ -0,0 +1,85 @@
+"""
+Instantánea de la telemetría de todos los motores con doble buffer.
+
+Cada Tiva publica su trama completa (ambos motores) de una sola vez en el
+buffer trasero y después lo vuelve el frontal, así que los lectores nunca
+ven una trama mezclada y nunca toman un candado. Sólo los hilos que
+escriben (uno por Tiva) se sincronizan entre sí.
+"""
+import threading
+
+import numpy as np
+
+# Columnas de cada fila (una fila por motor)
+RPM, ERROR, PID, PROPORTIONAL, INTEGRAL, DERIVATIVE, SEQ, STAMP = range(8)
+COLUMNS = 8
+
+
+class TelemetrySnapshot:
+    """Doble buffer preasignado de forma (motores, COLUMNS)."""
+    def __init__(self, motors=6):
+        self.buffers = np.zeros((2, motors, COLUMNS))
+        self.generation = 0     # Publicaciones terminadas; el frontal es generation % 2
+        self.started = 0        # Publicaciones iniciadas (para validar lecturas)
+        self.writeLock = threading.Lock()
+
+    @property
+    def motors(self):
+        return self.buffers.shape[1]
+
+    def resize(self, motors):
+        """Agranda el buffer si se agregan Tivas; conserva los valores actuales."""
+        with self.writeLock:
+            if motors <= self.motors:
+                return
+            buffers = np.zeros((2, motors, COLUMNS))
+            buffers[:, :self.motors] = self.buffers
+            self.buffers = buffers
+
+    def publish(self, row, values, seq, stamp):
+        """
+        Publica la trama de una Tiva: values son los 12 floats de sus dos motores
+        y row la fila de su primer motor.
+        """
+        with self.writeLock:
+            generation = self.generation
+            self.started = generation + 1
+            back = self.buffers[(generation + 1) & 1]
+            np.copyto(back, self.buffers[generation & 1])
+            # Las dos filas son contiguas: una sola asignación de 16 valores
+            back[row:row + 2].reshape(-1)[:] = (*values[0:6], seq, stamp, *values[6:12], seq, stamp)
+            self.generation = generation + 1
+
+    def publishMotor(self, row, values, seq, stamp):
+        """Publica los seis valores de un solo motor (p. ej. al reproducir una sesión)."""
+        with self.writeLock:
+            generation = self.generation
+            self.started = generation + 1
+            back = self.buffers[(generation + 1) & 1]
+            np.copyto(back, self.buffers[generation & 1])
+            back[row] = (*values, seq, stamp)
+            self.generation = generation + 1
+
+    def read(self):
+        """
+        Regresa (generation, vista) sin copiar. La vista es de sólo lectura y
+        sigue siendo consistente mientras isValid(generation) sea verdadero.
+        """
+        generation = self.generation
+        view = self.buffers[generation & 1].view()
+        view.flags.writeable = False
+        return generation, view
+
+    def isValid(self, generation):
+        """Falso si un escritor ya empezó a sobrescribir el buffer leído."""
+        return self.started - generation <= 1
+
+    def copy(self, out=None):
+        """Copia consistente de la instantánea (en out si se da, sin asignar memoria)."""
+        while True:
+            generation, view = self.read()
+            if out is None or out.shape != view.shape:
+                out = np.empty_like(view)
+            out[:] = view
+            if self.isValid(generation):
+                return out
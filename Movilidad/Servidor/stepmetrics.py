@@ -0,0 +1,119 @@
+"""
+Métricas de respuesta al escalón calculadas trama por trama.
+
+Cada motor tiene un StepTracker con un estado fijo que se actualiza en O(1)
+con cada trama: no se guarda ni se recorre el historial. Un cambio de
+setpoint inicia un escalón nuevo y reinicia las métricas de ese motor:
+
+    riseTime        tiempo de 10 % a 90 % del escalón [s]
+    overshoot       sobrepaso máximo respecto al escalón [%]
+    settlingTime    tiempo desde el escalón hasta la última salida de la
+                    banda de tolerancia; nan mientras rpm está fuera [s]
+    steadyError     promedio exponencial del error (constante ssWindow) [rpm]
+    iae, ise        integrales de |e| y e² desde el escalón
+
+La banda es setPoint * (1 ± tolerance), igual que la de la gráfica SP vs PV.
+Con dos motores por trama, operaciones escalares cuestan ~1 µs por trama;
+NumPy sobre arreglos tan pequeños es unas 20 veces más lento.
+
+Uso:
+    metrics = movilidad.metrics.summary(3)     # {"riseTime": ..., ...}
+"""
+import math
+import threading
+
+METRICS = ["riseTime", "overshoot", "settlingTime", "steadyError", "iae", "ise"]
+
+
+class StepTracker:
+    """Estado del escalón en curso de un motor."""
+    __slots__ = ("target", "initial", "start", "last", "tLow", "tHigh", "peak",
+                 "lastOutside", "outside", "steady", "iae", "ise")
+
+    def __init__(self):
+        self.target = math.nan      # Ningún escalón todavía: la primera muestra lo inicia
+
+    def step(self, stamp, setPoint, rpm):
+        self.target = setPoint
+        self.initial = rpm
+        self.start = stamp
+        self.last = stamp
+        self.tLow = math.nan
+        self.tHigh = math.nan
+        self.peak = 0.0
+        self.lastOutside = stamp
+        self.outside = True
+        self.steady = 0.0
+        self.iae = 0.0
+        self.ise = 0.0
+
+    def update(self, stamp, setPoint, rpm, tolerance, low, high, ssWindow):
+        if setPoint != self.target:
+            self.step(stamp, setPoint, rpm)
+        dt = stamp - self.last
+        self.last = stamp
+        e = setPoint - rpm
+        self.iae += abs(e) * dt
+        self.ise += e * e * dt
+        self.steady += (e - self.steady) * min(dt / ssWindow, 1.0)
+
+        # Avance del escalón: 0 en el valor inicial, 1 en el setpoint
+        span = setPoint - self.initial
+        progress = (rpm - self.initial) / span if span else 1.0
+        if progress > self.peak:
+            self.peak = progress
+        if self.tLow != self.tLow and progress >= low:         # tLow es nan
+            self.tLow = stamp - self.start
+        if self.tHigh != self.tHigh and progress >= high:
+            self.tHigh = stamp - self.start
+
+        self.outside = abs(e) > tolerance * abs(setPoint)
+        if self.outside:
+            self.lastOutside = stamp
+
+    def metrics(self):
+        if self.target != self.target:
+            return [math.nan] * len(METRICS)
+        return [self.tHigh - self.tLow,
+                max(self.peak - 1.0, 0.0) * 100,
+                math.nan if self.outside else self.lastOutside - self.start,
+                self.steady,
+                self.iae,
+                self.ise]
+
+
+class StepMetrics:
+    """StepTracker de cada motor (posición i = motor i+1)."""
+    def __init__(self, motors=6, tolerance=0.02, rise=(0.1, 0.9), ssWindow=0.5):
+        self.trackers = [StepTracker() for _ in range(motors)]
+        self.tolerance = tolerance
+        self.low, self.high = rise
+        self.ssWindow = ssWindow
+        self.lock = threading.Lock()
+
+    @property
+    def motors(self):
+        return len(self.trackers)
+
+    def resize(self, motors):
+        with self.lock:
+            self.trackers += [StepTracker() for _ in range(motors - self.motors)]
+
+    def update(self, row, stamp, setPoints, rpm):
+        """
+        Agrega una muestra de los motores row, row + 1, ... (una Tiva o toda
+        la flota): setPoints y rpm son secuencias del mismo largo. Cada motor
+        sólo lo actualiza el hilo de su Tiva, así que no se toma candado.
+        """
+        tolerance, low, high, ssWindow = self.tolerance, self.low, self.high, self.ssWindow
+        for tracker, setPoint, value in zip(self.trackers[row:row + len(rpm)], setPoints, rpm):
+            tracker.update(stamp, setPoint, value, tolerance, low, high, ssWindow)
+
+    def summary(self, idx):
+        """Métricas del motor idx como diccionario {nombre: valor}."""
+        return dict(zip(METRICS, self.trackers[idx - 1].metrics()))
+
+    def reset(self):
+        """Olvida los escalones en curso; la siguiente muestra inicia uno nuevo."""
+        with self.lock:
+            self.trackers = [StepTracker() for _ in range(self.motors)]
@@ -0,0 +1,95 @@
+"""
+Supervisión de las conexiones con las Tivas.
+
+Si una Tiva se desconecta, su hilo (o su tarea en SerialEngine) termina y
+el ConnectionSupervisor la vuelve a abrir con espera exponencial mientras
+el puerto exista. Cuando el puerto desaparece no se intenta nada hasta que
+vuelve a aparecer (hot-plug), y entonces se reconecta de inmediato.
+
+La enumeración de puertos (serial.tools.list_ports.comports) es lenta, así
+que se guarda en PortCache y se renueva a lo más cada maxAge segundos o
+cuando se pierde una conexión.
+"""
+import os
+import threading
+import time
+
+import serial.tools.list_ports
+
+RECONNECT_MIN = 0.1     # Espera inicial entre intentos de reconexión [s]
+RECONNECT_MAX = 5.0     # Espera máxima entre intentos [s]
+
+
+class PortCache:
+    """Enumeración de puertos seriales con caducidad."""
+    def __init__(self, maxAge=1.0):
+        self.maxAge = maxAge
+        self.devices = set()
+        self.stamp = None
+        self.lock = threading.Lock()
+
+    def ports(self):
+        """Dispositivos de comports(), enumerados de nuevo sólo si la copia caducó."""
+        with self.lock:
+            now = time.perf_counter()
+            if self.stamp is None or now - self.stamp > self.maxAge:
+                self.devices = {port.device for port in serial.tools.list_ports.comports()}
+                self.stamp = now
+            return self.devices
+
+    def exists(self, COM):
+        # Los pseudo-terminales y los enlaces de /dev/serial/by-id no aparecen en comports()
+        return os.path.exists(COM) or COM in self.ports()
+
+    def invalidate(self):
+        with self.lock:
+            self.stamp = None
+
+
+portCache = PortCache()
+
+
+class ConnectionSupervisor:
+    """Hilo que reabre los Controller desconectados de un MotorControllerSystem."""
+    def __init__(self, system, period=0.1):
+        self.system = system
+        self.period = period
+        self.running = False
+        self.thread = None
+        self.wake = threading.Event()
+
+    def start(self):
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self.superviseLoop)
+            self.thread.daemon = True
+            self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def superviseLoop(self):
+        while self.running:
+            self.check()
+            self.wake.wait(self.period)
+            self.wake.clear()
+
+    def check(self):
+        """Intenta reconectar cada Tiva inactiva cuyo puerto exista y cuya espera ya pasó."""
+        now = time.perf_counter()
+        for controller in list(self.system.controllers):
+            if controller.active or not controller.running or not self.system.running:
+                continue
+            if not portCache.exists(controller.COM):
+                controller.present = False
+                continue
+            if controller.present and now < controller.nextAttempt:
+                continue
+            controller.present = True
+            controller.nextAttempt = now + controller.backoff
+            controller.backoff = min(controller.backoff * 2, RECONNECT_MAX)
+            self.system.connect(controller)
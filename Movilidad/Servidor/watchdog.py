@@ -0,0 +1,169 @@
+"""
+Watchdog de plazos del sistema de movilidad.
+
+Si una Tiva deja de responder o la interfaz se congela (por ejemplo en un
+redibujo de matplotlib), nada detendría los motores: stopAll sólo baja
+banderas. El Watchdog corre en su propio hilo, independiente de la
+interfaz, y vigila dos plazos:
+
+    telemetría   cada Tiva debe entregar una trama cada telemetryDeadline
+                 segundos (se vigila a partir de su primera trama). El
+                 plazo cubre varias lecturas incompletas seguidas (cada
+                 una cuesta READ_TIMEOUT, ver controller.py), así que un
+                 byte perdido no detiene el rover. Si la Tiva se
+                 desconectó, el supervisor tiene reconnectGrace
+                 segundos desde la pérdida para reconectarla: una caída
+                 breve del USB se recupera con el setpoint que tenía (la
+                 firmware sigue con su PID mientras tanto) y sólo una
+                 Tiva que no vuelve, o que se cuelga con el puerto
+                 abierto, detiene el rover
+    operador     quien maneje el rover debe llamar heartbeat() cada
+                 commandDeadline segundos (se vigila a partir del primer
+                 latido; heartbeat(False) deja de vigilarlo)
+
+Al vencer un plazo se difunde setpoint 0 a todas las Tivas. El hilo duerme
+justo hasta el plazo más próximo, así que la latencia entre el vencimiento
+y la difusión es la del planificador más la escritura serial (ver
+lastLatency/maxLatency). Una Tiva vencida no vuelve a disparar hasta que
+entregue telemetría otra vez (y entonces se le reenvían sus parámetros,
+por si perdió el paro); el operador, hasta el siguiente latido.
+
+Uso:
+    system.watchdog.telemetryDeadline = 0.25
+    system.heartbeat()                  # Desde el lazo de la interfaz
+    system.watchdog.stats()
+"""
+import threading
+import time
+
+TELEMETRY_DEADLINE = 0.5    # Máximo entre tramas de una Tiva [s] (varias veces READ_TIMEOUT)
+COMMAND_DEADLINE = 1.0      # Máximo entre latidos del operador [s]
+RECONNECT_GRACE = 2.0       # Máximo desde que se pierde una Tiva hasta su primera trama al reconectar [s]
+
+
+class Watchdog:
+    """Hilo que lleva los setpoints a cero si una Tiva o el operador dejan de dar señales."""
+    def __init__(self, system, telemetryDeadline=TELEMETRY_DEADLINE, commandDeadline=COMMAND_DEADLINE,
+                 reconnectGrace=RECONNECT_GRACE, period=0.1):
+        self.system = system
+        self.telemetryDeadline = telemetryDeadline
+        self.reconnectGrace = reconnectGrace
+        self.commandDeadline = commandDeadline  # None: no vigilar al operador
+        self.period = period            # Máxima espera entre revisiones [s]
+        self.lastHeartbeat = None       # perf_counter del último latido (None: sin vigilar)
+        self.tripped = set()            # Tivas (boardId) vencidas que no han vuelto a responder
+        self.missed = {}                # boardId -> plazos de telemetría vencidos
+        self.operatorMissed = 0         # Plazos del operador vencidos
+        self.stops = 0                  # Difusiones de setpoint 0
+        self.lastLatency = 0.0          # Vencimiento del plazo -> difusión terminada [s]
+        self.maxLatency = 0.0
+        self.running = False
+        self.thread = None
+        self.wake = threading.Event()
+
+    def start(self):
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self.watchLoop)
+            self.thread.daemon = True
+            self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def heartbeat(self, alive=True):
+        """Latido del operador; con alive=False se deja de vigilar hasta el siguiente latido."""
+        self.lastHeartbeat = time.perf_counter() if alive else None
+
+    def watchLoop(self):
+        while self.running:
+            self.wake.wait(self.check(time.perf_counter()))
+            self.wake.clear()
+
+    def check(self, now):
+        """Revisa los plazos, difunde el paro si alguno venció y regresa cuánto dormir."""
+        expired = None                  # Plazo vencido más antiguo de esta revisión
+        wakeAt = now + self.period
+        for controller in list(self.system.controllers):
+            last = controller.lastFrame
+            if last is None:
+                continue                # Aún no entrega telemetría
+            deadline = last + self.telemetryDeadline
+            lostAt = controller.lostAt
+            if lostAt is not None:
+                # Desconectada: el supervisor la está reconectando (ver supervisor.py)
+                deadline = max(deadline, lostAt + self.reconnectGrace)
+            board = controller.boardId
+            if now < deadline:
+                if board in self.tripped:
+                    self.recovered(controller)
+                wakeAt = min(wakeAt, deadline)
+            elif board not in self.tripped:
+                self.tripped.add(board)
+                self.missed[board] = self.missed.get(board, 0) + 1
+                reason = "sigue desconectada" if lostAt is not None else "no envía telemetría"
+                print(f"Watchdog: la Tiva {board} ({controller.COM}) {reason} "
+                      f"desde hace {now - last:.2f} s; setpoints a cero.")
+                expired = deadline if expired is None else min(expired, deadline)
+
+        heartbeat = self.lastHeartbeat
+        if heartbeat is not None and self.commandDeadline is not None:
+            deadline = heartbeat + self.commandDeadline
+            if now < deadline:
+                wakeAt = min(wakeAt, deadline)
+            else:
+                self.lastHeartbeat = None
+                self.operatorMissed += 1
+                print(f"Watchdog: sin latido del operador desde hace {now - heartbeat:.2f} s; setpoints a cero.")
+                expired = deadline if expired is None else min(expired, deadline)
+
+        if expired is not None:
+            self.stopMotors(expired)
+        return max(wakeAt - time.perf_counter(), 0.0)
+
+    def recovered(self, controller):
+        """
+        La Tiva volvió a enviar telemetría. Una firmware colgada pudo perder el
+        paro, así que se le reenvían sus parámetros actuales (setpoint 0 salvo
+        que el operador haya mandado otro desde entonces).
+        """
+        self.tripped.discard(controller.boardId)
+        print(f"Watchdog: la Tiva {controller.boardId} ({controller.COM}) responde otra vez.")
+        for motor in controller.motors:
+            motor.updateParams(setPoint=motor.setPoint)
+
+    def stopMotors(self, expired):
+        """
+        Setpoint 0 a todas las Tivas. Las que responden lo reciben por difusión;
+        a las vencidas o desconectadas se les encola en su propio hilo (o al
+        reconectar), para que una Tiva colgada no retrase el paro de las demás.
+        """
+        controllers = list(self.system.controllers)
+        healthy = [c for c in controllers if c.boardId not in self.tripped and c.port is not None]
+        try:
+            self.system.broadcastSetPoint(0.0, controllers=healthy)
+        except (OSError, ValueError) as e:
+            print(f"Watchdog: error al difundir el paro: {e}")
+        for controller in controllers:
+            if controller not in healthy:
+                for motor in controller.motors:
+                    motor.updateParams(setPoint=0.0)
+        latency = time.perf_counter() - expired
+        self.stops += 1
+        self.lastLatency = latency
+        self.maxLatency = max(self.maxLatency, latency)
+
+    def stats(self):
+        """Plazos vencidos y latencia del paro (llaves de texto para poder enviarlo como JSON)."""
+        return {
+            "missed": {str(board): count for board, count in self.missed.items()},
+            "operatorMissed": self.operatorMissed,
+            "stops": self.stops,
+            "tripped": sorted(self.tripped),
+            "lastLatency": self.lastLatency,
+            "maxLatency": self.maxLatency,
+        }